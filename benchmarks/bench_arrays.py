@@ -0,0 +1,60 @@
+"""Compare an element-wise array expression with evaluating it per scalar.
+
+Needs NumPy. Run from the repository root: python -m benchmarks.bench_arrays
+"""
+
+import timeit
+from decimal import Decimal
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.values import Number
+from lexer import Lexer
+from parser_ import Parser
+
+SOURCE = "(x * 2 + 1) ^ 2 / (x + 1)"
+SIZES = [10, 1000, 100_000]
+REPEAT = 3
+
+
+def main() -> None:
+    try:
+        import numpy as np
+
+        from interpreter.arrays import Array
+    except ImportError:
+        print("NumPy isn't installed")
+        return
+
+    tree = Parser(Lexer(SOURCE).generate_tokens()).parse()
+    print(SOURCE)
+    print("elements        per scalar         array     speedup")
+    for size in SIZES:
+        table = SymbolTable()
+        interpreter = Interpreter(table)
+        numbers = [Number(Decimal(i) / 7) for i in range(size)]
+
+        def scalars() -> None:
+            for number in numbers:
+                table.set("x", number)
+                interpreter.visit(tree)
+
+        array_table = SymbolTable()
+        array_table.set("x", Array.from_numpy(np.arange(size) / 7))
+        array_interpreter = Interpreter(array_table)
+
+        number = max(1, 100_000 // size)
+        scalar = min(timeit.repeat(scalars, number=number, repeat=REPEAT)) / number
+        array = min(
+            timeit.repeat(
+                lambda: array_interpreter.visit(tree), number=number, repeat=REPEAT
+            )
+        )
+        array /= number
+        print(
+            f"{size:>8}{scalar * 1e3:>16.3f}ms{array * 1e3:>12.3f}ms"
+            f"{scalar / array:>11.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare aggregating a range with a built-in and with written out terms.
+
+Run from the repository root: python -m benchmarks.bench_builtins
+"""
+
+import timeit
+from decimal import Decimal
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.values import Number
+from lexer import Lexer
+from parser_ import Parser
+
+# Written out terms nest one level per term, more overflow the Python stack.
+TERMS = 300
+NUMBER = 20
+
+
+def main() -> None:
+    table = SymbolTable()
+    table.update({f"a{i}": Number(Decimal(i) / 7) for i in range(1, TERMS + 1)})
+    interpreter = Interpreter(table)
+
+    written = " + ".join(f"a{i}" for i in range(1, TERMS + 1))
+    sources = [
+        ("terms", f"({written}) / {TERMS}"),
+        ("range", f"mean(a1:a{TERMS})"),
+        ("pattern", "mean(a*)"),
+    ]
+    print(f"mean of {TERMS} variables   parse + evaluate      evaluate")
+    for name, source in sources:
+        tree = Parser(Lexer(source).generate_tokens()).parse()
+        parse = min(
+            timeit.repeat(
+                lambda: Parser(Lexer(source).generate_tokens()).parse(), number=NUMBER
+            )
+        )
+        evaluate = min(timeit.repeat(lambda: interpreter.visit(tree), number=NUMBER))
+        total = (parse + evaluate) / NUMBER
+        print(f"{name:8}{total * 1e3:>20.2f}ms{evaluate / NUMBER * 1e3:>12.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
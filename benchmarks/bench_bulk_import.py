@@ -0,0 +1,46 @@
+"""Compare seeding variables through source lines with the bulk import.
+
+Run from the repository root: python -m benchmarks.bench_bulk_import
+"""
+
+import json
+import tempfile
+import timeit
+from pathlib import Path
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.bulk_import import import_csv, import_json
+from lexer import Lexer
+from parser_ import Parser
+
+VARIABLES = 100000
+
+
+def main() -> None:
+    values = {f"x{i}": f"{i}.5" for i in range(VARIABLES)}
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "values.csv"
+        csv_path.write_text(
+            "".join(f"{name},{value}\n" for name, value in values.items())
+        )
+        json_path = Path(directory) / "values.json"
+        json_path.write_text(json.dumps({name: float(v) for name, v in values.items()}))
+        sources = [f"var {name} = {value}" for name, value in values.items()]
+
+        def source() -> None:
+            interpreter = Interpreter()
+            for line in sources:
+                interpreter.visit(Parser(Lexer(line).generate_tokens()).parse())
+
+        print(f"{VARIABLES} variables")
+        for name, function in [
+            ("source", source),
+            ("csv", lambda: import_csv(csv_path, SymbolTable())),
+            ("json", lambda: import_json(json_path, SymbolTable())),
+        ]:
+            time = min(timeit.repeat(function, number=1, repeat=3))
+            print(f"{name:8}{time * 1e3:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
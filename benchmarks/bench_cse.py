@@ -0,0 +1,44 @@
+"""Evaluate duplicate-heavy expressions with and without CSE.
+
+Run from the repository root: python -m benchmarks.bench_cse
+"""
+
+import timeit
+from decimal import Decimal
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.values import Number
+from lexer import Lexer
+from optimizer import eliminate_common_subexpressions
+from parser_ import Parser
+
+SOURCES = {
+    "ratio": "(a*b+c)/(a*b+c+1)",
+    "normalized": "(a-m)/(s*s+1) + (b-m)/(s*s+1) + (c-m)/(s*s+1) + (a-m)/(s*s+1)",
+    "polynomial": "((a+b)*(a+b)+c)*((a+b)*(a+b)+c) - ((a+b)*(a+b)+c)",
+    "unique": "a*b + c/s - m%3",
+}
+
+
+def main() -> None:
+    table = SymbolTable()
+    for name, value in zip("abcms", ["1.5", "2.25", "-3", "0.75", "1.125"]):
+        table.set(name, Number(Decimal(value)))
+    interpreter = Interpreter(table)
+
+    def best(tree) -> float:
+        timer = timeit.Timer(lambda: interpreter.visit(tree))
+        return min(timer.repeat(number=2000, repeat=5)) / 2000
+
+    print(f"{'':12}{'plain':>10}{'cse':>10}{'speedup':>10}")
+    for name, source in SOURCES.items():
+        tree = Parser(Lexer(source).generate_tokens()).parse()
+        optimized = eliminate_common_subexpressions(tree)
+        assert interpreter.visit(optimized) == interpreter.visit(tree)
+        plain = best(tree)
+        cse = best(optimized)
+        print(f"{name:12}{plain * 1e6:>8.1f}us{cse * 1e6:>8.1f}us{plain / cse:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
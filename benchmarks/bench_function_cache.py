@@ -0,0 +1,46 @@
+"""Compare memoized calls of a pure function with uncached ones.
+
+A rate table is looked up for rows which only use a few distinct rates, as is
+typical for tariffs and tax brackets.
+
+Run from the repository root: python -m benchmarks.bench_function_cache
+"""
+
+import timeit
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.functions import function_stats
+from lexer import Lexer
+from parser_ import Parser
+
+RATES = 8
+ROWS = 2000
+
+BODY = "(1 + r / 1200) ^ 12 * (1 + r / 1200) ^ 6 / ((1 + r / 100) ^ 0.5 + r % 7)"
+
+
+def main() -> None:
+    rows = [
+        Parser(Lexer(f"{i % 13} * rate({i % RATES})").generate_tokens()).parse()
+        for i in range(ROWS)
+    ]
+
+    def session(annotation: str) -> SymbolTable:
+        table = SymbolTable()
+        interpreter = Interpreter(table)
+        source = f"{annotation}fun rate(r) = {BODY}"
+        interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+        for tree in rows:
+            interpreter.visit(tree)
+        return table
+
+    print(f"{ROWS} calls with {RATES} distinct arguments")
+    for name, annotation in [("nomemo", "@nomemo "), ("memo", "")]:
+        time = min(timeit.repeat(lambda: session(annotation), number=3)) / 3
+        print(f"{name:8}{time * 1e3:>8.1f}ms")
+    stats = function_stats(session(""))["rate"]
+    print(f"hit rate {stats.hit_rate:.1%}")
+
+
+if __name__ == "__main__":
+    main()
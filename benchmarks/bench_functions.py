@@ -0,0 +1,29 @@
+"""Compare calling a function with evaluating its body inline.
+
+The function is `@nomemo`, so every call evaluates the body.
+
+Run from the repository root: python -m benchmarks.bench_functions
+"""
+
+import timeit
+
+from interpreter import Interpreter
+from lexer import Lexer
+from parser_ import Parser
+
+NUMBER = 20000
+
+
+def main() -> None:
+    interpreter = Interpreter()
+    for source in ["var a = 3", "var b = 7", "@nomemo fun f(x, y) = x * y + x / y"]:
+        interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+
+    for name, source in [("inline", "a * b + a / b"), ("call", "f(a, b)")]:
+        tree = Parser(Lexer(source).generate_tokens()).parse()
+        time = min(timeit.repeat(lambda: interpreter.visit(tree), number=NUMBER))
+        print(f"{name:8}{time / NUMBER * 1e6:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
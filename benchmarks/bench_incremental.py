@@ -0,0 +1,49 @@
+"""Compare parsing an edited script in full with parsing only the edit.
+
+Run from the repository root: python -m benchmarks.bench_incremental
+"""
+
+import timeit
+
+from lexer import Lexer
+from parser_ import Parser
+from parser_.incremental import parse_script, reparse_script
+
+LINES = [2000, 10_000]
+NUMBER = 20
+
+
+def script(lines: int) -> str:
+    statements = []
+    for i in range(0, lines, 2):
+        statements.append(f"var v{i} = {i % 17} * 3 + 1")
+        statements.append(f"v{i} * 2 + (v{i} - 1) / 3")
+    return "\n".join(statements) + "\n"
+
+
+def main() -> None:
+    print("lines       full parse     reparse   speedup")
+    for lines in LINES:
+        text = script(lines)
+        parsed = parse_script(text)
+        # Change a digit in the middle of the script.
+        offset = text.index("* 2", len(text) // 2) + 2
+        rest = offset + 1
+
+        def full() -> None:
+            edited = text[:offset] + "5" + text[rest:]
+            Parser(Lexer(edited).generate_tokens()).parse_program()
+
+        def incremental() -> None:
+            reparse_script(parsed, offset, 1, "5")
+
+        full_time = min(timeit.repeat(full, number=1, repeat=3))
+        incremental_time = min(timeit.repeat(incremental, number=NUMBER)) / NUMBER
+        print(
+            f"{lines:>5}{full_time * 1e3:>15.1f}ms{incremental_time * 1e3:>10.2f}ms"
+            f"{full_time / incremental_time:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
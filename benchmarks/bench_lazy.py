@@ -0,0 +1,40 @@
+"""Compare session startup with eager and lazy definitions.
+
+Run from the repository root: python -m benchmarks.bench_lazy
+"""
+
+import timeit
+
+from interpreter import Interpreter
+from interpreter.lazy import LazyInterpreter
+from lexer import Lexer
+from parser_ import Parser
+
+DEFINITIONS = 2000
+READS = 20
+
+
+def main() -> None:
+    definitions = [
+        Parser(Lexer(f"var v{i} = ({i} + 0.5) ^ 0.37 / 7").generate_tokens()).parse()
+        for i in range(DEFINITIONS)
+    ]
+    reads = [
+        Parser(Lexer(f"v{i} * 2").generate_tokens()).parse()
+        for i in range(0, DEFINITIONS, DEFINITIONS // READS)
+    ]
+
+    def session(interpreter: Interpreter) -> None:
+        for tree in definitions:
+            interpreter.visit(tree)
+        for tree in reads:
+            interpreter.visit(tree)
+
+    print(f"{DEFINITIONS} definitions, {READS} of them read")
+    for name, interpreter_class in [("eager", Interpreter), ("lazy", LazyInterpreter)]:
+        time = min(timeit.repeat(lambda: session(interpreter_class()), number=5)) / 5
+        print(f"{name:8}{time * 1e3:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare parsing with and without recording source positions.
+
+Run from the repository root: python -m benchmarks.bench_positions
+"""
+
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+from lexer import Lexer
+from parser_ import Parser, parse_with_positions
+
+LINES = 10_000
+
+
+def script(lines: int) -> str:
+    statements = []
+    for i in range(0, lines, 2):
+        statements.append(f"var v{i} = {i % 17} * 3 + 1")
+        statements.append(f"v{i} * 2 + (v{i} - 1) / 3")
+    return "\n".join(statements) + "\n"
+
+
+def allocated(parse: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    result = parse()  # noqa: F841
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    text = script(LINES)
+
+    def plain() -> Any:
+        return Parser(Lexer(text).generate_tokens()).parse_program()
+
+    def positions() -> Any:
+        return parse_with_positions(text)
+
+    print(f"{LINES} lines            time     memory")
+    for name, parse in [("plain", plain), ("with positions", positions)]:
+        elapsed = min(timeit.repeat(parse, number=1, repeat=3))
+        print(f"{name:<16}{elapsed * 1e3:>9.1f}ms{allocated(parse) / 2 ** 20:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measure the overhead of the sampling profiler on a script.
+
+Run from the repository root: python -m benchmarks.bench_profiler
+"""
+
+import timeit
+
+from interpreter import Interpreter
+from interpreter.profiler import Profiler
+from parser_ import parse_with_positions
+
+LINES = 20_000
+REPEAT = 5
+
+
+def script(lines: int) -> str:
+    statements = ["fun sq(x) = x * x", "fun poly(x) = sq(x) + 3 * x + 1"]
+    for i in range(0, lines, 2):
+        statements.append(f"var a{i} = poly({i}) / 7 + sq({i} % 13)")
+        statements.append(f"var b{i} = (a{i} ^ 2) % 11 - a{i} / 3")
+    return "\n".join(statements) + "\n"
+
+
+def main() -> None:
+    program, source_map = parse_with_positions(script(LINES))
+    profilers = []
+
+    def plain() -> None:
+        Interpreter().visit(program)
+
+    def profiled() -> None:
+        with Profiler(source_map) as profiler:
+            Interpreter().visit(program)
+        profilers.append(profiler)
+
+    # Alternate the runs, so both see the same machine load.
+    plain_times = []
+    profiled_times = []
+    for _ in range(REPEAT):
+        plain_times.append(timeit.timeit(plain, number=1))
+        profiled_times.append(timeit.timeit(profiled, number=1))
+    plain_time = min(plain_times)
+    profiled_time = min(profiled_times)
+    print(f"{LINES} lines      time   samples")
+    print(f"plain      {plain_time * 1e3:>9.1f}ms")
+    print(
+        f"profiled   {profiled_time * 1e3:>9.1f}ms{profilers[-1].samples:>10}"
+        f"   overhead {profiled_time / plain_time - 1:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare running a script statement by statement with running it as a program.
+
+Run from the repository root: python -m benchmarks.bench_programs
+"""
+
+import timeit
+from typing import Callable, List, Tuple
+
+from compiler import compile_program
+from interpreter import Interpreter, SymbolTable
+from lexer import Lexer
+from parser_ import Parser
+
+STATEMENTS = 10_000
+REPEAT = 3
+
+
+def script() -> List[str]:
+    lines = []
+    for i in range(0, STATEMENTS, 2):
+        lines.append(f"var v{i} = {i % 17} * 3 + 1")
+        lines.append(f"v{i} * 2 + (v{i} - 1) / 3 - v{max(i - 2, 0)}")
+    return lines
+
+
+def main() -> None:
+    lines = script()
+    text = "\n".join(lines)
+    program = Parser(Lexer(text).generate_tokens()).parse_program()
+    execute = compile_program(program)
+
+    def one_by_one() -> None:
+        interpreter = Interpreter()
+        for line in lines:
+            interpreter.evaluate(Lexer(line).generate_tokens())
+
+    def parsed_program() -> None:
+        parsed = Parser(Lexer(text).generate_tokens()).parse_program()
+        Interpreter().execute(parsed, [].append)
+
+    def cached_program() -> None:
+        Interpreter().execute(program, [].append)
+
+    def compiled_program() -> None:
+        compile_program(program)(SymbolTable(), [].append)
+
+    def compiled_once() -> None:
+        execute(SymbolTable(), [].append)
+
+    runs: List[Tuple[str, Callable[[], None]]] = [
+        ("one by one", one_by_one),
+        ("parse + run", parsed_program),
+        ("run parsed", cached_program),
+        ("compile + run", compiled_program),
+        ("run compiled", compiled_once),
+    ]
+    print(f"{STATEMENTS} statements         total   statements/s")
+    baseline = None
+    for name, function in runs:
+        elapsed = min(timeit.repeat(function, number=1, repeat=REPEAT))
+        baseline = baseline or elapsed
+        print(
+            f"{name:18}{elapsed * 1e3:>10.1f}ms{STATEMENTS / elapsed:>15,.0f}"
+            f"{baseline / elapsed:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare the binary tree format with pickle.
+
+Run from the repository root: python -m benchmarks.bench_serialization
+"""
+
+import pickle
+import timeit
+
+from lexer import Lexer
+from parser_ import Parser
+from serialization import dumps, loads
+
+SOURCE = (
+    "var x{0} = (a*b+c{0})/(a*b+c+{0}) + 2.5^2 - 7 % 3 > 1 && !(a < 3 && b >= 4.75)"
+)
+
+
+def main() -> None:
+    trees = [
+        Parser(Lexer(SOURCE.format(i)).generate_tokens()).parse() for i in range(1000)
+    ]
+    data = dumps(trees)
+    pickled = pickle.dumps(trees, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def best(func) -> float:
+        return min(timeit.repeat(func, number=5, repeat=5)) / 5
+
+    print(f"{'':8}{'catsby':>12}{'pickle':>12}")
+    print(f"{'size':8}{len(data):>12}{len(pickled):>12}")
+    print(
+        f"{'encode':8}{best(lambda: dumps(trees)) * 1000:>10.2f}ms"
+        f"{best(lambda: pickle.dumps(trees, protocol=5)) * 1000:>10.2f}ms"
+    )
+    print(
+        f"{'decode':8}{best(lambda: loads(data)) * 1000:>10.2f}ms"
+        f"{best(lambda: pickle.loads(pickled)) * 1000:>10.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare parsing and walking a tree with evaluating straight from tokens.
+
+Run from the repository root: python -m benchmarks.bench_streaming
+"""
+
+import timeit
+from decimal import Decimal
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.streaming import evaluate_tokens
+from interpreter.values import Number
+from lexer import Lexer
+from parser_ import Parser
+
+SOURCES = {
+    "number": "42",
+    "short": "a + 1",
+    "arithmetic": "(a*b+c)/(a*b+c+1) - a % 3 + b ^ 2",
+    "logic": "a < b && b <= c || !(c >= a) && a != b",
+    "nested": "((((a + 1) * 2 - b) / 3) ^ 2 + -c) % 7",
+}
+NUMBER = 2000
+
+
+def main() -> None:
+    table = SymbolTable()
+    for name, value in zip("abc", ["1.5", "2.25", "-3"]):
+        table.set(name, Number(Decimal(value)))
+    interpreter = Interpreter(table)
+
+    def tree(source: str) -> None:
+        interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+
+    def streaming(source: str) -> None:
+        evaluate_tokens(Lexer(source).generate_tokens(), table)
+
+    def lex(source: str) -> None:
+        for _ in Lexer(source).generate_tokens():
+            pass
+
+    print(f"{'':12}{'lex':>10}{'tree':>10}{'streaming':>11}")
+    for name, source in SOURCES.items():
+        times = [
+            min(timeit.repeat(lambda: function(source), number=NUMBER)) / NUMBER
+            for function in (lex, tree, streaming)
+        ]
+        print(f"{name:12}" + "".join(f"{time * 1e6:>8.1f}us" for time in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare tree-walking with compiled code.
+
+Run from the repository root: python -m benchmarks.bench_tiered
+"""
+
+import timeit
+from decimal import Decimal
+
+from compiler import compile_expression
+from compiler.tiered import TieredInterpreter
+from interpreter import Interpreter, SymbolTable
+from interpreter.values import Number
+from lexer import Lexer
+from parser_ import Parser
+
+SOURCES = {
+    "arithmetic": "(a*b+c)/(a*b+c+1) - a % 3 + b ^ 2",
+    "logic": "a < b && b <= c || !(c >= a) && a != b",
+    "sqrt": "(a*a + b*b) ^ 0.5",
+}
+EVALUATIONS = 20000
+
+
+def main() -> None:
+    table = SymbolTable()
+    for name, value in zip("abc", ["1.5", "2.25", "-3"]):
+        table.set(name, Number(Decimal(value)))
+
+    print(f"{'':12}{'walk':>10}{'compiled':>10}{'compile':>10}{'tiered':>10}")
+    for name, source in SOURCES.items():
+        tree = Parser(Lexer(source).generate_tokens()).parse()
+        interpreter = Interpreter(table)
+        code = compile_expression(tree)
+        walk = min(timeit.repeat(lambda: interpreter.visit(tree), number=2000)) / 2000
+        compiled = min(timeit.repeat(lambda: code(table), number=2000)) / 2000
+        compile_time = min(timeit.repeat(lambda: compile_expression(tree), number=20))
+        tiered = TieredInterpreter(table)
+        start = timeit.default_timer()
+        for _ in range(EVALUATIONS):
+            tiered.visit(tree)
+        total = timeit.default_timer() - start
+        print(
+            f"{name:12}{walk * 1e6:>8.1f}us{compiled * 1e6:>8.1f}us"
+            f"{compile_time / 20 * 1e6:>8.0f}us{total / EVALUATIONS * 1e6:>8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
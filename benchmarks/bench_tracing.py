@@ -0,0 +1,64 @@
+"""Measure the overhead of recording an execution trace, and of dumping it.
+
+Run from the repository root: python -m benchmarks.bench_tracing
+"""
+
+import os
+import tempfile
+import timeit
+
+from interpreter import Interpreter
+from interpreter.tracing import TraceRecorder
+from lexer import Lexer
+from parser_ import Parser
+
+LINES = 20_000
+REPEAT = 5
+
+
+def script(lines: int) -> str:
+    statements = ["fun sq(x) = x * x", "fun poly(x) = sq(x) + 3 * x + 1"]
+    for i in range(0, lines, 2):
+        statements.append(f"var a{i} = poly({i}) / 7 + sq({i} % 13)")
+        statements.append(f"var b{i} = (a{i} ^ 2) % 11 - a{i} / 3")
+    return "\n".join(statements) + "\n"
+
+
+def main() -> None:
+    program = Parser(Lexer(script(LINES)).generate_tokens()).parse_program()
+    recorder = TraceRecorder()
+
+    def plain() -> None:
+        Interpreter().visit(program)
+
+    def traced() -> None:
+        Interpreter(recorder=recorder).visit(program)
+
+    # Alternate the runs, so both see the same machine load.
+    plain_times = []
+    traced_times = []
+    for _ in range(REPEAT):
+        plain_times.append(timeit.timeit(plain, number=1))
+        traced_times.append(timeit.timeit(traced, number=1))
+    plain_time = min(plain_times)
+    traced_time = min(traced_times)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.cttr")
+        dump_time = min(timeit.repeat(lambda: recorder.dump(path), number=1))
+        size = os.path.getsize(path)
+
+    print(f"{LINES} lines      time")
+    print(f"plain      {plain_time * 1e3:>9.1f}ms")
+    print(
+        f"traced     {traced_time * 1e3:>9.1f}ms"
+        f"   overhead {traced_time / plain_time - 1:.1%}"
+    )
+    print(
+        f"dump       {dump_time * 1e3:>9.1f}ms"
+        f"   {len(recorder)} events, {size / 1024:.0f}KB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare running an edited script in full with re-running what the edit changed.
+
+Run from the repository root: python -m benchmarks.bench_watch
+"""
+
+import timeit
+
+from interpreter import Interpreter
+from lexer import Lexer
+from parser_ import Parser
+from watch import WatchedScript
+
+LINES = [2000, 10_000]
+NUMBER = 20
+
+
+def script(lines: int) -> str:
+    statements = []
+    for i in range(0, lines, 4):
+        statements.append(f"var a{i} = {i % 17} * 3 + 1")
+        statements.append(f"var b{i} = a{i} * 2 + (a{i} - 1) / 3")
+        statements.append(f"fun f{i}(x) = x * b{i} + a{i}")
+        statements.append(f"f{i}(b{i}) - 1")
+    return "\n".join(statements) + "\n"
+
+
+def ignore(*_) -> None:
+    pass
+
+
+def main() -> None:
+    print("lines        full run      update   speedup")
+    for lines in LINES:
+        text = script(lines)
+        # Change a definition in the middle of the script, back and forth.
+        offset = text.index("* 3", len(text) // 2) + 2
+        rest = offset + 1
+        texts = [text[:offset] + "5" + text[rest:], text]
+        watched = WatchedScript()
+        watched.update(text, ignore)
+
+        def full() -> None:
+            program = Parser(Lexer(texts[0]).generate_tokens()).parse_program()
+            Interpreter().execute(program, ignore)
+
+        def update() -> None:
+            watched.update(texts[0], ignore)
+            texts.reverse()
+
+        full_time = min(timeit.repeat(full, number=1, repeat=3))
+        update_time = min(timeit.repeat(update, number=NUMBER)) / NUMBER
+        print(
+            f"{lines:>5}{full_time * 1e3:>15.1f}ms{update_time * 1e3:>10.2f}ms"
+            f"{full_time / update_time:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
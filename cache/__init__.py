@@ -0,0 +1 @@
+from .cache import compile_script, load_script
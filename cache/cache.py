@@ -0,0 +1,133 @@
+import hashlib
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Union
+
+from lexer import Lexer
+from nodes import Node
+from parser_ import Parser
+from serialization import dumps, loads
+from version import VERSION
+
+CACHE_DIR_NAME = "__catsby_cache__"
+CACHE_SUFFIX = ".catc"
+MAGIC = b"CATC"
+FORMAT_VERSION = 2
+
+# magic, format version, catsby version, source mtime (ns), size, sha256
+_HEADER = struct.Struct("<4sH16sqQ32s")
+_HEADER_SIZE = _HEADER.size
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def compile_script(text: str) -> List[Node]:
+    """Lex and parse the statements of a script.
+
+    Statements are separated by newlines or semicolons, blank lines are skipped.
+    """
+
+    return Parser(Lexer(text).generate_tokens()).parse_program().statements
+
+
+def cache_path(script: PathLike, cache_dir: Optional[PathLike] = None) -> Path:
+    """Get the path of the compiled artifact for a script.
+
+    By default the artifact is placed into a cache directory next to the script.
+    A shared cache directory gets a path digest in the file name, so scripts
+    with the same name from different directories don't collide.
+    """
+
+    script = Path(script)
+    if cache_dir is None:
+        return script.parent / CACHE_DIR_NAME / (script.name + CACHE_SUFFIX)
+    digest = hashlib.sha256(str(script.resolve()).encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{script.name}-{digest}{CACHE_SUFFIX}"
+
+
+def load_script(script: PathLike, cache_dir: Optional[PathLike] = None) -> List[Node]:
+    """Load compiled statements of a script, using the on-disk cache.
+
+    The artifact is reused while its header matches the format version, the
+    catsby version and the source. If the source mtime or size differ, the
+    source hash decides, so merely touching a file does not force a re-parse.
+    The new mtime is then written back, so the source is hashed only once.
+    Stale or missing artifacts are rebuilt and written back.
+    """
+
+    script = Path(script)
+    path = cache_path(script, cache_dir)
+    stat = script.stat()
+    source: Optional[bytes] = None
+
+    try:
+        data = path.read_bytes()
+    except OSError:
+        data = b""
+
+    if len(data) >= _HEADER_SIZE:
+        magic, format_version, version, mtime, size, digest = _HEADER.unpack_from(data)
+        if (
+            magic == MAGIC
+            and format_version == FORMAT_VERSION
+            and version.rstrip(b"\0") == VERSION.encode()
+        ):
+            touched = mtime != stat.st_mtime_ns or size != stat.st_size
+            fresh = not touched
+            if touched:
+                source = script.read_bytes()
+                fresh = hashlib.sha256(source).digest() == digest
+            if fresh:
+                payload = data[_HEADER_SIZE:]
+                trees = _load_payload(payload)
+                if trees is not None:
+                    if touched:
+                        # Record the new mtime, so the source isn't hashed
+                        # again on every later load.
+                        _write_atomic(path, _header(stat, digest) + payload)
+                    return trees
+
+    if source is None:
+        source = script.read_bytes()
+    trees = compile_script(source.decode())
+    header = _header(stat, hashlib.sha256(source).digest())
+    _write_atomic(path, header + _dump_payload(trees))
+    return trees
+
+
+def _header(stat: os.stat_result, digest: bytes) -> bytes:
+    return _HEADER.pack(
+        MAGIC, FORMAT_VERSION, VERSION.encode(), stat.st_mtime_ns, stat.st_size, digest
+    )
+
+
+def _dump_payload(trees: List[Node]) -> bytes:
+    return dumps(trees)
+
+
+def _load_payload(payload: bytes) -> Optional[List[Node]]:
+    """Deserialize statements, treating a corrupted artifact as a cache miss."""
+
+    try:
+        return loads(payload)
+    except Exception:
+        return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write the artifact through a temporary file.
+
+    A failure to write the cache is never fatal, the script just stays uncached.
+    """
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,87 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from nodes import AssignmentNode, MultiplyNode, NumberNode, ValueAccessNode
+
+from . import cache
+from .cache import cache_path, compile_script, load_script
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.cat"
+    path.write_text("var a = 2\n\na * 3\n")
+    return path
+
+
+def fail_compile(text):
+    raise AssertionError("Script should be loaded from cache")
+
+
+def test_compile_script():
+    trees = compile_script("var a = 2\n\na * 3\n")
+    assert trees == [
+        AssignmentNode("a", NumberNode(Decimal("2"))),
+        MultiplyNode(ValueAccessNode("a"), NumberNode(Decimal("3"))),
+    ]
+    assert compile_script("var a = 2; a * 3") == trees
+
+
+def test_cache_is_written_and_reused(script, monkeypatch):
+    trees = load_script(script)
+    assert cache_path(script).exists()
+
+    monkeypatch.setattr(cache, "compile_script", fail_compile)
+    assert load_script(script) == trees
+
+
+def test_shared_cache_dir(script, tmp_path):
+    cache_dir = tmp_path / "shared"
+    load_script(script, cache_dir)
+    assert cache_path(script, cache_dir).parent == cache_dir
+    assert cache_path(script, cache_dir).exists()
+
+
+def test_touched_source_is_not_recompiled(script, monkeypatch):
+    trees = load_script(script)
+    script.write_text(script.read_text())
+
+    monkeypatch.setattr(cache, "compile_script", fail_compile)
+    assert load_script(script) == trees
+
+
+def test_touched_source_updates_header(script, monkeypatch):
+    trees = load_script(script)
+    mtime = script.stat().st_mtime_ns + 10**9
+    os.utime(script, ns=(mtime, mtime))
+    load_script(script)
+    header = cache._HEADER.unpack_from(cache_path(script).read_bytes())
+    assert header[3] == mtime
+
+    monkeypatch.setattr(cache.hashlib, "sha256", None)
+    monkeypatch.setattr(cache, "compile_script", fail_compile)
+    assert load_script(script) == trees
+
+
+def test_changed_source_invalidates_cache(script):
+    load_script(script)
+    script.write_text("var b = 5\n")
+    assert load_script(script) == [AssignmentNode("b", NumberNode(Decimal("5")))]
+
+
+def test_changed_version_invalidates_cache(script, monkeypatch):
+    load_script(script)
+    monkeypatch.setattr(cache, "VERSION", "99.0.0")
+    calls = []
+    monkeypatch.setattr(cache, "compile_script", lambda text: calls.append(text) or [])
+    load_script(script)
+    assert len(calls) == 1
+
+
+def test_corrupted_cache_is_rebuilt(script):
+    trees = load_script(script)
+    path = cache_path(script)
+    path.write_bytes(path.read_bytes()[:-10])
+    assert load_script(script) == trees
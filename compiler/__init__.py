@@ -0,0 +1 @@
+from .compiler import CompileError, compile_expression, compile_program
@@ -0,0 +1,332 @@
+"""Compile trees into Python functions.
+
+A tree becomes the source of a single function taking a symbol table, which is
+then compiled by Python. Operands are computed as raw Decimals, conditions as
+Python booleans, and only the result is wrapped into a value object, so no
+values are created for intermediate results and there is no dispatch per node.
+
+The function gives the same results and raises the same errors in the same order
+as `Interpreter.visit`, as long as variables hold scalars. Reading an array or a
+function raises `AttributeError`, and the caller has to interpret the tree.
+
+A program becomes one function running all of its statements. Variables it
+defines are also kept in local variables of that function, so the statements
+after a definition read them without looking them up in the symbol table.
+"""
+
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from interpreter import SymbolTable
+from interpreter.fast_math import power
+from interpreter.values import False_, Number, True_
+from nodes import (
+    AddNode,
+    AndNode,
+    AssignmentNode,
+    DivideNode,
+    DoubleEqualsNode,
+    GreaterThanNode,
+    GreaterThanOrEqualsNode,
+    LessThanNode,
+    LessThanOrEqualsNode,
+    LetNode,
+    MinusNode,
+    ModuloNode,
+    MultiplyNode,
+    Node,
+    NotEqualsNode,
+    NotNode,
+    NumberNode,
+    OrNode,
+    PlusNode,
+    PowerNode,
+    ProgramNode,
+    SubtractNode,
+    TempNode,
+    ValueAccessNode,
+)
+
+CompiledExpression = Callable[[SymbolTable], Any]
+# Takes the symbol table and a function called with the value of every
+# statement which isn't a definition.
+CompiledProgram = Callable[[SymbolTable, Callable[[Any], None]], None]
+
+_ARITHMETIC_OPERATORS = {AddNode: "+", SubtractNode: "-", MultiplyNode: "*"}
+_COMPARISON_OPERATORS = {
+    LessThanNode: "<",
+    GreaterThanNode: ">",
+    LessThanOrEqualsNode: "<=",
+    GreaterThanOrEqualsNode: ">=",
+    DoubleEqualsNode: "==",
+    NotEqualsNode: "!=",
+}
+_ARITHMETIC = (
+    AddNode,
+    SubtractNode,
+    MultiplyNode,
+    DivideNode,
+    ModuloNode,
+    PowerNode,
+    MinusNode,
+)
+_CONDITIONS = tuple(_COMPARISON_OPERATORS) + (AndNode, OrNode, NotNode)
+
+
+class CompileError(Exception):
+    pass
+
+
+def compile_expression(node: Node) -> CompiledExpression:
+    """Compile a tree into a function evaluating it against a symbol table."""
+
+    generator = _Generator()
+    return _load(lambda: generator.function(node), generator)  # type: ignore
+
+
+def compile_program(node: ProgramNode) -> CompiledProgram:
+    """Compile a program into a function running its statements in order."""
+
+    generator = _Generator()
+    return _load(lambda: generator.program(node), generator)  # type: ignore
+
+
+def _load(generate: Callable[[], str], generator: "_Generator") -> Callable[..., Any]:
+    try:
+        code = compile(generate(), "<catsby>", "exec")
+    except (SyntaxError, RecursionError, MemoryError) as error:
+        # Trees nested too deeply for the generator or for Python's compiler.
+        raise CompileError(f"The tree is too deep to compile: {error}")
+    namespace = dict(_RUNTIME)
+    namespace.update(generator.constants)
+    exec(code, namespace)
+    return namespace["evaluate"]  # type: ignore
+
+
+def _undefined(name: str) -> Any:
+    raise Exception(f"'{name}' is not defined")
+
+
+def _define(table: SymbolTable, name: str, value: Any) -> Any:
+    if table.get(name) is not None:
+        raise Exception(f"'{name}' is already defined")
+    table.set(name, value)
+    return value
+
+
+def _divide(a: Decimal, b: Decimal) -> Decimal:
+    try:
+        return a / b
+    except ZeroDivisionError:
+        raise Exception("Runtime math error")
+
+
+def _modulo(a: Decimal, b: Decimal) -> Decimal:
+    try:
+        return a % b
+    except ZeroDivisionError:
+        raise Exception("Runtime math error")
+
+
+def _base(value: Decimal) -> Decimal:
+    if value < 0:
+        raise Exception("Division by zero error")
+    return value
+
+
+# The interpreter computes operands of a division inside its try block, so a
+# ZeroDivisionError of a power in them becomes a runtime math error too.
+
+
+def _power_in_division(base: Decimal, exponent: Decimal) -> Decimal:
+    try:
+        return power(base, exponent)
+    except ZeroDivisionError:
+        raise Exception("Runtime math error")
+
+
+def _temporary_in_division(compute: Callable[[], Decimal]) -> Decimal:
+    try:
+        return compute()
+    except ZeroDivisionError:
+        raise Exception("Runtime math error")
+
+
+_UNSET = object()
+
+_RUNTIME: Dict[str, Any] = {
+    "Number": Number,
+    "_TRUE": True_(),
+    "_FALSE": False_(),
+    "_ONE": True_().value,
+    "_ZERO": False_().value,
+    "_UNSET": _UNSET,
+    "_undefined": _undefined,
+    "_define": _define,
+    "_divide": _divide,
+    "_modulo": _modulo,
+    "_base": _base,
+    "_power": power,
+    "_power_in_division": _power_in_division,
+    "_temporary_in_division": _temporary_in_division,
+}
+
+
+class _Generator:
+    __slots__ = (
+        "constants",
+        "_constant_names",
+        "_variables",
+        "_temporaries",
+        "_helpers",
+        "_division",
+    )
+
+    def __init__(self) -> None:
+        self.constants: Dict[str, Decimal] = {}
+        # Keyed by text, which tells apart equal numbers like 1 and 1.0.
+        self._constant_names: Dict[str, str] = {}
+        # Local variables holding the values of the variables defined so far.
+        self._variables: Dict[str, str] = {}
+        self._temporaries: Dict[int, Node] = {}
+        self._helpers: List[str] = []
+        self._division = 0
+
+    def function(self, node: Node) -> str:
+        lines = ["def evaluate(table):", "    get = table.get"]
+        lines.extend(f"    {line}" for line in self._statement(node, "return {}"))
+        return "\n".join(lines) + "\n"
+
+    def program(self, node: ProgramNode) -> str:
+        lines = ["def evaluate(table, emit):", "    get = table.get"]
+        for statement in node.statements:
+            lines.extend(
+                f"    {line}" for line in self._statement(statement, "emit({})")
+            )
+        return "\n".join(lines) + "\n"
+
+    def _statement(self, node: Node, result: str) -> List[str]:
+        """Generate the lines of a statement, passing its value to `result`."""
+
+        # Temporaries are numbered per statement.
+        self._temporaries = {}
+        self._helpers = []
+        if isinstance(node, AssignmentNode):
+            value = self.value(node.value)
+            variable = self._variables[node.name] = f"_v{len(self._variables)}"
+            body = [f"{variable} = _define(table, {node.name!r}, {value})"]
+        else:
+            body = [result.format(self.value(node))]
+        lines = [f"_t{index} = _UNSET" for index in self._temporaries]
+        return lines + self._helpers + body
+
+    def value(self, node: Node) -> str:
+        """Generate an expression computing the value object of a tree."""
+
+        if isinstance(node, NumberNode):
+            return f"Number({self._constant(node)})"
+        if isinstance(node, ValueAccessNode):
+            return self._lookup(node.name)
+        if isinstance(node, PlusNode):
+            return self.value(node.node)
+        if isinstance(node, LetNode):
+            self._declare(node)
+            return self.value(node.body)
+        if isinstance(node, _ARITHMETIC):
+            return f"Number({self.decimal(node)})"
+        if isinstance(node, _CONDITIONS):
+            return f"(_TRUE if {self.condition(node)} else _FALSE)"
+        raise CompileError(f"Can't compile {type(node).__name__}")
+
+    def decimal(self, node: Node) -> str:
+        """Generate an expression computing the Decimal value of a tree."""
+
+        node_type = type(node)
+        if node_type is NumberNode:
+            return self._constant(node)  # type: ignore
+        if node_type is ValueAccessNode:
+            return f"{self._lookup(node.name)}.value"  # type: ignore
+        operator = _ARITHMETIC_OPERATORS.get(node_type)
+        if operator is not None:
+            a = self.decimal(node.node_a)  # type: ignore
+            return f"({a} {operator} {self.decimal(node.node_b)})"  # type: ignore
+        if node_type is DivideNode or node_type is ModuloNode:
+            helper = "_divide" if node_type is DivideNode else "_modulo"
+            self._division += 1
+            a = self.decimal(node.node_a)  # type: ignore
+            b = self.decimal(node.node_b)  # type: ignore
+            self._division -= 1
+            return f"{helper}({a}, {b})"
+        if node_type is PowerNode:
+            helper = "_power_in_division" if self._division else "_power"
+            base = self.decimal(node.node)  # type: ignore
+            exponent = self.decimal(node.power)  # type: ignore
+            return f"{helper}(_base({base}), {exponent})"
+        if node_type is PlusNode:
+            return self.decimal(node.node)  # type: ignore
+        if node_type is MinusNode:
+            return f"(-{self.decimal(node.node)})"  # type: ignore
+        if node_type is LetNode:
+            self._declare(node)  # type: ignore
+            return self.decimal(node.body)  # type: ignore
+        if node_type is TempNode:
+            index = node.index  # type: ignore
+            if index not in self._temporaries:
+                raise CompileError(f"Temporary {index} is not declared")
+            compute = f"_temp{index}()"
+            if self._division:
+                compute = f"_temporary_in_division(_temp{index})"
+            return f"(_t{index} if _t{index} is not _UNSET else {compute})"
+        if isinstance(node, _CONDITIONS):
+            return f"(_ONE if {self.condition(node)} else _ZERO)"
+        raise CompileError(f"Can't compile {node_type.__name__}")
+
+    def condition(self, node: Node) -> str:
+        """Generate an expression computing the truth of a tree."""
+
+        node_type = type(node)
+        operator = _COMPARISON_OPERATORS.get(node_type)
+        if operator is not None:
+            a = self.decimal(node.node_a)  # type: ignore
+            return f"({a} {operator} {self.decimal(node.node_b)})"  # type: ignore
+        if node_type is AndNode:
+            a = self.condition(node.node_a)  # type: ignore
+            return f"({a} and {self.condition(node.node_b)})"  # type: ignore
+        if node_type is OrNode:
+            a = self.condition(node.node_a)  # type: ignore
+            return f"({a} or {self.condition(node.node_b)})"  # type: ignore
+        if node_type is NotNode:
+            return f"(not {self.condition(node.node)})"  # type: ignore
+        return f"bool({self.decimal(node)})"
+
+    def _constant(self, node: NumberNode) -> str:
+        text = str(node.value)
+        name = self._constant_names.get(text)
+        if name is None:
+            name = self._constant_names[text] = f"_c{len(self.constants)}"
+            self.constants[name] = node.value
+        return name
+
+    def _lookup(self, name: str) -> str:
+        variable = self._variables.get(name)
+        if variable is not None:
+            return variable
+        return f"(get({name!r}) or _undefined({name!r}))"
+
+    def _declare(self, node: LetNode) -> None:
+        index = node.index
+        if index in self._temporaries:
+            raise CompileError(f"Temporary {index} is declared twice")
+        self._temporaries[index] = node.value
+        division = self._division
+        self._division = 0
+        value = self.decimal(node.value)
+        self._division = division
+        self._helpers.extend(
+            [
+                f"def _temp{index}():",
+                f"    nonlocal _t{index}",
+                f"    _t{index} = {value}",
+                f"    return _t{index}",
+            ]
+        )
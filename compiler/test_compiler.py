@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+import pytest
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.values import False_, Number, True_
+from lexer import Lexer
+from nodes import TempNode
+from optimizer import eliminate_common_subexpressions
+from parser_ import Parser
+
+from .compiler import CompileError, compile_expression, compile_program
+
+SOURCES = [
+    "1.50 + 2 * 3 - 4 / 8 % 3",
+    "+a",
+    "-a + +b",
+    "a ^ 2 ^ 0.5",
+    "(a * b + c) / (a * b + c + 1)",
+    "a < b && b <= c || !(c >= a) && a != b == (c > 0)",
+    "(a < b) * 3 + (!c)",
+    "b / (a - a)",
+    "b % (a - a)",
+    "(0 - a) ^ 2",
+    "c ^ 2 / (0 ^ (0 - 1))",
+    "0 ^ (0 - 1)",
+    "(a - a) / (a - a)",
+    "undefined + 1",
+    "a > 100 && undefined",
+    "a < 100 || undefined",
+    "flag",
+    "flag + 1",
+    "var x = a * b",
+    "var a = 1",
+    "var x = (c ^ 2 / (0 ^ (0 - 1))) + (c ^ 2 / (0 ^ (0 - 1)))",
+]
+
+PROGRAMS = [
+    "var x = a * b; x + 1; var y = x * x\ny - x",
+    "a; var x = b; x / (a - a); var y = 1",
+    "var x = 1; var y = x + a\n\nvar x = y; y",
+    "var z = (a + 1) * (a + 1); z + (a + 1) * (a + 1)",
+    "",
+]
+
+ENVIRONMENTS = [
+    {"a": "2", "b": "3.5", "c": "-4"},
+    {"a": "0.1", "b": "0", "c": "7.25"},
+]
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse()
+
+
+def table(values):
+    table = SymbolTable()
+    for name, value in values.items():
+        table.set(name, Number(Decimal(value)))
+    table.set("flag", True_())
+    return table
+
+
+def outcome(evaluate, values):
+    symbols = table(values)
+    try:
+        result = evaluate(symbols)
+    except Exception as error:
+        return type(error), str(error)
+    return result, repr(result), symbols.get("x")
+
+
+@pytest.mark.parametrize("values", ENVIRONMENTS)
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_same_as_interpreter(source, values, optimize):
+    tree = parse(source)
+    if optimize:
+        tree = eliminate_common_subexpressions(tree)
+    code = compile_expression(tree)
+    expected = outcome(lambda symbols: Interpreter(symbols).visit(tree), values)
+    assert outcome(code, values) == expected
+
+
+def run(execute, values):
+    symbols = table(values)
+    emitted = []
+    try:
+        execute(symbols, emitted.append)
+    except Exception as error:
+        emitted.append((type(error), str(error)))
+    return emitted, symbols.get("x"), symbols.get("y")
+
+
+@pytest.mark.parametrize("values", ENVIRONMENTS)
+@pytest.mark.parametrize("source", PROGRAMS)
+@pytest.mark.parametrize("optimize", [False, True])
+def test_program_same_as_interpreter(source, values, optimize):
+    program = Parser(Lexer(source).generate_tokens()).parse_program()
+    if optimize:
+        program = eliminate_common_subexpressions(program)
+    code = compile_program(program)
+    expected = run(
+        lambda symbols, emit: Interpreter(symbols).execute(program, emit), values
+    )
+    assert run(code, values) == expected
+
+
+def test_value_types():
+    symbols = table({"a": "1"})
+    assert compile_expression(parse("a < 2"))(symbols) is True_()
+    assert compile_expression(parse("!flag"))(symbols) is False_()
+    assert compile_expression(parse("+flag"))(symbols) is symbols.get("flag")
+    assert type(compile_expression(parse("-flag"))(symbols)) is Number
+
+
+def test_unsupported_tree():
+    with pytest.raises(CompileError):
+        compile_expression(TempNode(0))
+
+
+@pytest.mark.parametrize("terms", [300, 3000])
+def test_deep_trees_are_not_compiled(terms):
+    node = Parser(Lexer(" + ".join(["1"] * terms)).generate_tokens()).parse()
+    with pytest.raises(CompileError, match="too deep"):
+        compile_expression(node)
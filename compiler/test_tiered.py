@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from interpreter.values import Number
+from lexer import Lexer
+from nodes import AddNode, LetNode, NumberNode, TempNode
+from parser_ import Parser
+
+from .tiered import TieredInterpreter
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse()
+
+
+def test_tier_up_after_threshold():
+    interpreter = TieredInterpreter(threshold=3, background=False)
+    interpreter.visit(parse("var a = 2"))
+    tree = parse("a * 3 + 1")
+    for _ in range(5):
+        assert interpreter.visit(tree) == Number(Decimal("7"))
+    assert interpreter.stats.interpreted == 4
+    assert interpreter.stats.compiled == 2
+    assert interpreter.stats.tier_ups == 1
+
+
+def test_arrays_are_interpreted():
+    np = pytest.importorskip("numpy")
+    from interpreter.arrays import Array
+
+    interpreter = TieredInterpreter(threshold=1, background=False)
+    interpreter.visit(parse("var a = 2"))
+    tree = parse("a + 1")
+    interpreter.visit(tree)
+    interpreter._symbol_table.set("a", Array.from_numpy(np.array([1.0, 2.0])))
+    assert repr(interpreter.visit(tree)) == "[2, 3]"
+    assert interpreter.stats.compiled == 0
+
+
+def test_functions_used_as_numbers_are_interpreted():
+    interpreter = TieredInterpreter(threshold=1, background=False)
+    interpreter.visit(parse("fun f(x) = x"))
+    tree = parse("f * 2 + 1")
+    for _ in range(2):
+        with pytest.raises(Exception, match="Expected a number or an array, got <fun"):
+            interpreter.visit(tree)
+
+
+def test_background_compilation():
+    with ThreadPoolExecutor(1) as executor:
+        interpreter = TieredInterpreter(threshold=2, executor=executor)
+        interpreter.visit(parse("var a = 2"))
+        tree = parse("a ^ 0.5 > 1")
+        for _ in range(2):
+            interpreter.visit(tree)
+        interpreter.join()
+        assert interpreter.stats.tier_ups == 1
+        interpreter.visit(tree)
+        assert interpreter.stats.compiled == 1
+
+
+def test_compiled_code_sees_new_values():
+    interpreter = TieredInterpreter(threshold=1, background=False)
+    interpreter.visit(parse("var a = 2"))
+    tree = parse("a + 1")
+    interpreter.visit(tree)
+    interpreter._symbol_table.set("a", Number(Decimal("5")))
+    assert interpreter.visit(tree) == Number(Decimal("6"))
+    assert interpreter.stats.compiled == 1
+
+
+def test_failing_evaluations_are_not_counted():
+    interpreter = TieredInterpreter(threshold=1, background=False)
+    tree = parse("1 / (2 - 2)")
+    for _ in range(2):
+        with pytest.raises(Exception, match="Runtime math error"):
+            interpreter.visit(tree)
+    assert interpreter.stats.interpreted == 0
+    assert interpreter.stats.compiled == 0
+
+
+def test_unsupported_tree_stays_interpreted():
+    interpreter = TieredInterpreter(threshold=1, background=False)
+    one = NumberNode(Decimal("1"))
+    tree = LetNode(0, one, TempNode(0))
+    for _ in range(3):
+        assert interpreter.visit(tree) == Number(Decimal("1"))
+    assert interpreter.stats.failures == 1
+    assert interpreter.stats.interpreted == 3
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_deep_tree_stays_interpreted(background):
+    interpreter = TieredInterpreter(threshold=2, background=background)
+    tree = Parser(Lexer(" + ".join(["1"] * 300)).generate_tokens()).parse()
+    for _ in range(3):
+        assert interpreter.visit(tree) == Number(Decimal("300"))
+        interpreter.join()
+    assert interpreter.stats.failures == 1
+    assert interpreter.stats.tier_ups == 0
+
+
+def test_fork_keeps_settings():
+    interpreter = TieredInterpreter(threshold=1, background=False)
+    fork = interpreter.fork()
+    tree = AddNode(NumberNode(Decimal("1")), NumberNode(Decimal("2")))
+    fork.visit(tree)
+    fork.visit(tree)
+    assert fork.stats.compiled == 1
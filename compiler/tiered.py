@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from interpreter import Interpreter, SymbolTable
+from nodes import Node
+
+from .compiler import CompiledExpression, CompileError, compile_expression
+
+DEFAULT_THRESHOLD = 100
+MAX_PROFILES = 4096
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(1, thread_name_prefix="catsby-compiler")
+        return _executor
+
+
+@dataclass
+class TierStats:
+    interpreted: int = 0
+    compiled: int = 0
+    tier_ups: int = 0
+    failures: int = 0
+    saved_time: float = 0.0
+
+
+class _Profile:
+    __slots__ = "node", "count", "interpreted_time", "code"
+
+    def __init__(self, node: Node) -> None:
+        self.node = node
+        self.count = 0
+        self.interpreted_time = 0.0
+        self.code: Optional[CompiledExpression] = None
+
+
+class TieredInterpreter(Interpreter):
+    """Interpreter which compiles trees once they have been evaluated often.
+
+    Every tree is walked by `Interpreter.visit` and counted. When a tree reaches
+    `threshold` evaluations, it is compiled on `executor`, a shared background
+    thread by default, or right away if `executor` is None and `background` is
+    False. The compiled code is swapped in by a single attribute assignment and
+    used from the next evaluation on. Trees the compiler doesn't support stay
+    interpreted.
+    """
+
+    __slots__ = (
+        "_threshold",
+        "_executor",
+        "_profiles",
+        "_pending",
+        "_evaluating",
+        "stats",
+    )
+
+    def __init__(
+        self,
+        symbol_table: Optional[SymbolTable] = None,
+        threshold: int = DEFAULT_THRESHOLD,
+        executor: Optional[Executor] = None,
+        background: bool = True,
+    ) -> None:
+        super().__init__(symbol_table)
+        self._threshold = threshold
+        if executor is None and background:
+            executor = _default_executor()
+        self._executor = executor
+        self._profiles: Dict[int, _Profile] = {}
+        self._pending: List[Future[None]] = []
+        self._evaluating = False
+        self.stats = TierStats()
+
+    def fork(self) -> TieredInterpreter:
+        interpreter = type(self)(
+            self._symbol_table.fork(),
+            self._threshold,
+            self._executor,
+            self._executor is not None,
+        )
+        interpreter.recorder = self.recorder
+        return interpreter
+
+    def join(self) -> None:
+        """Wait until every scheduled compilation is finished."""
+
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def visit(self, node: Node) -> Any:
+        # Compiled code doesn't visit nodes, so it can't be recorded.
+        if self._evaluating or self.recorder is not None:
+            return super().visit(node)
+
+        profile = self._profiles.get(id(node))
+        if profile is None or profile.node is not node:
+            if len(self._profiles) >= MAX_PROFILES:
+                self._profiles.clear()
+            profile = self._profiles[id(node)] = _Profile(node)
+
+        code = profile.code
+        if code is not None:
+            start = perf_counter()
+            try:
+                result = code(self._symbol_table)
+            except AttributeError:
+                # A variable holds an array or a function, interpret instead.
+                pass
+            else:
+                elapsed = perf_counter() - start
+                self.stats.compiled += 1
+                self.stats.saved_time += (
+                    profile.interpreted_time / profile.count - elapsed
+                )
+                return result
+
+        start = perf_counter()
+        self._evaluating = True
+        try:
+            result = super().visit(node)
+        finally:
+            self._evaluating = False
+        profile.interpreted_time += perf_counter() - start
+        profile.count += 1
+        self.stats.interpreted += 1
+        if profile.count == self._threshold:
+            self._tier_up(profile)
+        return result
+
+    def _tier_up(self, profile: _Profile) -> None:
+        if self._executor is None:
+            self._compile(profile)
+        else:
+            self._pending = [future for future in self._pending if not future.done()]
+            self._pending.append(self._executor.submit(self._compile, profile))
+
+    def _compile(self, profile: _Profile) -> None:
+        try:
+            code = compile_expression(profile.node)
+        except CompileError:
+            self.stats.failures += 1
+            return
+        self.stats.tier_ups += 1
+        profile.code = code
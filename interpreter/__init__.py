@@ -1,2 +1,3 @@
 from .interpreter import Interpreter
+from .symbol_table import SymbolTable
 
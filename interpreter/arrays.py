@@ -0,0 +1,223 @@
+"""Array values, evaluated element-wise with NumPy.
+
+`[1, 2, 3]` and `[1:100:2]` create arrays, and `a[i]` reads an element. Every
+operator applies to arrays element by element, and to an array and a scalar by
+combining the scalar with each element, so `xs * 2 + 1` is three vectorized
+passes over `xs` instead of an interpreted loop per element. Built-ins like
+`sum` take the elements of arrays as separate values.
+
+Elements are binary `float64`, or booleans for comparisons, not `Decimal`s, so
+unlike scalars they round like floats do. Errors match the scalar ones: a
+division by zero or an overflow in any element raises "Runtime math error".
+
+`Interpreter` evaluates scalar operands as before and calls the functions here
+only when an operand isn't a scalar, so the scalar path doesn't change. NumPy
+is optional, it's only needed once an array is created.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Callable, Iterator, List, Union
+
+from nodes import MAX_RANGE_SIZE
+
+from .values import BooleanValue, False_, Number, True_, to_boolean_value
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+_Operand = Union["np.ndarray", float]
+_UFunc = Callable[[Any, Any], Any]
+
+
+_SCALAR_TYPES = frozenset({Number, True_, False_})
+_BOOLEAN_TYPES = frozenset({True_, False_})
+
+
+class Array:
+    """Read-only one-dimensional array of floats or booleans."""
+
+    __slots__ = "elements"
+
+    def __init__(self, elements: np.ndarray) -> None:
+        elements.flags.writeable = False
+        self.elements = elements
+
+    @classmethod
+    def from_numpy(cls, array: np.ndarray, copy: bool = False) -> Array:
+        """Create an array from a NumPy array.
+
+        A `float64` or boolean array is wrapped through a read-only view without
+        copying it, so the caller mustn't write to it afterwards. Pass `copy` to
+        import an array which will still change. Other types are converted.
+        """
+
+        if array.ndim != 1:
+            raise Exception("Arrays must be one-dimensional")
+        if array.dtype != np.float64 and array.dtype != np.bool_:
+            return cls(array.astype(np.float64))
+        return cls(array.copy() if copy else array.view())
+
+    def to_numpy(self) -> np.ndarray:
+        """Get the elements as a read-only NumPy array, without copying them."""
+
+        return self.elements
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __iter__(self) -> Iterator[Any]:
+        for element in self.elements:
+            yield _to_value(element)
+
+    def __getitem__(self, index: int) -> Any:
+        return _to_value(self.elements[index])
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not Array:
+            return NotImplemented
+        return self.elements.dtype == other.elements.dtype and bool(
+            np.array_equal(self.elements, other.elements)
+        )
+
+    def __repr__(self) -> str:
+        if self.elements.dtype == np.bool_:
+            texts = ["true" if element else "false" for element in self.elements]
+        else:
+            texts = [
+                np.format_float_positional(element, trim="-")
+                for element in self.elements
+            ]
+        return f"[{', '.join(texts)}]"
+
+
+def check_operand(value: Any) -> None:
+    """Raise the error of an operand which is neither a scalar nor an array."""
+
+    if type(value) is not Array and type(value) not in _SCALAR_TYPES:
+        raise Exception(f"Expected a number or an array, got {value!r}")
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise Exception("Arrays need NumPy, which isn't installed")
+
+
+def array_of(values: List[Any]) -> Array:
+    """Create an array of evaluated elements."""
+
+    require_numpy()
+    kinds = set(map(type, values))
+    if not kinds.issubset(_SCALAR_TYPES):
+        for value in values:
+            if type(value) not in _SCALAR_TYPES:
+                raise Exception(f"Arrays hold numbers, got {value!r}")
+    if values and kinds.issubset(_BOOLEAN_TYPES):
+        return Array(np.array([value.value for value in values], dtype=np.bool_))
+    return Array(np.array([value.value for value in values], dtype=np.float64))
+
+
+def array_range(start: Decimal, stop: Decimal, step: Decimal) -> Array:
+    """Create the array from `start` to `stop` included, by `step`.
+
+    Like scalar ranges, it holds at most `MAX_RANGE_SIZE` elements.
+    """
+
+    require_numpy()
+    if step == 0:
+        raise Exception("The step of an array range can't be 0")
+    # Counted exactly, so the stop is included whenever a step lands on it.
+    span = stop - start
+    count = 0 if span * step < 0 else int(span // step) + 1
+    if count > MAX_RANGE_SIZE:
+        raise Exception(
+            f"The array range holds {count} elements, more than {MAX_RANGE_SIZE}"
+        )
+    last = start + step * (count - 1)
+    return Array(np.linspace(float(start), float(last), count))
+
+
+def element(array: Any, index: Decimal) -> Any:
+    if type(array) is not Array:
+        raise Exception(f"Only arrays can be indexed, got {array!r}")
+    if index != index.to_integral_value():
+        raise Exception(f"Index {index} is not an integer")
+    position = int(index)
+    if not -len(array) <= position < len(array):
+        raise Exception(f"Index {position} is out of range")
+    return array[position]
+
+
+def element_wise(name: str, value_a: Any, value_b: Any) -> Array:
+    """Apply the NumPy function `name` to operands of which one isn't a scalar.
+
+    `fmod` keeps the sign of the dividend, like `Decimal` does.
+    """
+
+    numbers_a, numbers_b = _numbers(value_a), _numbers(value_b)
+    return _apply(getattr(np, name), numbers_a, numbers_b)
+
+
+def power(base: Any, exponent: Any) -> Array:
+    bases, exponents = _numbers(base), _numbers(exponent)
+    if np.any(np.less(bases, 0)):
+        raise Exception("Division by zero error")
+    return _apply(np.power, bases, exponents)
+
+
+def negative(value: Any) -> Array:
+    return Array(np.negative(_numbers(value)))
+
+
+def logical(name: str, value_a: Any, value_b: Any) -> Array:
+    truths_a, truths_b = _truths(value_a), _truths(value_b)
+    return _apply(getattr(np, name), truths_a, truths_b)
+
+
+def logical_not(value: Any) -> Array:
+    return Array(np.logical_not(_truths(value)))
+
+
+def truth(value: Any) -> Array:
+    """Get the truths of the elements of an array."""
+
+    return Array(np.array(_truths(value), dtype=np.bool_))
+
+
+def _numbers(value: Any) -> _Operand:
+    if type(value) is Array:
+        elements = value.elements
+        if elements.dtype == np.bool_:
+            return elements.astype(np.float64)
+        return elements
+    check_operand(value)
+    return float(value.value)
+
+
+def _truths(value: Any) -> Any:
+    if type(value) is Array:
+        elements = value.elements
+        return elements if elements.dtype == np.bool_ else elements != 0
+    check_operand(value)
+    return bool(value.value)
+
+
+def _apply(ufunc: _UFunc, value_a: _Operand, value_b: _Operand) -> Array:
+    length_a, length_b = np.size(value_a), np.size(value_b)
+    if np.ndim(value_a) and np.ndim(value_b) and length_a != length_b:
+        raise Exception(f"Arrays of different lengths, {length_a} and {length_b}")
+    try:
+        with np.errstate(divide="raise", over="raise", invalid="raise"):
+            result = ufunc(value_a, value_b)
+    except FloatingPointError:
+        raise Exception("Runtime math error")
+    return Array(np.asarray(result))
+
+
+def _to_value(element: Any) -> Union[Number, BooleanValue]:
+    if type(element) is np.bool_:
+        return to_boolean_value(bool(element))
+    return Number(Decimal(np.format_float_positional(element, trim="-")))
@@ -0,0 +1,77 @@
+"""Built-in aggregate functions.
+
+`sum`, `prod`, `min`, `max` and `mean` take any number of values, ranges like
+`a1:a100` and patterns like `a*`, which stand for all variables of which the
+name starts with `a`. Calls look them up when no scope defines the name called,
+they aren't variables otherwise, so scripts may still use their names for
+variables.
+
+Sums are accumulated exactly and rounded once, to the precision of the current
+decimal context, so the result doesn't depend on the order of the values.
+Products are rounded at each step, like `*`: an exact product grows by the
+digits of every factor, which makes it quadratic in the number of values.
+"""
+
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, localcontext
+from functools import reduce
+from operator import mul
+from typing import Any, Callable, Dict, List
+
+from .values import False_, Number, True_
+
+# Rounds nothing for any values a `Decimal` can hold.
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+_VALUE_TYPES = frozenset({Number, True_, False_})
+
+_Aggregate = Callable[[List[Decimal]], Decimal]
+
+
+class Builtin:
+    __slots__ = "name", "_aggregate", "_allows_empty"
+
+    def __init__(self, name: str, aggregate: _Aggregate, allows_empty: bool) -> None:
+        self.name = name
+        self._aggregate = aggregate
+        self._allows_empty = allows_empty
+
+    def __repr__(self) -> str:
+        return f"<builtin {self.name}>"
+
+    def __call__(self, values: List[Any]) -> Number:
+        if not _VALUE_TYPES.issuperset(map(type, values)):
+            for value in values:
+                if type(value) not in _VALUE_TYPES:
+                    raise Exception(f"'{self.name}' takes numbers, got {value!r}")
+        decimals = [value.value for value in values]
+        if not decimals and not self._allows_empty:
+            raise Exception(f"'{self.name}' of no values")
+        return Number(self._aggregate(decimals))
+
+
+def _sum(values: List[Decimal]) -> Decimal:
+    with localcontext(_EXACT):
+        total = sum(values, Decimal(0))
+    return +total
+
+
+def _prod(values: List[Decimal]) -> Decimal:
+    return +reduce(mul, values, Decimal(1))
+
+
+def _mean(values: List[Decimal]) -> Decimal:
+    with localcontext(_EXACT):
+        total = sum(values, Decimal(0))
+    return total / len(values)
+
+
+BUILTINS: Dict[str, Builtin] = {
+    builtin.name: builtin
+    for builtin in [
+        Builtin("sum", _sum, allows_empty=True),
+        Builtin("prod", _prod, allows_empty=True),
+        Builtin("min", min, allows_empty=False),
+        Builtin("max", max, allows_empty=False),
+        Builtin("mean", _mean, allows_empty=False),
+    ]
+}
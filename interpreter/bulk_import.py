@@ -0,0 +1,175 @@
+"""Bulk import of numeric variables from CSV and JSON files.
+
+CSV files have a name and a value per row. JSON files hold a single object
+mapping names to numbers, or to strings of numbers for producers which would
+lose digits in JSON floats. Values are stored as `Number`s straight in a symbol
+table, without lexing, parsing or evaluating anything, and names have to be
+identifiers the lexer would accept.
+
+Rows are converted in chunks while the file is read. `json` can't parse a
+document incrementally, so a JSON file is parsed at once and then converted in
+chunks. Nothing is stored unless the whole file is valid.
+"""
+
+import csv
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, NoReturn, Optional, Set, Union
+
+from lexer.char_helpers import is_letter
+from lexer.lexer_helpers import is_identifier_char, is_keyword
+
+from .symbol_table import SymbolTable
+from .values import Number
+
+DEFAULT_CHUNK_SIZE = 10000
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Characters the lexer accepts in identifiers, for checking ASCII names in one go.
+_IDENTIFIER_CHARS = frozenset(filter(is_identifier_char, map(chr, range(128))))
+
+
+class BulkImportError(Exception):
+    pass
+
+
+def is_valid_identifier(name: str) -> bool:
+    """Check whether the lexer reads a name as a single identifier."""
+
+    if name.isascii():
+        valid_chars = _IDENTIFIER_CHARS.issuperset(name)
+    else:
+        valid_chars = all(is_identifier_char(char) for char in name)
+    return name != "" and is_letter(name[0]) and valid_chars and not is_keyword(name)
+
+
+def read_csv(
+    path: PathLike, header: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Number]]:
+    """Read variables from a CSV file, in chunks of up to `chunk_size` rows.
+
+    Empty rows are skipped, and so is the first row if `header` is True.
+    """
+
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        if header:
+            next(reader, None)
+        while True:
+            chunk: Dict[str, Number] = {}
+            rows = 0
+            for row in islice(reader, chunk_size):
+                rows += 1
+                if not row:
+                    continue
+                try:
+                    if len(row) != 2:
+                        raise BulkImportError("Expected a name and a value")
+                    name, value = row
+                    _add(chunk, name.strip(), value.strip())
+                except BulkImportError as error:
+                    # The reader counts physical lines, including quoted newlines.
+                    raise BulkImportError(f"{error} on line {reader.line_num}")
+            if chunk:
+                yield chunk
+            if rows < chunk_size:
+                return
+
+
+def read_json(
+    path: PathLike, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Number]]:
+    """Read variables from a JSON object, in chunks of up to `chunk_size`."""
+
+    with open(path) as file:
+        try:
+            pairs = json.load(
+                file,
+                parse_float=Decimal,
+                parse_int=Decimal,
+                parse_constant=_reject_constant,
+                object_pairs_hook=list,
+            )
+        except json.JSONDecodeError as error:
+            raise BulkImportError(f"Invalid JSON: {error}")
+    if not isinstance(pairs, list) or not all(type(pair) is tuple for pair in pairs):
+        raise BulkImportError("Expected a JSON object of names and numbers")
+
+    for start in range(0, len(pairs), chunk_size):
+        chunk: Dict[str, Number] = {}
+        for index in range(start, min(start + chunk_size, len(pairs))):
+            name, value = pairs[index]
+            try:
+                _add(chunk, name, value)
+            except BulkImportError as error:
+                raise BulkImportError(f"{error} in entry {index + 1}")
+        yield chunk
+
+
+def import_csv(
+    path: PathLike,
+    table: SymbolTable,
+    header: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Define the variables of a CSV file, return how many there are."""
+
+    return _import(read_csv(path, header, chunk_size), table)
+
+
+def import_json(
+    path: PathLike, table: SymbolTable, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """Define the variables of a JSON file, return how many there are."""
+
+    return _import(read_json(path, chunk_size), table)
+
+
+def _import(chunks: Iterable[Dict[str, Number]], table: SymbolTable) -> int:
+    defined = _defined_names(table)
+    symbols: Dict[str, Number] = {}
+    for chunk in chunks:
+        for name in symbols.keys() & chunk.keys():
+            raise BulkImportError(f"'{name}' is defined twice")
+        for name in defined & chunk.keys():
+            raise BulkImportError(f"'{name}' is already defined")
+        symbols.update(chunk)
+    table.update(symbols)
+    return len(symbols)
+
+
+def _defined_names(table: SymbolTable) -> Set[str]:
+    """Get names `table.get` finds a value for, in a pass over all scopes.
+
+    Updating the table takes a pass over it as well, so this is cheaper than a
+    lookup per imported name.
+    """
+
+    names: Set[str] = set()
+    scope: Optional[SymbolTable] = table
+    while scope is not None:
+        names.update(name for name, value in scope.items() if value is not None)
+        scope = scope.parent
+    return names
+
+
+def _add(chunk: Dict[str, Number], name: Any, value: Any) -> None:
+    if type(name) is not str or not is_valid_identifier(name):
+        raise BulkImportError(f"Invalid identifier {name!r}")
+    if name in chunk:
+        raise BulkImportError(f"'{name}' is defined twice")
+    if type(value) is str:
+        try:
+            value = Decimal(value)
+        except InvalidOperation:
+            raise BulkImportError(f"Invalid value of '{name}'")
+    if type(value) is not Decimal or not value.is_finite():
+        raise BulkImportError(f"Invalid value of '{name}'")
+    chunk[name] = Number(value)
+
+
+def _reject_constant(constant: str) -> NoReturn:
+    raise BulkImportError(f"Invalid number {constant}")
@@ -0,0 +1,48 @@
+"""Source positions of runtime errors.
+
+Like the profiler, this relies on every node being dispatched to a
+`visit_<NodeClass>` method taking the node. The traceback of an error raised
+while visiting therefore holds the nodes being evaluated, and the innermost one
+with a position in the `SourceMap` of the program is where the error happened.
+Nothing is recorded while evaluating, an error is located only when described.
+
+Nodes of user-defined function bodies are copies resolved at definition time
+and have no position, errors inside them point at the call.
+"""
+
+from typing import Optional
+
+from nodes import Node, ProgramNode, SourceMap
+
+from .interpreter import Interpreter
+
+
+def error_node(error: BaseException, source_map: SourceMap) -> Optional[Node]:
+    """Get the innermost node with a position being visited when `error` was raised."""
+
+    found: Optional[Node] = None
+    traceback = error.__traceback__
+    while traceback is not None:
+        frame = traceback.tb_frame
+        if frame.f_code.co_name.startswith("visit"):
+            variables = frame.f_locals
+            node = variables.get("node")
+            if (
+                isinstance(variables.get("self"), Interpreter)
+                and type(node) is not ProgramNode
+                and node in source_map
+            ):
+                found = node
+        traceback = traceback.tb_next
+    return found
+
+
+def describe_error(error: BaseException, source_map: SourceMap) -> str:
+    """Get the message of an error with the position of the node that raised it."""
+
+    node = error_node(error, source_map)
+    if node is None:
+        return str(error)
+    span = source_map.span(node)
+    assert span is not None
+    return f"{error} at {source_map.describe(span[0])}"
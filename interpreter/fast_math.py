@@ -0,0 +1,69 @@
+"""Fast paths for common powers.
+
+A fast path returns exactly what `Decimal.__pow__` returns in the current
+context, coefficient and exponent alike, or None if it can't guarantee that, in
+which case `**` is used.
+
+Integral exponents have none: `**` already computes them by squaring in C and
+doesn't always round like repeated multiplication does, so `x * x` may differ
+from `x ** 2` in the last digit.
+"""
+
+from decimal import ROUND_HALF_EVEN, Context, Decimal, getcontext
+from typing import Dict, Optional, Tuple
+
+# Last digits of a square root computed with `_GUARD_DIGITS` extra digits which
+# are too close to half a unit to tell how `**` rounds the result.
+_GUARD_DIGITS = 3
+_NEAR_HALF = {(4, 9, 9), (5, 0, 0), (5, 0, 1)}
+
+_HALF = Decimal("0.5")
+
+_WIDE_CONTEXTS: Dict[Tuple[int, int, int], Context] = {}
+
+
+def power(base: Decimal, exponent: Decimal) -> Decimal:
+    """Compute `base ** exponent` in the current context."""
+
+    if exponent == _HALF:
+        result = _square_root(base)
+        if result is not None:
+            return result
+    return base ** exponent
+
+
+def _square_root(base: Decimal) -> Optional[Decimal]:
+    context = getcontext()
+    if context.rounding != ROUND_HALF_EVEN or context.clamp or not base > 0:
+        return None
+
+    root = _wide_context(context).sqrt(base)
+    sign, digits, exponent = root.as_tuple()
+    prec = context.prec
+    padding = prec - len(digits)
+    if padding >= 0:
+        # The root is exact, an exact `**` result has all digits of the
+        # precision.
+        if exponent - padding < context.Etiny():  # type: ignore
+            return None
+        return Decimal((sign, digits + (0,) * padding, exponent - padding))
+
+    # Both results are correctly rounded, unless the digits after the last
+    # digit of the precision are close to half a unit.
+    tail = digits[prec:] + (0,) * (_GUARD_DIGITS + padding)
+    if tail in _NEAR_HALF:
+        return None
+    return context.plus(root)
+
+
+def _wide_context(context: Context) -> Context:
+    """Get a context with a few more digits than the given one."""
+
+    key = (context.prec, context.Emin, context.Emax)
+    wide = _WIDE_CONTEXTS.get(key)
+    if wide is None:
+        prec, Emin, Emax = key
+        wide = _WIDE_CONTEXTS[key] = Context(
+            prec=prec + _GUARD_DIGITS, Emin=Emin, Emax=Emax, traps=[]
+        )
+    return wide
@@ -0,0 +1,235 @@
+"""User-defined functions.
+
+A function is resolved once, when it is defined. Parameters in its body become
+`ParameterNode`s, which read slots of the list of arguments of a call, so a call
+creates no scope. Every other name is looked up in a fork of the scope the
+function was defined in, which also holds the function itself for recursion.
+
+Nothing can change that fork, so a function is pure unless it reads a name the
+fork doesn't hold itself, from a parent scope, or calls an impure function.
+Results of pure functions are cached per function, keyed by the exact values of
+the arguments, in an LRU cache of `FUNCTION_CACHE_SIZE` entries. `@nomemo`
+turns that off for functions which are cheaper to evaluate than to look up.
+"""
+
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from nodes import (
+    AssignmentNode,
+    FunctionDefinitionNode,
+    Node,
+    ParameterNode,
+    PatternNode,
+    ValueAccessNode,
+    child_fields,
+    free_variables,
+    list_fields,
+    walk,
+)
+
+from .builtins import BUILTINS
+from .cache_stats import CacheStats
+from .symbol_table import SymbolTable
+from .values import False_, Number, True_
+
+MAX_CALL_DEPTH = 100
+FUNCTION_CACHE_SIZE = 1024
+
+
+class Function:
+    __slots__ = (
+        "name",
+        "parameters",
+        "body",
+        "symbol_table",
+        "pure",
+        "memoized",
+        "stats",
+        "_cache",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parameters: Tuple[str, ...],
+        body: Node,
+        symbol_table: SymbolTable,
+        pure: bool = False,
+        memoize: bool = False,
+    ) -> None:
+        self.name = name
+        self.parameters = parameters
+        self.body = body
+        self.symbol_table = symbol_table
+        self.pure = pure
+        self.memoized = pure and memoize
+        self.stats = CacheStats()
+        self._cache: OrderedDict[Tuple[Hashable, ...], Tuple[Any, float]]
+        self._cache = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"<fun {self.name}({', '.join(self.parameters)})>"
+
+    def cache_key(self, arguments: List[Any]) -> Optional[Tuple[Hashable, ...]]:
+        """Get the cache key of a call, None if its result isn't cached.
+
+        Numbers are keyed by their text, which unlike `Decimal` equality keeps
+        apart values like 2 and 2.0 that lead to different results.
+        """
+
+        if not self.memoized:
+            return None
+        key: List[Hashable] = []
+        for argument in arguments:
+            kind = type(argument)
+            if kind is Number:
+                key.append(str(argument.value))
+            elif kind is True_ or kind is False_:
+                key.append(kind)
+            else:
+                return None
+        return tuple(key)
+
+    def lookup(self, key: Tuple[Hashable, ...]) -> Any:
+        """Get a cached result, None on a miss."""
+
+        entry = self._cache.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.stats.hits += 1
+        self.stats.saved_time += entry[1]
+        return entry[0]
+
+    def store(self, key: Tuple[Hashable, ...], result: Any, elapsed: float) -> None:
+        self._cache[key] = (result, elapsed)
+        if len(self._cache) > FUNCTION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+            self.stats.evictions += 1
+
+
+def define_function(
+    node: FunctionDefinitionNode, symbol_table: SymbolTable
+) -> Function:
+    """Create a function, resolving its body against the current scope."""
+
+    slots: Dict[str, int] = {}
+    for index, name in enumerate(node.parameters):
+        if name in slots:
+            raise Exception(f"Duplicate parameter '{name}'")
+        slots[name] = index
+
+    scope = symbol_table.fork()
+    body = _resolve(node.body, slots)
+    pure = _is_pure(node.name, body, scope)
+    function = Function(
+        node.name, tuple(node.parameters), body, scope, pure, node.memoize
+    )
+    scope.set(node.name, function)  # type: ignore
+    return function
+
+
+def function_definition(function: Function) -> FunctionDefinitionNode:
+    """Get the definition of a function, with its parameters read by name."""
+
+    return FunctionDefinitionNode(
+        function.name,
+        list(function.parameters),
+        _unresolve(function.body),
+        # Only pure functions are memoized, whether others would be is moot.
+        function.memoized or not function.pure,
+    )
+
+
+def restore_function(
+    node: FunctionDefinitionNode, symbol_table: SymbolTable, pure: bool
+) -> Function:
+    """Create a function known to be `pure` or not, with `symbol_table` as scope.
+
+    Unlike `define_function`, the scope isn't forked and purity isn't checked,
+    the function is expected to be in its scope already or to be set there.
+    """
+
+    slots = {name: index for index, name in enumerate(node.parameters)}
+    body = _resolve(node.body, slots)
+    return Function(
+        node.name, tuple(node.parameters), body, symbol_table, pure, node.memoize
+    )
+
+
+def function_stats(symbol_table: SymbolTable) -> Dict[str, CacheStats]:
+    """Get cache statistics of the memoized functions visible in a scope."""
+
+    stats: Dict[str, CacheStats] = {}
+    seen: Set[str] = set()
+    scope: Optional[SymbolTable] = symbol_table
+    while scope is not None:
+        for name, value in scope.items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if type(value) is Function and value.memoized:
+                stats[name] = value.stats
+        scope = scope.parent
+    return stats
+
+
+def _is_pure(name: str, body: Node, scope: SymbolTable) -> bool:
+    if any(type(node) is PatternNode for node in walk(body)):
+        # Patterns match variables of parent scopes as well.
+        return False
+    for free_name in free_variables(body):
+        if free_name == name:
+            continue
+        # Parent scopes may still change, the fork itself doesn't.
+        value = scope.get_local(free_name)
+        if value is None:
+            if free_name not in BUILTINS:
+                return False
+        elif type(value) is Function and not value.pure:
+            return False
+    return True
+
+
+def _resolve(node: Node, slots: Dict[str, int]) -> Node:
+    node_class = type(node)
+    if node_class is ValueAccessNode:
+        name = node.name  # type: ignore
+        index = slots.get(name)
+        return node if index is None else ParameterNode(index, name)
+    if node_class is AssignmentNode or node_class is FunctionDefinitionNode:
+        raise Exception("Definitions aren't allowed in function bodies")
+
+    names = child_fields(node_class)
+    if not names:
+        return node
+    lists = list_fields(node_class)
+    changes: Dict[str, Any] = {}
+    for name in names:
+        value = getattr(node, name)
+        if name in lists:
+            changes[name] = [_resolve(child, slots) for child in value]
+        else:
+            changes[name] = _resolve(value, slots)
+    return replace(node, **changes)  # type: ignore
+
+
+def _unresolve(node: Node) -> Node:
+    node_class = type(node)
+    if node_class is ParameterNode:
+        return ValueAccessNode(node.name)  # type: ignore
+    names = child_fields(node_class)
+    if not names:
+        return node
+    lists = list_fields(node_class)
+    changes: Dict[str, Any] = {}
+    for name in names:
+        value = getattr(node, name)
+        if name in lists:
+            changes[name] = [_unresolve(child) for child in value]
+        else:
+            changes[name] = _unresolve(value)
+    return replace(node, **changes)  # type: ignore
@@ -1,75 +1,290 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from itertools import tee
+from time import perf_counter
+from typing import Any, Callable, Iterable, List, Optional, Set, Type, TypeVar
+
 from nodes import (
     AddNode,
+    ArrayNode,
+    ArrayRangeNode,
     AssignmentNode,
+    CallNode,
+    FunctionDefinitionNode,
+    IndexNode,
     LessThanNode,
+    LetNode,
     MinusNode,
     Node,
     NotNode,
     NumberNode,
+    ParameterNode,
+    PatternNode,
     PlusNode,
     PowerNode,
+    ProgramNode,
+    RangeNode,
+    TempNode,
     ValueAccessNode,
 )
+from parser_ import Parser
+from tokens import Token
 
+from . import arrays, fast_math
+from .builtins import BUILTINS, Builtin
+from .functions import MAX_CALL_DEPTH, Function, define_function
+from .snapshot import PathLike, dump_snapshot, load_snapshot
+from .streaming import StreamingUnsupported, evaluate_tokens
 from .symbol_table import SymbolTable
-from .values import BooleanValue, Number, to_boolean_value
+from .tracing import TraceRecorder
+from .values import BooleanValue, False_, Number, True_, to_boolean_value
+
+InterpreterT = TypeVar("InterpreterT", bound="Interpreter")
+
+
+class Cancelled(BaseException):
+    """Raised by an evaluation of which `cancelled` was set.
+
+    It isn't an `Exception`, so that evaluation code handling errors lets it
+    through.
+    """
 
 
 class Interpreter:
-    __slots__ = "_symbol_table"
+    """Tree-walking interpreter.
+
+    If `recorder` is set, every visited node is recorded into it with its
+    result, which is meant for debugging, see `interpreter.tracing`. Forks
+    share the recorder.
+
+    Setting `cancelled`, from another thread, stops the evaluation at its next
+    call of a user function by raising `Cancelled`. Calls are the only way to
+    run long, anything else takes time proportional to the size of the input.
+    The flag stays set until it's cleared.
+    """
+
+    __slots__ = (
+        "recorder",
+        "cancelled",
+        "_symbol_table",
+        "_temporaries",
+        "_arguments",
+        "_depth",
+        "_level",
+    )
+
+    def __init__(
+        self,
+        symbol_table: Optional[SymbolTable] = None,
+        recorder: Optional[TraceRecorder] = None,
+    ) -> None:
+        if symbol_table is None:
+            symbol_table = SymbolTable()
+        self._symbol_table = symbol_table
+        self.recorder = recorder
+        self.cancelled = False
+        # Either the computed value of a temporary or its pending LetNode.
+        self._temporaries: List[Any] = []
+        # Arguments of the function being called and the number of calls in
+        # progress.
+        self._arguments: List[Any] = []
+        self._depth = 0
+        # Nesting level of the node being visited, while recording.
+        self._level = 0
+
+    def fork(self) -> Interpreter:
+        """Create an interpreter starting from a copy of this one's variables.
+
+        Forking is constant time, the copy shares memory with the original.
+        """
+
+        interpreter = type(self)(self._symbol_table.fork())
+        interpreter.recorder = self.recorder
+        return interpreter
+
+    def snapshot(self, path: PathLike) -> None:
+        """Save all variables with their scopes to a file."""
+
+        dump_snapshot(self._symbol_table, path)
+
+    @classmethod
+    def restore(cls: Type[InterpreterT], path: PathLike) -> InterpreterT:
+        """Create an interpreter from a snapshot without evaluating anything."""
+
+        return cls(load_snapshot(path))
+
+    def evaluate(self, tokens: Iterable[Token]) -> Any:
+        """Evaluate statements from their tokens, returning the last value.
+
+        The plain interpreter evaluates a single statement straight from the
+        tokens without building a tree, unless it defines or calls functions.
+        Subclasses may change how trees are visited, and recorded nodes need a
+        tree, so they parse first.
+        """
+
+        if type(self) is Interpreter and self.recorder is None:
+            tokens, replay = tee(tokens)
+            try:
+                return evaluate_tokens(tokens, self._symbol_table)
+            except StreamingUnsupported:
+                tokens = replay
+        statements = Parser(tokens).parse_program().statements
+        if len(statements) == 1:
+            return self.visit(statements[0])
+        return self.visit(ProgramNode(statements))
+
+    def execute(self, program: ProgramNode, emit: Callable[[Any], None]) -> None:
+        """Run the statements of a program, passing their values to `emit`.
 
-    def __init__(self) -> None:
-        self._symbol_table = SymbolTable()
+        Definitions have no value and aren't passed.
+        """
+
+        for statement in program.statements:
+            value = self.visit(statement)
+            if value is not None:
+                emit(value)
 
     def visit(self, node: Node) -> Number:
-        method_name = f"visit_{type(node).__name__}"
-        method = getattr(self, method_name)
-        return method(node)
+        recorder = self.recorder
+        if recorder is None:
+            method_name = f"visit_{type(node).__name__}"
+            method = getattr(self, method_name)
+            return method(node)
+
+        level = self._level
+        self._level = level + 1
+        try:
+            result = getattr(self, f"visit_{type(node).__name__}")(node)
+        except Exception as e:
+            self._level = level
+            recorder.record_error(node, e, level)
+            raise
+        self._level = level
+        # `TraceRecorder.record`, inlined as it runs for every node.
+        push = recorder.push
+        push(node)
+        push(result)
+        push(level)
+        return result
 
     def visit_NumberNode(self, node: NumberNode) -> Number:
         return Number(node.value)
 
+    # Operands which aren't scalars have no `value`, operators on them are left
+    # to `arrays`. The value of the left operand is read before the right one
+    # is evaluated, as the compiler and streaming evaluation do.
+
     def visit_AddNode(self, node: AddNode) -> Number:
-        return Number(self.visit(node.node_a).value + self.visit(node.node_b).value)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("add", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return Number(a + value_b.value)
+        except AttributeError:
+            return arrays.element_wise("add", value_a, value_b)
 
     def visit_SubtractNode(self, node: AddNode) -> Number:
-        return Number(self.visit(node.node_a).value - self.visit(node.node_b).value)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("subtract", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return Number(a - value_b.value)
+        except AttributeError:
+            return arrays.element_wise("subtract", value_a, value_b)
 
     def visit_MultiplyNode(self, node: AddNode) -> Number:
-        return Number(self.visit(node.node_a).value * self.visit(node.node_b).value)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("multiply", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return Number(a * value_b.value)
+        except AttributeError:
+            return arrays.element_wise("multiply", value_a, value_b)
 
     def visit_DivideNode(self, node: AddNode) -> Number:
         try:
-            return Number(self.visit(node.node_a).value / self.visit(node.node_b).value)
+            value_a = self.visit(node.node_a)
+            try:
+                a = value_a.value
+            except AttributeError:
+                return self._element_wise("true_divide", value_a, node.node_b)
+            value_b = self.visit(node.node_b)
+            try:
+                return Number(a / value_b.value)
+            except AttributeError:
+                return arrays.element_wise("true_divide", value_a, value_b)
         except ZeroDivisionError:
             raise Exception("Runtime math error")
 
     def visit_ModuloNode(self, node: AddNode) -> Number:
         try:
-            return Number(self.visit(node.node_a).value % self.visit(node.node_b).value)
+            value_a = self.visit(node.node_a)
+            try:
+                a = value_a.value
+            except AttributeError:
+                return self._element_wise("fmod", value_a, node.node_b)
+            value_b = self.visit(node.node_b)
+            try:
+                return Number(a % value_b.value)
+            except AttributeError:
+                return arrays.element_wise("fmod", value_a, value_b)
         except ZeroDivisionError:
             raise Exception("Runtime math error")
 
     def visit_PowerNode(self, node: PowerNode) -> Number:
-        value = self.visit(node.node).value
+        base = self.visit(node.node)
+        try:
+            value = base.value
+        except AttributeError:
+            arrays.check_operand(base)
+            return arrays.power(base, self.visit(node.power))
         if value < 0:
             raise Exception("Division by zero error")
-        power = self.visit(node.power).value
-        return Number(value ** power)
+        exponent = self.visit(node.power)
+        try:
+            power = exponent.value
+        except AttributeError:
+            return arrays.power(base, exponent)
+        return Number(fast_math.power(value, power))
 
     def visit_PlusNode(self, node: PlusNode) -> Number:
         return self.visit(node.node)
 
     def visit_MinusNode(self, node: MinusNode) -> Number:
-        return Number(-self.visit(node.node).value)
+        value = self.visit(node.node)
+        try:
+            return Number(-value.value)
+        except AttributeError:
+            return arrays.negative(value)
 
     def visit_ValueAccessNode(self, node: ValueAccessNode) -> Number:
-        name = node.name
+        return self._lookup(node.name)
+
+    def _lookup(self, name: str) -> Number:
         value = self._symbol_table.get(name)
         if value is None:
             raise Exception(f"'{name}' is not defined")
         return value
 
+    def _lookup_all(self, names: Iterable[str]) -> List[Number]:
+        get = self._symbol_table.get
+        values = [get(name) for name in names]
+        if None in values:
+            for name, value in zip(names, values):
+                if value is None:
+                    raise Exception(f"'{name}' is not defined")
+        return values  # type: ignore
+
     def visit_AssignmentNode(self, node: AssignmentNode) -> None:
         name = node.name
         value = self.visit(node.value)
@@ -78,37 +293,252 @@ class Interpreter:
         self._symbol_table.set(name, value)
 
     def visit_LessThanNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = self.visit(node.node_a).value < self.visit(node.node_b).value
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("less", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return to_boolean_value(a < value_b.value)
+        except AttributeError:
+            return arrays.element_wise("less", value_a, value_b)
 
     def visit_GreaterThanNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = self.visit(node.node_a).value > self.visit(node.node_b).value
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("greater", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return to_boolean_value(a > value_b.value)
+        except AttributeError:
+            return arrays.element_wise("greater", value_a, value_b)
 
     def visit_LessThanOrEqualsNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = self.visit(node.node_a).value <= self.visit(node.node_b).value
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("less_equal", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return to_boolean_value(a <= value_b.value)
+        except AttributeError:
+            return arrays.element_wise("less_equal", value_a, value_b)
 
     def visit_GreaterThanOrEqualsNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = self.visit(node.node_a).value >= self.visit(node.node_b).value
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("greater_equal", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return to_boolean_value(a >= value_b.value)
+        except AttributeError:
+            return arrays.element_wise("greater_equal", value_a, value_b)
 
     def visit_DoubleEqualsNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = self.visit(node.node_a).value == self.visit(node.node_b).value
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("equal", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return to_boolean_value(a == value_b.value)
+        except AttributeError:
+            return arrays.element_wise("equal", value_a, value_b)
 
     def visit_NotEqualsNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = self.visit(node.node_a).value != self.visit(node.node_b).value
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            a = value_a.value
+        except AttributeError:
+            return self._element_wise("not_equal", value_a, node.node_b)
+        value_b = self.visit(node.node_b)
+        try:
+            return to_boolean_value(a != value_b.value)
+        except AttributeError:
+            return arrays.element_wise("not_equal", value_a, value_b)
 
     def visit_AndNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = bool(self.visit(node.node_a).value and self.visit(node.node_b).value)
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            if not value_a.value:
+                return False_()
+        except AttributeError:
+            arrays.check_operand(value_a)
+            return arrays.logical("logical_and", value_a, self.visit(node.node_b))
+        return self._truth(self.visit(node.node_b))
 
     def visit_OrNode(self, node: LessThanNode) -> BooleanValue:
-        is_true = bool(self.visit(node.node_a).value or self.visit(node.node_b).value)
-        return to_boolean_value(is_true)
+        value_a = self.visit(node.node_a)
+        try:
+            if value_a.value:
+                return True_()
+        except AttributeError:
+            arrays.check_operand(value_a)
+            return arrays.logical("logical_or", value_a, self.visit(node.node_b))
+        return self._truth(self.visit(node.node_b))
 
     def visit_NotNode(self, node: NotNode) -> BooleanValue:
-        is_true = not self.visit(node.node).value
-        return to_boolean_value(is_true)
+        value = self.visit(node.node)
+        try:
+            return to_boolean_value(not value.value)
+        except AttributeError:
+            return arrays.logical_not(value)
+
+    def _element_wise(self, name: str, value_a: Any, node_b: Node) -> Any:
+        """Apply an operator to a left operand which isn't a scalar."""
+
+        arrays.check_operand(value_a)
+        return arrays.element_wise(name, value_a, self.visit(node_b))
+
+    def _truth(self, value: Any) -> BooleanValue:
+        try:
+            return to_boolean_value(bool(value.value))
+        except AttributeError:
+            return arrays.truth(value)
+
+    def visit_LetNode(self, node: LetNode) -> Any:
+        index = node.index
+        temporaries = self._temporaries
+        if index >= len(temporaries):
+            temporaries.extend([None] * (index + 1 - len(temporaries)))
+        previous = temporaries[index]
+        temporaries[index] = node
+        try:
+            return self.visit(node.body)
+        finally:
+            temporaries[index] = previous
+
+    def visit_TempNode(self, node: TempNode) -> Any:
+        value = self._temporaries[node.index]
+        if type(value) is LetNode:
+            value = self._temporaries[node.index] = self.visit(value.value)
+        return value
+
+    def visit_FunctionDefinitionNode(self, node: FunctionDefinitionNode) -> None:
+        name = node.name
+        if self._symbol_table.get(name) is not None:
+            raise Exception(f"'{name}' is already defined")
+        function = define_function(node, self._symbol_table)
+        self._symbol_table.set(name, function)  # type: ignore
+
+    def visit_CallNode(self, node: CallNode) -> Any:
+        name = node.name
+        value = self._symbol_table.get(name)
+        if value is None:
+            value = BUILTINS.get(name)
+            if value is None:
+                raise Exception(f"'{name}' is not defined")
+        if type(value) is Builtin:
+            return value(self._aggregated_values(node.arguments))  # type: ignore
+        if type(value) is not Function:
+            raise Exception(f"'{name}' is not a function")
+        function: Function = value  # type: ignore
+        count = len(function.parameters)
+        if len(node.arguments) != count:
+            raise Exception(
+                f"'{name}' takes {count} arguments, got {len(node.arguments)}"
+            )
+        arguments = [self.visit(argument) for argument in node.arguments]
+        key = function.cache_key(arguments)
+        if key is not None:
+            result = function.lookup(key)
+            if result is not None:
+                return result
+        if self._depth >= MAX_CALL_DEPTH:
+            raise Exception("Maximum call depth exceeded")
+        if self.cancelled:
+            raise Cancelled()
+
+        symbol_table = self._symbol_table
+        caller_arguments = self._arguments
+        self._symbol_table = function.symbol_table
+        self._arguments = arguments
+        self._depth += 1
+        try:
+            if key is None:
+                return self.visit(function.body)
+            start = perf_counter()
+            result = self.visit(function.body)
+            function.store(key, result, perf_counter() - start)
+            return result
+        finally:
+            self._symbol_table = symbol_table
+            self._arguments = caller_arguments
+            self._depth -= 1
+
+    def visit_ProgramNode(self, node: ProgramNode) -> Any:
+        value = None
+        for statement in node.statements:
+            value = self.visit(statement)
+        return value
+
+    def visit_ParameterNode(self, node: ParameterNode) -> Any:
+        return self._arguments[node.index]
+
+    def visit_RangeNode(self, node: RangeNode) -> Any:
+        raise Exception(f"The range {node} can only be passed to a built-in")
+
+    def visit_PatternNode(self, node: PatternNode) -> Any:
+        raise Exception(f"The pattern {node} can only be passed to a built-in")
+
+    def visit_ArrayNode(self, node: ArrayNode) -> Any:
+        return arrays.array_of([self.visit(element) for element in node.elements])
+
+    def visit_ArrayRangeNode(self, node: ArrayRangeNode) -> Any:
+        start = self._scalar(node.start)
+        stop = self._scalar(node.stop)
+        return arrays.array_range(start, stop, self._scalar(node.step))
+
+    def visit_IndexNode(self, node: IndexNode) -> Any:
+        array = self.visit(node.node)
+        return arrays.element(array, self._scalar(node.index))
+
+    def _scalar(self, node: Node) -> Decimal:
+        value = self.visit(node)
+        if type(value) is not Number:
+            raise Exception(f"Expected a number, got {value!r}")
+        return value.value
+
+    def _aggregated_values(self, arguments: List[Node]) -> List[Any]:
+        """Evaluate arguments of a built-in, expanding ranges and patterns."""
+
+        values: List[Any] = []
+        for argument in arguments:
+            argument_type = type(argument)
+            if argument_type is RangeNode:
+                values.extend(self._lookup_all(argument.names()))  # type: ignore
+            elif argument_type is PatternNode:
+                names = self._pattern_names(argument.prefix)  # type: ignore
+                values.extend(self._lookup_all(names))
+            else:
+                value = self.visit(argument)
+                if type(value) is arrays.Array:
+                    values.extend(value)  # type: ignore
+                else:
+                    values.append(value)
+        return values
+
+    def _pattern_names(self, prefix: str) -> List[str]:
+        """Get sorted names of the variables of all scopes starting with `prefix`.
+
+        Functions are left out.
+        """
+
+        names: List[str] = []
+        seen: Set[str] = set()
+        scope: Optional[SymbolTable] = self._symbol_table
+        while scope is not None:
+            for name, value in scope.items():
+                if name.startswith(prefix) and name not in seen:
+                    seen.add(name)
+                    if type(value) is not Function:
+                        names.append(name)
+            scope = scope.parent
+        return sorted(names)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Optional
+
+from nodes import AssignmentNode, FunctionDefinitionNode, free_variables, walk
+
+from .interpreter import Interpreter
+from .snapshot import PathLike
+from .symbol_table import SymbolTable
+
+
+class LazyEvaluationError(Exception):
+    """Error of a lazy definition, raised when its value is first read."""
+
+    def __init__(self, definition: AssignmentNode, error: Exception) -> None:
+        super().__init__(f"{error} (in the definition {definition})")
+        self.definition = definition
+        self.error = error
+
+
+class Thunk:
+    """Value of a definition which is computed on its first read.
+
+    The thunk keeps a fork of the variables at the time of the definition, so
+    it computes what an immediate evaluation would have. The value, or the
+    error, is kept and the definition released afterwards. A recursion error
+    isn't kept, as it depends on the stack of the read.
+
+    Pending definitions it reads are forced first, from a work stack, so a
+    long chain of definitions doesn't nest interpreters.
+    """
+
+    __slots__ = "_definition", "_symbol_table", "_value", "_error"
+
+    def __init__(self, definition: AssignmentNode, symbol_table: SymbolTable) -> None:
+        self._definition = definition
+        self._symbol_table: Optional[SymbolTable] = symbol_table
+        self._value: Any = None
+        self._error: Optional[LazyEvaluationError] = None
+
+    @property
+    def is_forced(self) -> bool:
+        return self._symbol_table is None
+
+    def force(self) -> Any:
+        if self._symbol_table is not None:
+            stack = [self]
+            while stack:
+                thunk = stack[-1]
+                dependencies = thunk._pending_dependencies()
+                if dependencies:
+                    stack.extend(dependencies)
+                else:
+                    stack.pop()
+                    if not thunk.is_forced:
+                        thunk._evaluate()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _pending_dependencies(self) -> List[Thunk]:
+        symbol_table = self._symbol_table
+        if symbol_table is None:
+            return []
+        dependencies = []
+        for name in free_variables(self._definition.value):
+            value = symbol_table.get(name)
+            if type(value) is Thunk and not value.is_forced:
+                dependencies.append(value)
+        return dependencies
+
+    def _evaluate(self) -> None:
+        symbol_table = self._symbol_table
+        assert symbol_table is not None
+        try:
+            self._value = LazyInterpreter(symbol_table).visit(self._definition.value)
+        except RecursionError:
+            raise
+        except LazyEvaluationError as error:
+            # A definition read by this one failed, it's already named.
+            self._error = error
+        except Exception as error:
+            self._error = LazyEvaluationError(self._definition, error)
+        self._symbol_table = None
+
+
+class LazyInterpreter(Interpreter):
+    """Interpreter which evaluates definitions only once they are read.
+
+    `var` stores a `Thunk` instead of the value, so defining a variable costs
+    the same no matter how expensive its expression is, and definitions which
+    are never read are never evaluated. Errors of a definition are raised by
+    every read of it, as a `LazyEvaluationError` naming the definition.
+    Definitions containing other definitions are evaluated right away, since
+    those have to take effect.
+    """
+
+    __slots__ = ()
+
+    def _lookup_all(self, names: Iterable[str]) -> List[Any]:
+        return [self._lookup(name) for name in names]
+
+    def _lookup(self, name: str) -> Any:
+        value = super()._lookup(name)
+        if type(value) is Thunk:
+            return value.force()
+        return value
+
+    def visit_AssignmentNode(self, node: AssignmentNode) -> None:
+        definitions = (AssignmentNode, FunctionDefinitionNode)
+        if any(type(child) in definitions for child in walk(node.value)):
+            return super().visit_AssignmentNode(node)
+        name = node.name
+        if self._symbol_table.get(name) is not None:
+            raise Exception(f"'{name}' is already defined")
+        self._symbol_table.set(name, Thunk(node, self._symbol_table.fork()))
+
+    def force_all(self) -> None:
+        """Evaluate every pending definition, including parent scopes."""
+
+        scope: Optional[SymbolTable] = self._symbol_table
+        while scope is not None:
+            for name, value in list(scope.items()):
+                if type(value) is Thunk:
+                    scope.set(name, value.force())
+            scope = scope.parent
+
+    def snapshot(self, path: PathLike) -> None:
+        self.force_all()
+        super().snapshot(path)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import count
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+from nodes import (
+    AssignmentNode,
+    CallNode,
+    FunctionDefinitionNode,
+    LetNode,
+    Node,
+    NumberNode,
+    ParameterNode,
+    PatternNode,
+    RangeNode,
+    TempNode,
+    ValueAccessNode,
+    iter_children,
+)
+
+from .cache_stats import CacheStats
+from .functions import Function
+from .interpreter import Interpreter
+from .symbol_table import SymbolTable
+
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_MIN_SIZE = 5
+
+
+class _NodeInfo:
+    __slots__ = "node", "key", "size", "names", "callees", "pure"
+
+    def __init__(
+        self,
+        node: Node,
+        key: int,
+        size: int,
+        names: Tuple[str, ...],
+        callees: Tuple[str, ...],
+        pure: bool,
+    ) -> None:
+        self.node = node
+        self.key = key
+        self.size = size
+        self.names = names
+        # Names of the functions called, the subtree is only pure if they are.
+        self.callees = callees
+        self.pure = pure
+
+
+class _Entry:
+    __slots__ = "result", "inputs", "elapsed"
+
+    def __init__(self, result: Any, inputs: Tuple[Any, ...], elapsed: float) -> None:
+        self.result = result
+        # Keeps the inputs alive, so their ids in the cache key stay unique.
+        self.inputs = inputs
+        self.elapsed = elapsed
+
+
+class MemoizingInterpreter(Interpreter):
+    """Interpreter which caches results of pure subexpressions.
+
+    Results are keyed by the structure of a subtree, so equal subtrees share an
+    entry even if they are different objects, together with the identity of the
+    current values of the variables the subtree reads. Defining or redefining a
+    variable stores a new value object and therefore never hits stale entries.
+    Calls are only cached if the function called is pure, as other functions
+    read variables which aren't inputs of the call.
+
+    Subtrees with fewer than `min_size` nodes are evaluated directly, as
+    looking them up would cost more than evaluating them. The cache holds at most
+    `max_size` results and evicts the least recently used ones. Descriptions of
+    subtrees and the structures results are keyed by are dropped once there are
+    `8 * max_size` of either.
+    """
+
+    __slots__ = (
+        "_max_size",
+        "_min_size",
+        "_results",
+        "_infos",
+        "_structures",
+        "_keys",
+        "stats",
+    )
+
+    def __init__(
+        self,
+        symbol_table: Optional[SymbolTable] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        min_size: int = DEFAULT_MIN_SIZE,
+    ) -> None:
+        super().__init__(symbol_table)
+        self._max_size = max_size
+        self._min_size = min_size
+        self._results: OrderedDict[Tuple[int, Tuple[int, ...]], _Entry] = OrderedDict()
+        self._infos: Dict[int, _NodeInfo] = {}
+        self._structures: Dict[Tuple[Any, ...], int] = {}
+        # Keys of dropped structures aren't reused, so cached results keyed by
+        # them can't be mistaken for results of other structures.
+        self._keys = count()
+        self.stats = CacheStats()
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._infos.clear()
+        self._structures.clear()
+
+    def visit(self, node: Node) -> Any:
+        info = self._info(node)
+        if not info.pure or info.size < self._min_size:
+            return super().visit(node)
+
+        get = self._symbol_table.get
+        for name in info.callees:
+            function = get(name)
+            if type(function) is Function and not function.pure:
+                return super().visit(node)
+        inputs = tuple(get(name) for name in info.names)
+        key = (info.key, tuple(map(id, inputs)))
+        entry = self._results.get(key)
+        if entry is not None:
+            self._results.move_to_end(key)
+            self.stats.hits += 1
+            self.stats.saved_time += entry.elapsed
+            return entry.result
+
+        start = perf_counter()
+        result = super().visit(node)
+        elapsed = perf_counter() - start
+        self.stats.misses += 1
+        self._results[key] = _Entry(result, inputs, elapsed)
+        if len(self._results) > self._max_size:
+            self._results.popitem(last=False)
+            self.stats.evictions += 1
+        return result
+
+    def _info(self, node: Node) -> _NodeInfo:
+        info = self._infos.get(id(node))
+        if info is None or info.node is not node:
+            info = self._describe(node)
+        return info
+
+    def _describe(self, node: Node) -> _NodeInfo:
+        """Compute the structural key, size and inputs of a subtree."""
+
+        limit = self._max_size * 8
+        if len(self._infos) >= limit:
+            self._infos.clear()
+        if len(self._structures) >= limit:
+            # Descriptions hold keys of structures, drop them as well.
+            self._infos.clear()
+            self._structures.clear()
+
+        callees: Tuple[str, ...] = ()
+        if isinstance(node, NumberNode):
+            structure: Tuple[Any, ...] = (NumberNode, str(node.value))
+            size, names, pure = 1, (), True
+        elif isinstance(node, ValueAccessNode):
+            structure = (ValueAccessNode, node.name)
+            size, names, pure = 1, (node.name,), True
+        elif isinstance(node, (TempNode, ParameterNode)):
+            # Temporaries and parameters hold per-evaluation state, so nothing
+            # reading them is cached.
+            structure = (type(node), node.index)
+            size, names, pure = 1, (), False
+        elif isinstance(node, (RangeNode, PatternNode)):
+            # Ranges and patterns read variables the structure doesn't name.
+            structure = (type(node), repr(node))
+            size, names, pure = 1, (), False
+        else:
+            children = [self._info(child) for child in iter_children(node)]
+            structure = (type(node),) + tuple(child.key for child in children)
+            if isinstance(node, AssignmentNode):
+                structure += (node.name,)
+            elif isinstance(node, LetNode):
+                structure += (node.index,)
+            size = 1 + sum(child.size for child in children)
+            inputs = {name for child in children for name in child.names}
+            called = {name for child in children for name in child.callees}
+            if isinstance(node, CallNode):
+                # The function is an input of the call.
+                structure += (node.name,)
+                inputs.add(node.name)
+                called.add(node.name)
+            names = tuple(sorted(inputs))
+            callees = tuple(sorted(called))
+            pure = not isinstance(
+                node, (AssignmentNode, FunctionDefinitionNode)
+            ) and all(child.pure for child in children)
+
+        key = self._structures.get(structure)
+        if key is None:
+            key = self._structures[structure] = next(self._keys)
+        info = _NodeInfo(node, key, size, names, callees, pure)
+        self._infos[id(node)] = info
+        return info
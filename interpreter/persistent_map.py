@@ -0,0 +1,257 @@
+"""Persistent hash map (hash array mapped trie).
+
+Updates never modify a map, they return a new one which shares every untouched
+branch with the original. Copying a map is therefore free and memory is shared
+between all versions derived from it.
+
+Every trie node consumes 5 bits of the key hash and keeps its entries in a flat
+tuple of `key, value` pairs. A `None` key marks a pair whose value is a child
+node. Keys with the same full hash end up in a collision node.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Generic, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+
+class _BitmapNode:
+    __slots__ = "bitmap", "array"
+
+    def __init__(self, bitmap: int, array: Tuple[Any, ...]) -> None:
+        self.bitmap = bitmap
+        self.array = array
+
+
+class _CollisionNode:
+    __slots__ = "hash", "array"
+
+    def __init__(self, hash_: int, array: Tuple[Any, ...]) -> None:
+        self.hash = hash_
+        self.array = array
+
+
+_Node = Union[_BitmapNode, _CollisionNode]
+
+_EMPTY_NODE = _BitmapNode(0, ())
+
+
+class PersistentMap(Generic[K, V]):
+    __slots__ = "_root", "_size"
+
+    def __init__(self) -> None:
+        self._root: _Node = _EMPTY_NODE
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING) is not _MISSING  # type: ignore
+
+    def __iter__(self) -> Iterator[K]:
+        for key, _ in self.items():
+            yield key
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        return _iter_items(self._root)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        key_hash = hash(key)
+        node = self._root
+        shift = 0
+        while type(node) is _BitmapNode:
+            bit = 1 << ((key_hash >> shift) & _MASK)
+            bitmap = node.bitmap
+            if not bitmap & bit:
+                return default
+            index = bin(bitmap & (bit - 1)).count("1") << 1
+            array = node.array
+            entry_key = array[index]
+            if entry_key is None:
+                node = array[index + 1]
+                shift += _BITS
+            elif entry_key is key or entry_key == key:
+                return array[index + 1]
+            else:
+                return default
+
+        array = node.array
+        for index in range(0, len(array), 2):
+            if array[index] == key:
+                return array[index + 1]
+        return default
+
+    def set(self, key: K, value: V) -> PersistentMap[K, V]:
+        """Return a map with the key set to the value."""
+
+        root, added = _assoc(self._root, 0, hash(key), key, value)
+        if root is self._root:
+            return self
+        return self._derive(root, self._size + added)
+
+    def update(self, items: Iterable[Tuple[K, V]]) -> PersistentMap[K, V]:
+        """Return a map with the keys of `items` set to their values."""
+
+        root = self._root
+        size = self._size
+        for key, value in items:
+            root, added = _assoc(root, 0, hash(key), key, value)
+            size += added
+        if root is self._root:
+            return self
+        return self._derive(root, size)
+
+    def delete(self, key: K) -> PersistentMap[K, V]:
+        """Return a map without the key."""
+
+        root = _without(self._root, 0, hash(key), key)
+        if root is self._root:
+            return self
+        return self._derive(root or _EMPTY_NODE, self._size - 1)
+
+    def _derive(self, root: _Node, size: int) -> PersistentMap[K, V]:
+        result: PersistentMap[K, V] = PersistentMap.__new__(PersistentMap)
+        result._root = root
+        result._size = size
+        return result
+
+
+_MISSING = object()
+
+
+def _assoc(node: _Node, shift: int, key_hash: int, key: Any, value: Any) -> Any:
+    """Set a key in a subtree, return the new subtree and whether it grew."""
+
+    if type(node) is _CollisionNode:
+        if node.hash != key_hash:
+            # Nest the collision node so both hashes can be told apart.
+            wrapper = _BitmapNode(1 << ((node.hash >> shift) & _MASK), (None, node))
+            return _assoc(wrapper, shift, key_hash, key, value)
+        array = node.array
+        for index in range(0, len(array), 2):
+            if array[index] == key:
+                if array[index + 1] is value:
+                    return node, False
+                return (
+                    _CollisionNode(key_hash, _replace(array, index + 1, value)),
+                    False,
+                )
+        return _CollisionNode(key_hash, array + (key, value)), True
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    bitmap = node.bitmap
+    index = bin(bitmap & (bit - 1)).count("1") << 1
+    array = node.array
+    if not bitmap & bit:
+        array = array[:index] + (key, value) + array[index:]
+        return _BitmapNode(bitmap | bit, array), True
+
+    entry_key = array[index]
+    entry_value = array[index + 1]
+    if entry_key is None:
+        child, added = _assoc(entry_value, shift + _BITS, key_hash, key, value)
+        if child is entry_value:
+            return node, False
+        return _BitmapNode(bitmap, _replace(array, index + 1, child)), added
+    if entry_key is key or entry_key == key:
+        if entry_value is value:
+            return node, False
+        return _BitmapNode(bitmap, _replace(array, index + 1, value)), False
+
+    child = _merge(
+        shift + _BITS, entry_key, entry_value, hash(entry_key), key, value, key_hash
+    )
+    return _BitmapNode(bitmap, _replace_pair(array, index, (None, child))), True
+
+
+def _merge(
+    shift: int,
+    key_a: Any,
+    value_a: Any,
+    hash_a: int,
+    key_b: Any,
+    value_b: Any,
+    hash_b: int,
+) -> _Node:
+    """Build the smallest subtree holding two keys."""
+
+    if hash_a == hash_b:
+        return _CollisionNode(hash_a, (key_a, value_a, key_b, value_b))
+    index_a = (hash_a >> shift) & _MASK
+    index_b = (hash_b >> shift) & _MASK
+    if index_a == index_b:
+        child = _merge(shift + _BITS, key_a, value_a, hash_a, key_b, value_b, hash_b)
+        return _BitmapNode(1 << index_a, (None, child))
+    if index_a > index_b:
+        key_a, value_a, key_b, value_b = key_b, value_b, key_a, value_a
+    return _BitmapNode(
+        (1 << index_a) | (1 << index_b), (key_a, value_a, key_b, value_b)
+    )
+
+
+def _without(node: _Node, shift: int, key_hash: int, key: Any) -> Optional[_Node]:
+    """Remove a key from a subtree.
+
+    Return the same subtree if the key is missing and None if it became empty.
+    """
+
+    if type(node) is _CollisionNode:
+        array = node.array
+        for index in range(0, len(array), 2):
+            if array[index] == key:
+                array = _replace_pair(array, index, ())
+                return _CollisionNode(node.hash, array) if array else None
+        return node
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    bitmap = node.bitmap
+    if not bitmap & bit:
+        return node
+    index = bin(bitmap & (bit - 1)).count("1") << 1
+    array = node.array
+    entry_key = array[index]
+    entry_value = array[index + 1]
+
+    if entry_key is None:
+        child = _without(entry_value, shift + _BITS, key_hash, key)
+        if child is entry_value:
+            return node
+        if child is not None:
+            if len(child.array) == 2 and child.array[0] is not None:
+                # A single remaining entry moves up into this node.
+                return _BitmapNode(bitmap, _replace_pair(array, index, child.array))
+            return _BitmapNode(bitmap, _replace(array, index + 1, child))
+    elif not (entry_key is key or entry_key == key):
+        return node
+
+    if bitmap == bit:
+        return None
+    return _BitmapNode(bitmap & ~bit, _replace_pair(array, index, ()))
+
+
+def _replace(array: Tuple[Any, ...], index: int, item: Any) -> Tuple[Any, ...]:
+    after = index + 1
+    return array[:index] + (item,) + array[after:]
+
+
+def _replace_pair(
+    array: Tuple[Any, ...], index: int, items: Tuple[Any, ...]
+) -> Tuple[Any, ...]:
+    after = index + 2
+    return array[:index] + items + array[after:]
+
+
+def _iter_items(node: _Node) -> Iterator[Tuple[Any, Any]]:
+    array = node.array
+    for index in range(0, len(array), 2):
+        key = array[index]
+        if key is None:
+            yield from _iter_items(array[index + 1])
+        else:
+            yield key, array[index + 1]
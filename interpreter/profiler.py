@@ -0,0 +1,259 @@
+"""Sampling profiler attributing evaluation time to source lines and expressions.
+
+The interpreter dispatches every node to a `visit_<NodeClass>` method taking
+the node, so the Python stack of a thread running a program holds the stack of
+nodes being evaluated. A background thread reads it every `interval` seconds
+and charges the time since the previous sample to those nodes. The interpreter
+itself runs unchanged, only the sampling thread costs anything.
+
+Nodes are mapped to source through the `SourceMap` of the program. Bodies of
+user-defined functions are copies resolved at definition time, their nodes are
+matched up with the nodes of the definition when first seen. Time spent in a
+node without a position is charged to the closest enclosing one which has a
+position.
+
+Counts are of samples, so they're proportional to time rather than to the
+number of evaluations.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from dataclasses import dataclass
+from time import perf_counter
+from types import FrameType
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from nodes import FunctionDefinitionNode, Node, ProgramNode, SourceMap, walk
+
+from .functions import Function
+from .interpreter import Interpreter
+
+# The switch interval of the GIL is 5ms, sampling more often mostly waits.
+DEFAULT_INTERVAL = 0.005
+
+_LABEL_LENGTH = 60
+
+
+@dataclass
+class ProfileEntry:
+    """Time charged to a source line or an expression."""
+
+    line: int
+    source: str
+    self_time: float = 0.0
+    total_time: float = 0.0
+    samples: int = 0
+
+
+class Profiler:
+    """Sample the nodes a thread is evaluating.
+
+    Used as a context manager around the evaluation, in the thread which runs
+    it:
+
+        with Profiler(source_map) as profiler:
+            interpreter.visit(program)
+        profiler.write_collapsed(file)
+    """
+
+    __slots__ = (
+        "source_map",
+        "interval",
+        "_definitions",
+        "_resolved",
+        "_functions",
+        "_stacks",
+        "_thread_id",
+        "_stop",
+        "_sampler",
+        "_last",
+    )
+
+    def __init__(self, source_map: SourceMap, interval: float = DEFAULT_INTERVAL):
+        self.source_map = source_map
+        self.interval = interval
+        self._definitions: Dict[str, FunctionDefinitionNode] = {}
+        # Nodes of resolved function bodies mapped to nodes of their definitions.
+        self._resolved: Dict[int, Node] = {}
+        self._functions: List[Function] = []
+        # Samples and time of every stack of positioned nodes, by their ids.
+        self._stacks: Dict[Tuple[int, ...], List[Any]] = {}
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._last = 0.0
+
+    def __enter__(self) -> Profiler:
+        self.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start sampling the current thread."""
+
+        if self._sampler is not None:
+            raise Exception("The profiler is already running")
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._last = perf_counter()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        if self._sampler is None:
+            return
+        self._stop.set()
+        self._sampler.join()
+        self._sampler = None
+
+    @property
+    def samples(self) -> int:
+        return sum(samples for samples, _, _ in self._stacks.values())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)  # type: ignore
+            now = perf_counter()
+            if frame is not None:
+                self._sample(frame, now - self._last)
+            self._last = now
+
+    def _sample(self, frame: Optional[FrameType], elapsed: float) -> None:
+        visits: List[Dict[str, Any]] = []
+        while frame is not None:
+            if frame.f_code.co_name.startswith("visit_"):
+                variables = frame.f_locals
+                if isinstance(variables.get("self"), Interpreter):
+                    visits.append(variables)
+            frame = frame.f_back
+
+        # Calls come before the nodes of the function bodies they evaluate.
+        nodes: List[Node] = []
+        for variables in reversed(visits):
+            function = variables.get("function")
+            if type(function) is Function:
+                self._match_body(function)
+            node = self._positioned(variables.get("node"))
+            if node is not None and (not nodes or node is not nodes[-1]):
+                nodes.append(node)
+        if not nodes:
+            return
+        key = tuple(map(id, nodes))
+        entry = self._stacks.get(key)
+        if entry is None:
+            self._stacks[key] = [1, elapsed, nodes]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def _positioned(self, node: Any) -> Optional[Node]:
+        if node is None or type(node) is ProgramNode:
+            return None
+        if node in self.source_map:
+            return node
+        return self._resolved.get(id(node))
+
+    def _match_body(self, function: Function) -> None:
+        """Map the nodes of a resolved function body to those of its definition.
+
+        Resolving only replaces parameters, so both trees have the same shape.
+        """
+
+        if id(function.body) in self._resolved or function.body in self.source_map:
+            return
+        if not self._definitions:
+            for node in self.source_map.nodes():
+                if type(node) is FunctionDefinitionNode:
+                    self._definitions[node.name] = node  # type: ignore
+        definition = self._definitions.get(function.name)
+        if definition is None:
+            return
+        # Keep the function alive, so the ids of its nodes stay valid.
+        self._functions.append(function)
+        for resolved, node in zip(walk(function.body), walk(definition.body)):
+            self._resolved[id(resolved)] = node
+
+    def lines(self) -> List[ProfileEntry]:
+        """Get time by source line, the most expensive first."""
+
+        source_map = self.source_map
+        lines = source_map.text.split("\n")
+        entries: Dict[int, ProfileEntry] = {}
+        for samples, elapsed, nodes in self._stacks.values():
+            seen = set()
+            for node in nodes:
+                line = source_map.line(node)
+                assert line is not None
+                entry = entries.get(line)
+                if entry is None:
+                    entry = ProfileEntry(line, lines[line - 1].strip())
+                    entries[line] = entry
+                if line not in seen:
+                    seen.add(line)
+                    entry.total_time += elapsed
+                    entry.samples += samples
+            entries[source_map.line(nodes[-1])].self_time += elapsed  # type: ignore
+        return sorted(entries.values(), key=_cost)
+
+    def expressions(self) -> List[ProfileEntry]:
+        """Get time by expression, the most expensive first."""
+
+        source_map = self.source_map
+        entries: Dict[int, ProfileEntry] = {}
+        for samples, elapsed, nodes in self._stacks.values():
+            # A recursive function has its nodes on the stack more than once.
+            for key, node in dict(zip(map(id, nodes), nodes)).items():
+                entry = entries.get(key)
+                if entry is None:
+                    entry = ProfileEntry(
+                        source_map.line(node), source_map.source(node)  # type: ignore
+                    )
+                    entries[key] = entry
+                entry.total_time += elapsed
+                entry.samples += samples
+            entries[id(nodes[-1])].self_time += elapsed
+        return sorted(entries.values(), key=_cost)
+
+    def write_collapsed(self, file: TextIO) -> None:
+        """Write stacks in the collapsed format of flame graph tools.
+
+        Each line is a stack of expressions, outermost first, separated by
+        semicolons and followed by its number of samples.
+        """
+
+        labels: Dict[int, str] = {}
+        for samples, _, nodes in self._stacks.values():
+            frames = []
+            for node in nodes:
+                label = labels.get(id(node))
+                if label is None:
+                    label = labels[id(node)] = self._label(node)
+                frames.append(label)
+            file.write(f"{';'.join(frames)} {samples}\n")
+
+    def write_lines(self, file: TextIO, limit: int = 20) -> None:
+        """Write a table of the most expensive lines."""
+
+        total = sum(elapsed for _, elapsed, _ in self._stacks.values()) or 1.0
+        file.write("  line    self%   total%  samples  source\n")
+        for entry in self.lines()[:limit]:
+            file.write(
+                f"{entry.line:>6}{entry.self_time / total:>9.1%}"
+                f"{entry.total_time / total:>9.1%}{entry.samples:>9}  "
+                f"{entry.source[:_LABEL_LENGTH]}\n"
+            )
+
+    def _label(self, node: Node) -> str:
+        source = " ".join(str(self.source_map.source(node)).split())
+        if len(source) > _LABEL_LENGTH:
+            source = source[: _LABEL_LENGTH - 3] + "..."
+        # Semicolons separate frames in the collapsed format.
+        return f"{source.replace(';', ',')} (line {self.source_map.line(node)})"
+
+
+def _cost(entry: ProfileEntry) -> Tuple[float, float, int]:
+    return -entry.self_time, -entry.total_time, entry.line
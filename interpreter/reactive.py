@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from nodes import AssignmentNode, Node, free_variables
+
+from .interpreter import Interpreter
+from .symbol_table import SymbolTable
+
+
+@dataclass
+class UpdateReport:
+    """Outcome of a (re)definition in reactive mode."""
+
+    name: str
+    recomputed: List[str] = field(default_factory=list)
+    skipped: int = 0
+
+
+class ReactiveInterpreter(Interpreter):
+    """Interpreter which keeps definitions up to date with their inputs.
+
+    Every `var` definition is recorded together with the variables it reads.
+    Redefining a variable is allowed and re-evaluates only the definitions
+    depending on it, directly or transitively, in topological order. The rest
+    are skipped. Either all of them are updated or, if any evaluation fails,
+    none are.
+    """
+
+    __slots__ = "_definitions", "_dependencies", "_dependents", "last_update"
+
+    def __init__(self, symbol_table: Optional[SymbolTable] = None) -> None:
+        super().__init__(symbol_table)
+        self._definitions: Dict[str, Node] = {}
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self.last_update: Optional[UpdateReport] = None
+
+    def fork(self) -> ReactiveInterpreter:
+        interpreter = super().fork()
+        assert isinstance(interpreter, ReactiveInterpreter)
+        interpreter._definitions = dict(self._definitions)
+        interpreter._dependencies = {
+            name: set(names) for name, names in self._dependencies.items()
+        }
+        interpreter._dependents = {
+            name: set(names) for name, names in self._dependents.items()
+        }
+        return interpreter
+
+    def dependents(self, name: str) -> Set[str]:
+        """Get all definitions reading a variable, directly or transitively."""
+
+        result: Set[str] = set()
+        stack = [name]
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    stack.append(dependent)
+        return result
+
+    def visit_AssignmentNode(self, node: AssignmentNode) -> None:
+        name = node.name
+        dependencies = free_variables(node.value)
+        affected = self.dependents(name)
+        if name in dependencies or not dependencies.isdisjoint(affected):
+            raise Exception(f"Circular definition of '{name}'")
+
+        order = self._topological_order(affected)
+        symbol_table = self._symbol_table
+        self._symbol_table = symbol_table.fork()
+        try:
+            self._symbol_table.set(name, self.visit(node.value))
+            for dependent in order:
+                value = self.visit(self._definitions[dependent])
+                self._symbol_table.set(dependent, value)
+        except Exception:
+            self._symbol_table = symbol_table
+            raise
+
+        self._define(name, node.value, dependencies)
+        self.last_update = UpdateReport(
+            name, order, len(self._definitions) - len(order) - 1
+        )
+
+    def _define(self, name: str, value: Node, dependencies: Set[str]) -> None:
+        for dependency in self._dependencies.get(name, ()):
+            self._dependents[dependency].discard(name)
+        self._definitions[name] = value
+        self._dependencies[name] = dependencies
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(name)
+
+    def _topological_order(self, names: Set[str]) -> List[str]:
+        """Order definitions so that each comes after everything it reads."""
+
+        order: List[str] = []
+        visited: Set[str] = set()
+        for start in sorted(names):
+            if start in visited:
+                continue
+            visited.add(start)
+            stack = [(start, iter(self._dependencies[start]))]
+            while stack:
+                name, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if dependency in names and dependency not in visited:
+                        visited.add(dependency)
+                        stack.append((dependency, iter(self._dependencies[dependency])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(name)
+        return order
@@ -0,0 +1,180 @@
+"""Snapshots of symbol tables.
+
+Layout:
+
+    header: MAGIC, format version, number of scopes
+    per scope, innermost first: symbol count, names size, values size,
+        names: UTF-8, separated by newlines
+        values: ASCII, separated by newlines, one of
+            a Decimal or 'true'/'false'
+            an array as the list of its elements, like '[1, 2.5]'
+            a function as 'fun', its pure flag and its definition encoded with
+                `serialization`, in Base64
+
+Names and values are stored as two text blocks, so restoring a scope is a pair
+of `split` calls plus one Decimal conversion per number, with no lexing,
+parsing or evaluation.
+
+A function is restored with a fork of the scope holding it as its scope, taken
+once the whole scope is restored. Version 1 snapshots, which hold no arrays or
+functions, are still read.
+"""
+
+import os
+import struct
+from base64 import b64decode, b64encode
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from nodes import FunctionDefinitionNode
+from serialization import SerializationError, dumps, loads
+
+from . import arrays
+from .functions import Function, function_definition, restore_function
+from .symbol_table import SymbolTable
+from .values import False_, Number, True_
+
+MAGIC = b"CTSS"
+FORMAT_VERSION = 2
+_READABLE_VERSIONS = (1, FORMAT_VERSION)
+
+_HEADER = struct.Struct("<4sHI")
+_SCOPE_HEADER = struct.Struct("<III")
+
+_TRUE = "true"
+_FALSE = "false"
+_FUNCTION = "fun"
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def dump_snapshot(table: SymbolTable, path: PathLike) -> None:
+    """Write a table and its parent scopes to a file."""
+
+    scopes = []
+    scope = table
+    while scope is not None:
+        scopes.append(scope)
+        scope = scope.parent
+
+    chunks = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(scopes))]
+    for scope in scopes:
+        names: List[str] = []
+        values: List[str] = []
+        for name, value in scope.items():
+            names.append(name)
+            values.append(_encode_value(name, value))
+        names_data = "\n".join(names).encode()
+        values_data = "\n".join(values).encode()
+        chunks.append(_SCOPE_HEADER.pack(len(names), len(names_data), len(values_data)))
+        chunks.append(names_data)
+        chunks.append(values_data)
+    Path(path).write_bytes(b"".join(chunks))
+
+
+def load_snapshot(path: PathLike) -> SymbolTable:
+    """Restore a table with its parent scopes from a file."""
+
+    data = Path(path).read_bytes()
+    try:
+        magic, version, scope_count = _HEADER.unpack_from(data)
+    except struct.error:
+        raise SnapshotError("Not a catsby snapshot")
+    if magic != MAGIC:
+        raise SnapshotError("Not a catsby snapshot")
+    if version not in _READABLE_VERSIONS:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+
+    position = _HEADER.size
+    tables: List[SymbolTable] = []
+    try:
+        for _ in range(scope_count):
+            count, names_size, values_size = _SCOPE_HEADER.unpack_from(data, position)
+            position += _SCOPE_HEADER.size
+            names_end = position + names_size
+            values_end = names_end + values_size
+            if values_end > len(data):
+                raise SnapshotError("Truncated snapshot")
+            names = data[position:names_end].decode().split("\n") if count else []
+            values = data[names_end:values_end].decode().split("\n") if count else []
+            position = values_end
+            if len(names) != count or len(values) != count:
+                raise SnapshotError("Corrupted snapshot")
+            table = SymbolTable()
+            table.update(dict(zip(names, map(_decode_value, values))))
+            tables.append(table)
+    except (
+        struct.error,
+        ArithmeticError,
+        LookupError,
+        ValueError,
+        SerializationError,
+    ):
+        raise SnapshotError("Corrupted snapshot")
+
+    for child, parent in zip(tables, tables[1:]):
+        child.set_parent(parent)
+    for table in tables:
+        scope = None
+        for _, value in table.items():
+            if type(value) is Function:
+                if scope is None:
+                    scope = table.fork()
+                value.symbol_table = scope
+    return tables[0] if tables else SymbolTable()
+
+
+def _encode_value(name: str, value: Any) -> str:
+    value_type = type(value)
+    if value_type is Number:
+        return str(value.value)
+    if value_type is True_:
+        return _TRUE
+    if value_type is False_:
+        return _FALSE
+    if value_type is arrays.Array:
+        return repr(value)
+    if value_type is Function:
+        data = b64encode(dumps([function_definition(value)])).decode()
+        return f"{_FUNCTION} {int(value.pure)} {data}"
+    raise SnapshotError(f"Can't snapshot the value of '{name}'")
+
+
+_CONSTANTS: Dict[str, Any] = {_TRUE: True_(), _FALSE: False_()}
+
+
+def _decode_value(text: str) -> Any:
+    value = _CONSTANTS.get(text)
+    if value is not None:
+        return value
+    if text.startswith("["):
+        return _decode_array(text)
+    if text.startswith(_FUNCTION):
+        return _decode_function(text)
+    return Number(Decimal(text))
+
+
+def _decode_array(text: str) -> arrays.Array:
+    if not text.endswith("]"):
+        raise SnapshotError("Corrupted snapshot")
+    arrays.require_numpy()
+    inner = text[1:-1]
+    elements = inner.split(", ") if inner else []
+    if elements and elements[0] in _CONSTANTS:
+        return arrays.array_of([_CONSTANTS[element] for element in elements])
+    return arrays.array_of([Number(Decimal(element)) for element in elements])
+
+
+def _decode_function(text: str) -> Function:
+    """Decode a function, its scope is set once its table is restored."""
+
+    _, pure, data = text.split(" ")
+    (definition,) = loads(b64decode(data, validate=True))
+    if type(definition) is not FunctionDefinitionNode:
+        raise SnapshotError("Corrupted snapshot")
+    return restore_function(definition, SymbolTable(), pure == "1")
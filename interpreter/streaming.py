@@ -0,0 +1,356 @@
+"""Evaluation straight from tokens, without building a tree.
+
+Tokens are consumed by a shunting-yard loop which applies every operator to an
+operand stack as soon as its operands are complete. Precedence, from loosest:
+
+    var x =   (prefix)
+    && ||     (left associative)
+    !         (prefix)
+    < > <= >= == !=   (left associative)
+    + -       (left associative)
+    * / %     (left associative)
+    + -       (prefix)
+    ^         (right associative)
+
+This follows `Parser` exactly, including where `var` and `!` may appear.
+
+`Parser` raises syntax errors before anything is evaluated. To keep that, a
+runtime error doesn't stop the loop: the rest of the input is only checked and
+the error is raised at its end. Assignments go to a fork of the symbol table
+and are only copied to it once the whole input turned out valid.
+
+Function definitions, calls, arrays, variables which aren't scalars and
+separators of statements aren't evaluated here. `evaluate_tokens` raises
+`StreamingUnsupported` for them before changing anything, and the caller has to
+parse the input instead.
+"""
+
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, List, NoReturn, Optional, Tuple
+
+from tokens import Token, TokenType
+
+from . import arrays, fast_math
+from .symbol_table import SymbolTable
+from .values import False_, Number, True_, to_boolean_value
+
+# Where an operand starts, which limits what it may start with.
+_EXPRESSION = 0  # `var` and `!` are allowed
+_COMPARISON = 1  # `!` is allowed
+_FACTOR = 2  # neither is
+
+
+class StreamingUnsupported(Exception):
+    """Raised for input which can only be evaluated from a tree."""
+
+
+class _Skipped:
+    """Result of an operand which isn't evaluated."""
+
+
+class _Failed:
+    __slots__ = "error"
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+_SKIPPED = _Skipped()
+
+_SCALAR_TYPES = frozenset({Number, True_, False_})
+
+
+def _divide(a: Any, b: Any) -> Number:
+    try:
+        return Number(a.value / b.value)
+    except ZeroDivisionError:
+        raise Exception("Runtime math error")
+
+
+def _modulo(a: Any, b: Any) -> Number:
+    try:
+        return Number(a.value % b.value)
+    except ZeroDivisionError:
+        raise Exception("Runtime math error")
+
+
+_Apply = Callable[..., Any]
+
+# Operator kinds, with their precedence and how they are applied.
+_BINARY: dict = {
+    TokenType.AND: (1, lambda a, b: to_boolean_value(bool(a.value and b.value))),
+    TokenType.OR: (1, lambda a, b: to_boolean_value(bool(a.value or b.value))),
+    TokenType.LT: (3, lambda a, b: to_boolean_value(a.value < b.value)),
+    TokenType.GT: (3, lambda a, b: to_boolean_value(a.value > b.value)),
+    TokenType.LTE: (3, lambda a, b: to_boolean_value(a.value <= b.value)),
+    TokenType.GTE: (3, lambda a, b: to_boolean_value(a.value >= b.value)),
+    TokenType.EQEQ: (3, lambda a, b: to_boolean_value(a.value == b.value)),
+    TokenType.NE: (3, lambda a, b: to_boolean_value(a.value != b.value)),
+    TokenType.PLUS: (4, lambda a, b: Number(a.value + b.value)),
+    TokenType.MINUS: (4, lambda a, b: Number(a.value - b.value)),
+    TokenType.MULTIPLY: (5, lambda a, b: Number(a.value * b.value)),
+    TokenType.DIVIDE: (5, _divide),
+    TokenType.MODULO: (5, _modulo),
+    TokenType.POWER: (7, lambda a, b: Number(fast_math.power(a.value, b.value))),
+}
+_PREFIX: dict = {
+    TokenType.NOT: (2, lambda a: to_boolean_value(not a.value)),
+    TokenType.PLUS: (6, lambda a: a),
+    TokenType.MINUS: (6, lambda a: Number(-a.value)),
+}
+
+# Tokens of arrays and of programs of several statements, which are parsed.
+_PARSED = frozenset({TokenType.LEFT_BRACKET, TokenType.SEMICOLON, TokenType.NEWLINE})
+
+_PAREN = -1
+_ASSIGN = 0
+_POWER_PRECEDENCE = 7
+
+# An operator on the stack: precedence, apply function or None for parentheses
+# and assignments, arity, token type, and the assigned name or whether the
+# right operand of `&&` or `||` is skipped.
+_Entry = Tuple[int, Optional[_Apply], int, Optional[TokenType], Any]
+
+
+def evaluate_tokens(tokens: Iterable[Token], symbol_table: SymbolTable) -> Any:
+    """Evaluate an expression from its tokens, like `Parser` and `Interpreter`.
+
+    Return None if there are no tokens.
+    """
+
+    return _Evaluation(symbol_table).run(iter(tokens))
+
+
+class _Evaluation:
+    __slots__ = (
+        "_symbol_table",
+        "_table",
+        "_assignments",
+        "_operands",
+        "_operators",
+        "_skipping",
+        "_failed",
+    )
+
+    def __init__(self, symbol_table: SymbolTable) -> None:
+        self._symbol_table = symbol_table
+        self._table = symbol_table
+        self._assignments: List[Tuple[str, Any]] = []
+        self._operands: List[Any] = []
+        self._operators: List[_Entry] = []
+        self._skipping = 0
+        self._failed = False
+
+    def run(self, tokens: Iterator[Token]) -> Any:
+        token = next(tokens, None)
+        if token is None:
+            return None
+
+        operands = self._operands
+        operators = self._operators
+        context = _EXPRESSION
+        while True:
+            # Operand expected.
+            if token is None:
+                _raise_unexpected_eof()
+            token_type = token.type
+            if token_type is TokenType.NUMBER:
+                operands.append(
+                    _SKIPPED
+                    if self._failed or self._skipping
+                    else Number(Decimal(token.value))
+                )
+            elif token_type is TokenType.IDENTIFIER:
+                operands.append(self._lookup(str(token.value)))
+            else:
+                if token_type is TokenType.LEFT_PAREN:
+                    operators.append((_PAREN, None, 0, None, None))
+                    context = _EXPRESSION
+                elif token_type is TokenType.PLUS or token_type is TokenType.MINUS:
+                    precedence, apply = _PREFIX[token_type]
+                    operators.append((precedence, apply, 1, token_type, None))
+                    context = _FACTOR
+                elif token_type is TokenType.NOT and context != _FACTOR:
+                    precedence, apply = _PREFIX[token_type]
+                    operators.append((precedence, apply, 1, token_type, None))
+                    context = _COMPARISON
+                elif (
+                    token_type is TokenType.KEYWORD
+                    and token.value == "var"
+                    and context == _EXPRESSION
+                ):
+                    token = next(tokens, None)
+                    if token is None or token.type is not TokenType.IDENTIFIER:
+                        _raise_syntax_error()
+                    name = str(token.value)
+                    token = next(tokens, None)
+                    if token is None or token.type is not TokenType.EQ:
+                        _raise_syntax_error()
+                    operators.append((_ASSIGN, None, 1, None, name))
+                elif (
+                    token_type is TokenType.KEYWORD
+                    and token.value == "fun"
+                    or token_type is TokenType.AT
+                ) and context == _EXPRESSION:
+                    raise StreamingUnsupported()
+                elif token_type in _PARSED:
+                    raise StreamingUnsupported()
+                else:
+                    _raise_syntax_error()
+                token = next(tokens, None)
+                continue
+
+            # Operators expected.
+            token = next(tokens, None)
+            while True:
+                if token is None:
+                    return self._finish()
+                token_type = token.type
+                if token_type is TokenType.RIGHT_PAREN:
+                    self._close_paren()
+                    token = next(tokens, None)
+                    continue
+                binary = _BINARY.get(token_type)
+                if binary is None:
+                    if token_type is TokenType.LEFT_PAREN or token_type in _PARSED:
+                        # A call, an index or another statement, or a syntax
+                        # error `Parser` reports.
+                        raise StreamingUnsupported()
+                    _raise_syntax_error()
+                self._push_binary(token_type, *binary)
+                if token_type is TokenType.AND or token_type is TokenType.OR:
+                    context = _COMPARISON
+                else:
+                    context = _FACTOR
+                token = next(tokens, None)
+                break
+
+    def _lookup(self, name: str) -> Any:
+        if self._failed or self._skipping:
+            return _SKIPPED
+        value = self._table.get(name)
+        if value is None:
+            return self._fail(Exception(f"'{name}' is not defined"))
+        if type(value) not in _SCALAR_TYPES:
+            # Arrays and functions, which the tree-walker deals with.
+            raise StreamingUnsupported()
+        return value
+
+    def _fail(self, error: Exception) -> _Failed:
+        self._failed = True
+        return _Failed(error)
+
+    def _push_binary(
+        self, token_type: TokenType, precedence: int, apply: _Apply
+    ) -> None:
+        operators = self._operators
+        # `^` is right associative and nothing binds tighter.
+        if precedence != _POWER_PRECEDENCE:
+            while operators and operators[-1][0] >= precedence:
+                self._reduce(operators.pop())
+
+        # The interpreter reads the value of the left operand before it
+        # evaluates the right one, so errors are raised in the same order.
+        skip = False
+        if not (self._failed or self._skipping):
+            operands = self._operands
+            try:
+                arrays.check_operand(operands[-1])
+                value = operands[-1].value
+                if precedence == _POWER_PRECEDENCE and value < 0:
+                    raise Exception("Division by zero error")
+                if precedence == 1:
+                    is_true = bool(value)
+                    skip = is_true if token_type is TokenType.OR else not is_true
+            except Exception as error:
+                operands[-1] = self._fail(error)
+            if skip:
+                self._skipping += 1
+        operators.append((precedence, apply, 2, token_type, skip))
+
+    def _close_paren(self) -> None:
+        operators = self._operators
+        while operators:
+            entry = operators.pop()
+            if entry[0] == _PAREN:
+                return
+            self._reduce(entry)
+        _raise_syntax_error()
+
+    def _finish(self) -> Any:
+        operators = self._operators
+        while operators:
+            entry = operators.pop()
+            # A missing closing parenthesis at the end is fine for `Parser`.
+            if entry[0] != _PAREN:
+                self._reduce(entry)
+
+        for name, value in self._assignments:
+            self._symbol_table.set(name, value)
+        (result,) = self._operands
+        if isinstance(result, _Failed):
+            raise result.error
+        return result
+
+    def _reduce(self, entry: _Entry) -> None:
+        precedence, apply, arity, token_type, argument = entry
+        operands = self._operands
+        if argument is True:
+            # The right operand of `&&` or `||` was skipped, the left one
+            # decides.
+            self._skipping -= 1
+            del operands[-1]
+            operands[-1] = to_boolean_value(token_type is TokenType.OR)
+            return
+        if self._failed or self._skipping:
+            self._reduce_unevaluated(arity, token_type)
+            return
+
+        b = operands.pop() if arity == 2 else None
+        try:
+            if arity == 2:
+                # The left operand was checked when the operator was pushed.
+                arrays.check_operand(b)
+                operands[-1] = apply(operands[-1], b)  # type: ignore
+            elif apply is None:
+                operands[-1] = self._assign(argument, operands[-1])
+            else:
+                if token_type is not TokenType.PLUS:
+                    arrays.check_operand(operands[-1])
+                operands[-1] = apply(operands[-1])
+        except Exception as error:
+            operands[-1] = self._fail(error)
+
+    def _reduce_unevaluated(self, arity: int, token_type: Optional[TokenType]) -> None:
+        """Reduce an operator of which an operand failed or was skipped."""
+
+        operands = self._operands
+        arguments = operands[-arity:]
+        del operands[-arity:]
+        for operand in arguments:
+            if type(operand) is _Failed:
+                error = operand.error
+                if (
+                    token_type is TokenType.DIVIDE or token_type is TokenType.MODULO
+                ) and isinstance(error, ZeroDivisionError):
+                    # Operands of a division are evaluated inside its try block.
+                    operand = _Failed(Exception("Runtime math error"))
+                operands.append(operand)
+                return
+        operands.append(_SKIPPED)
+
+    def _assign(self, name: str, value: Any) -> None:
+        if self._table.get(name) is not None:
+            raise Exception(f"'{name}' is already defined")
+        if self._table is self._symbol_table:
+            self._table = self._symbol_table.fork()
+        self._table.set(name, value)
+        self._assignments.append((name, value))
+
+
+def _raise_syntax_error() -> NoReturn:
+    raise Exception("Invalid syntax")
+
+
+def _raise_unexpected_eof() -> NoReturn:
+    raise Exception("Unexpected EOF")
@@ -1,31 +1,115 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+from typing import Dict, Iterator, Mapping, Optional, Tuple
 
+from .persistent_map import PersistentMap
 from .values import Number
 
+# Marks a symbol of the frozen base which was removed from the table.
+_REMOVED = object()
+
 
 class SymbolTable:
-    __slots__ = "_symbols", "_parent"
+    """Variables of a scope.
+
+    Symbols are kept in a persistent map, so forking a table is constant time and
+    forks share memory. Symbols loaded in bulk go into a frozen base dict instead,
+    which is never modified and therefore shared by forks as well. Reads go
+    through a per-table dict of the symbols looked up so far, which keeps
+    repeated lookups at dict speed.
+    """
+
+    __slots__ = "_symbols", "_base", "_cache", "_parent"
 
     def __init__(self) -> None:
-        self._symbols: Dict[str, Number] = {}
+        self._symbols: PersistentMap[str, Number] = PersistentMap()
+        self._base: Mapping[str, Number] = {}
+        self._cache: Dict[str, Number] = {}
 
     @property
     def has_parent(self) -> bool:
         return hasattr(self, "_parent")
 
+    @property
+    def parent(self) -> Optional[SymbolTable]:
+        return self._parent if self.has_parent else None
+
     def set_parent(self, parent: SymbolTable) -> None:
         self._parent = parent
 
+    def fork(self) -> SymbolTable:
+        """Create an independent copy of the table in constant time.
+
+        Later changes to either table don't affect the other one.
+        """
+
+        table = SymbolTable.__new__(SymbolTable)
+        table._symbols = self._symbols
+        table._base = self._base
+        table._cache = {}
+        if self.has_parent:
+            table._parent = self._parent
+        return table
+
     def get(self, name: str) -> Optional[Number]:
-        value = self._symbols.get(name, None)
-        if value is None and self.has_parent:
-            return self._parent.get(name)
+        value = self._cache.get(name, None)
+        if value is None:
+            value = self._symbols.get(name, None)
+            if value is None:
+                value = self._base.get(name, None)
+            elif value is _REMOVED:
+                value = None
+            if value is not None:
+                self._cache[name] = value
+            elif self.has_parent:
+                return self._parent.get(name)
+        return value
+
+    def get_local(self, name: str) -> Optional[Number]:
+        """Look a symbol up in this scope only, without the parent ones."""
+
+        value = self._cache.get(name, None)
+        if value is None:
+            value = self._symbols.get(name, None)
+            if value is None:
+                value = self._base.get(name, None)
+            elif value is _REMOVED:
+                value = None
         return value
 
     def set(self, name: str, value: Number) -> None:
-        self._symbols[name] = value
+        self._symbols = self._symbols.set(name, value)
+        self._cache[name] = value
+
+    def update(self, symbols: Mapping[str, Number]) -> None:
+        """Set many symbols at once.
+
+        The symbols of an empty table become its frozen base in a single pass,
+        which is much faster than setting them one by one. Otherwise they are
+        folded into the persistent map, without copying the symbols already
+        there.
+        """
+
+        if not self._base and not self._symbols:
+            self._base = dict(symbols)
+        else:
+            self._symbols = self._symbols.update(symbols.items())
+        self._cache = {}
 
     def remove(self, name: str) -> None:
-        self._symbols.pop(name, None)
+        if name in self._base:
+            self._symbols = self._symbols.set(name, _REMOVED)  # type: ignore
+        else:
+            self._symbols = self._symbols.delete(name)
+        self._cache.pop(name, None)
+
+    def items(self) -> Iterator[Tuple[str, Number]]:
+        """Iterate over the symbols of this scope, without the parent ones."""
+
+        symbols = self._symbols
+        for name, value in self._base.items():
+            if name not in symbols:
+                yield name, value
+        for name, value in symbols.items():
+            if value is not _REMOVED:
+                yield name, value
@@ -0,0 +1,153 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from nodes import MAX_RANGE_SIZE
+from parser_ import Parser
+
+from .interpreter import Interpreter
+from .symbol_table import SymbolTable
+from .values import False_, Number, True_
+
+np = pytest.importorskip("numpy")
+
+from .arrays import Array  # noqa: E402
+
+
+def run(interpreter, *sources):
+    value = None
+    for source in sources:
+        value = interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+    return value
+
+
+@pytest.mark.parametrize(
+    ["source", "expected"],
+    [
+        ("[1, 2.5, -3]", "[1, 2.5, -3]"),
+        ("[]", "[]"),
+        ("[1 < 2, 2 < 1]", "[true, false]"),
+        ("[1:5]", "[1, 2, 3, 4, 5]"),
+        ("[0:1:0.25]", "[0, 0.25, 0.5, 0.75, 1]"),
+        ("[5:1:-2]", "[5, 3, 1]"),
+        ("[1:2:3]", "[1]"),
+        ("[2:1]", "[]"),
+        ("[1:3] * 2 + 1", "[3, 5, 7]"),
+        ("10 - [1:3]", "[9, 8, 7]"),
+        ("[1, 2] * [3, 4]", "[3, 8]"),
+        ("[1, 4] / 2", "[0.5, 2]"),
+        ("[-7, 7] % 3", "[-1, 1]"),
+        ("[1:3] ^ 2", "[1, 4, 9]"),
+        ("2 ^ [0:2]", "[1, 2, 4]"),
+        ("-[1, -2]", "[-1, 2]"),
+        ("+[1]", "[1]"),
+        ("[1:4] > 2", "[false, false, true, true]"),
+        ("[1, 2] == [1, 3]", "[true, false]"),
+        ("[1, 0] && [1, 1]", "[true, false]"),
+        ("[1, 0] || 0", "[true, false]"),
+        ("!([1:3] != 2)", "[false, true, false]"),
+        ("[1 < 2, 2 < 1] + 1", "[2, 1]"),
+    ],
+)
+def test_element_wise(source, expected):
+    value = run(Interpreter(), source)
+    assert type(value) is Array
+    assert repr(value) == expected
+
+
+def test_scalars_stay_exact():
+    value = run(Interpreter(), "0.1 + 0.2 + [1][0] * 0")
+    assert value == Number(Decimal("0.3"))
+
+
+def test_scalar_logic_short_circuits():
+    interpreter = Interpreter()
+    assert run(interpreter, "0 && undefined") is False_()
+    assert run(interpreter, "1 || undefined") is True_()
+    assert repr(run(interpreter, "1 && [0, 2]")) == "[false, true]"
+
+
+def test_indexing():
+    interpreter = Interpreter()
+    run(interpreter, "var xs = [10:50:10]")
+    assert run(interpreter, "xs[0] + xs[-1]") == Number(Decimal("60"))
+    assert run(interpreter, "xs[4 - 1]") == Number(Decimal("40"))
+    assert run(interpreter, "[0.1][0]") == Number(Decimal("0.1"))
+    assert run(interpreter, "(xs > 20)[2]") is True_()
+
+
+def test_builtins_take_elements():
+    interpreter = Interpreter()
+    run(interpreter, "var xs = [1:4]", "var x1 = 10")
+    assert run(interpreter, "sum(xs)") == Number(Decimal("10"))
+    assert run(interpreter, "max(xs * 2, x1:x1, 3)") == Number(Decimal("10"))
+    assert run(interpreter, "sum([])") == Number(Decimal("0"))
+    with pytest.raises(Exception, match="'mean' of no values"):
+        run(interpreter, "mean([])")
+
+
+@pytest.mark.parametrize(
+    ["source", "message"],
+    [
+        ("[1, 0] / 0", "Runtime math error"),
+        ("1 / [1, 0]", "Runtime math error"),
+        ("[1] % 0", "Runtime math error"),
+        ("[10] ^ 1000", "Runtime math error"),
+        ("[-1, 2] ^ 2", "Division by zero error"),
+        ("[1:2:0]", "The step of an array range can't be 0"),
+        ("[1:[2]]", "Expected a number, got \\[2\\]"),
+        ("[[1]]", "Arrays hold numbers, got \\[1\\]"),
+        ("[1, 2][2]", "Index 2 is out of range"),
+        ("[1, 2][-3]", "Index -3 is out of range"),
+        ("[1, 2][0.5]", "Index 0.5 is not an integer"),
+        ("1[0]", "Only arrays can be indexed, got 1"),
+        ("[1, 2] + [1, 2, 3]", "Arrays of different lengths, 2 and 3"),
+        ("[1] < [1, 2]", "Arrays of different lengths, 1 and 2"),
+        ("[1, 2] && [1]", "Arrays of different lengths, 2 and 1"),
+        ("[] || [1]", "Arrays of different lengths, 0 and 1"),
+    ],
+)
+def test_errors(source, message):
+    with pytest.raises(Exception, match=message):
+        run(Interpreter(), source)
+
+
+def test_large_array_ranges_are_rejected():
+    interpreter = Interpreter()
+    assert len(run(interpreter, f"[1:{MAX_RANGE_SIZE}]")) == MAX_RANGE_SIZE
+    with pytest.raises(Exception, match="more than"):
+        run(interpreter, f"[1:{MAX_RANGE_SIZE + 1}]")
+    with pytest.raises(Exception, match="more than"):
+        run(interpreter, "[1:100000000000]")
+
+
+def test_evaluate_falls_back_to_the_tree():
+    interpreter = Interpreter()
+    assert repr(interpreter.evaluate(Lexer("1 + [1]").generate_tokens())) == "[2]"
+    run(interpreter, "var xs = [1, 2]")
+    value = interpreter.evaluate(Lexer("var ys = xs * 2").generate_tokens())
+    assert value is None
+    assert repr(run(interpreter, "ys")) == "[2, 4]"
+
+
+def test_numpy_round_trip():
+    elements = np.arange(4)
+    array = Array.from_numpy(elements)
+    assert repr(array) == "[0, 1, 2, 3]"
+    floats = np.array([0.5, 1.5])
+    array = Array.from_numpy(floats)
+    assert np.shares_memory(array.to_numpy(), floats)
+    assert not array.to_numpy().flags.writeable
+    assert floats.flags.writeable
+    copied = Array.from_numpy(floats, copy=True)
+    floats[0] = 2
+    assert repr(copied) == "[0.5, 1.5]"
+
+
+def test_arrays_as_variables():
+    table = SymbolTable()
+    table.set("xs", Array.from_numpy(np.array([1.0, 2.0])))
+    interpreter = Interpreter(table)
+    value = interpreter.evaluate(Lexer("xs * xs").generate_tokens())
+    assert value == Array.from_numpy(np.array([1.0, 4.0]))
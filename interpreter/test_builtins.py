@@ -0,0 +1,152 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from lexer import Lexer
+from nodes import MAX_RANGE_SIZE, RangeNode
+from parser_ import Parser
+
+from .builtins import BUILTINS
+from .interpreter import Interpreter
+from .lazy import LazyInterpreter
+from .symbol_table import SymbolTable
+from .values import Number
+
+
+def run(interpreter, *sources):
+    value = None
+    for source in sources:
+        value = interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+    return value
+
+
+@pytest.fixture(params=[Interpreter, LazyInterpreter])
+def interpreter(request):
+    interpreter = request.param()
+    run(
+        interpreter,
+        "var a1 = 1",
+        "var a2 = 2.5",
+        "var a3 = 1 < 2",
+        "var b = 0.1",
+        "var bc = 0.2",
+        "fun bf(x) = x",
+    )
+    return interpreter
+
+
+@pytest.mark.parametrize(
+    ["source", "expected"],
+    [
+        ("sum(a1:a3)", "4.5"),
+        ("sum(a1:a2, b*, 2 * 3)", "9.8"),
+        ("prod(a1:a3, 2)", "5.0"),
+        ("min(a*, b*)", "0.1"),
+        ("max(a*) + 1", "3.5"),
+        ("mean(a1:a3)", "1.5"),
+        ("sum()", "0"),
+        ("prod()", "1"),
+    ],
+)
+def test_aggregates(interpreter, source, expected):
+    assert run(interpreter, source) == Number(Decimal(expected))
+
+
+@pytest.mark.parametrize(
+    ["source", "message"],
+    [
+        ("min()", "'min' of no values"),
+        ("mean(c*)", "'mean' of no values"),
+        ("sum(a1:a4)", "'a4' is not defined"),
+        ("sum(bf)", "'sum' takes numbers"),
+        ("bf(a1:a2)", "The range a1:a2 can only be passed to a built-in"),
+        ("bf(a*)", "The pattern a\\* can only be passed to a built-in"),
+        ("sum + 1", "'sum' is not defined"),
+        ("max", "'max' is not defined"),
+    ],
+)
+def test_errors(interpreter, source, message):
+    with pytest.raises(Exception, match=message):
+        run(interpreter, source)
+
+
+def test_sums_are_rounded_once():
+    values = [Number(Decimal(text)) for text in ["1e30", "1", "-1e30"]]
+    assert BUILTINS["sum"](values) == Number(Decimal("1"))
+    with localcontext() as context:
+        context.prec = 3
+        assert BUILTINS["sum"]([Number(Decimal("1.234"))] * 2) == Number(
+            Decimal("2.47")
+        )
+
+
+def test_mean_is_rounded_once():
+    values = [Number(Decimal(text)) for text in ["1e30", "1", "2", "-1e30"]]
+    assert BUILTINS["mean"](values) == Number(Decimal("0.75"))
+
+
+def test_builtins_are_not_variables():
+    table = SymbolTable()
+    assert table.get("sum") is None
+    assert dict(table.items()) == {}
+
+
+@pytest.mark.parametrize("name", sorted(BUILTINS))
+def test_builtin_names_as_variables(interpreter, name):
+    assert run(interpreter, f"var {name} = 1", f"{name} + 1") == Number(Decimal("2"))
+    with pytest.raises(Exception, match=f"'{name}' is not a function"):
+        run(interpreter, f"{name}(a1)")
+
+
+def test_builtin_names_as_functions(interpreter):
+    run(interpreter, "fun sum(x) = x * 10")
+    assert run(interpreter, "sum(a1)") == Number(Decimal("10"))
+
+
+def test_patterns_skip_shadowed_and_functions():
+    parent = SymbolTable()
+    parent.set("x1", Number(Decimal("1")))
+    parent.set("x2", Number(Decimal("2")))
+    table = SymbolTable()
+    table.set_parent(parent)
+    table.set("x2", Number(Decimal("20")))
+    assert run(Interpreter(table), "fun xf() = 1", "sum(x*)") == Number(Decimal("21"))
+
+
+def test_range_names():
+    assert RangeNode("a8", "a10").names() == ("a8", "a9", "a10")
+    assert RangeNode("a08", "a10").names() == ("a08", "a09", "a10")
+    assert not RangeNode("a1", "b2").is_valid
+    assert not RangeNode("a2", "a1").is_valid
+    assert not RangeNode("a1", "a02").is_valid
+    assert RangeNode("a1", f"a{MAX_RANGE_SIZE}").size == MAX_RANGE_SIZE
+
+
+@pytest.mark.parametrize(
+    ["source", "message"],
+    [
+        ("sum(a1:a3000000)", "The range a1:a3000000 holds more than 100000 names"),
+        (f"sum(a1:a{'9' * 5000})", "Invalid range"),
+    ],
+    ids=["many names", "many digits"],
+)
+def test_large_ranges_are_rejected(source, message):
+    with pytest.raises(Exception, match=message):
+        Parser(Lexer(source).generate_tokens()).parse()
+
+
+def test_functions_using_builtins_are_memoized():
+    table = SymbolTable()
+    run(Interpreter(table), "var a1 = 1", "fun f(x) = sum(a1:a1, x)")
+    assert table.get("f").memoized  # type: ignore
+    run(Interpreter(table), "fun g(x) = sum(a*, x)")
+    assert not table.get("g").pure  # type: ignore
+
+
+def test_products_round_like_multiplication():
+    values = [Number(Decimal(1) / 7)] * 1000
+    expected = Decimal(1)
+    for value in values:
+        expected *= value.value
+    assert BUILTINS["prod"](values) == Number(expected)
+    assert len(BUILTINS["prod"](values).value.as_tuple().digits) == 28
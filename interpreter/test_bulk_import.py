@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+import pytest
+
+from .bulk_import import (
+    BulkImportError,
+    import_csv,
+    import_json,
+    is_valid_identifier,
+    read_csv,
+)
+from .symbol_table import SymbolTable
+from .values import Number
+
+
+@pytest.mark.parametrize(
+    ["name", "expected"],
+    [
+        ("x", True),
+        ("x_1", True),
+        ("Abc9", True),
+        ("", False),
+        ("1x", False),
+        ("_x", False),
+        ("x-y", False),
+        ("x y", False),
+        ("var", False),
+        ("é", False),
+    ],
+)
+def test_is_valid_identifier(name, expected):
+    assert is_valid_identifier(name) == expected
+
+
+def test_import_csv(tmp_path):
+    path = tmp_path / "values.csv"
+    path.write_text("name,value\na,1.50\n\n b , -2 \nc,1e3\n")
+    table = SymbolTable()
+    assert import_csv(path, table, header=True) == 3
+    assert table.get("a") == Number(Decimal("1.50"))
+    assert table.get("b") == Number(Decimal("-2"))
+    assert table.get("c") == Number(Decimal("1e3"))
+
+
+def test_read_csv_in_chunks(tmp_path):
+    path = tmp_path / "values.csv"
+    path.write_text("".join(f"x{i},{i}\n" for i in range(5)))
+    assert [len(chunk) for chunk in read_csv(path, chunk_size=2)] == [2, 2, 1]
+
+
+def test_import_json(tmp_path):
+    path = tmp_path / "values.json"
+    path.write_text('{"a": 0.1, "b": 2, "c": "3.000000000000000000001"}')
+    table = SymbolTable()
+    assert import_json(path, table) == 3
+    assert table.get("a") == Number(Decimal("0.1"))
+    assert table.get("b") == Number(Decimal("2"))
+    assert table.get("c") == Number(Decimal("3.000000000000000000001"))
+
+
+@pytest.mark.parametrize(
+    ["text", "message"],
+    [
+        ("a,1\nvar,2\n", "Invalid identifier 'var' on line 2"),
+        ("a,1\nb,x\n", "Invalid value of 'b' on line 2"),
+        ("a,nan\n", "Invalid value of 'a' on line 1"),
+        ("a,1,2\n", "Expected a name and a value on line 1"),
+        ("a,1\na,2\n", "'a' is defined twice"),
+        ("z,1\n", "'z' is already defined"),
+    ],
+)
+def test_invalid_csv(tmp_path, text, message):
+    path = tmp_path / "values.csv"
+    path.write_text(text)
+    table = SymbolTable()
+    table.set("z", Number(Decimal("0")))
+    with pytest.raises(BulkImportError, match=message):
+        import_csv(path, table)
+    assert table.get("a") is None
+
+
+@pytest.mark.parametrize(
+    ["text", "message"],
+    [
+        ("[1, 2]", "Expected a JSON object"),
+        ('{"a": true}', "Invalid value of 'a' in entry 1"),
+        ('{"a": NaN}', "Invalid number NaN"),
+        ('{"a": 1, "a": 2}', "'a' is defined twice"),
+        ('{"a": 1', "Invalid JSON"),
+    ],
+)
+def test_invalid_json(tmp_path, text, message):
+    path = tmp_path / "values.json"
+    path.write_text(text)
+    with pytest.raises(BulkImportError, match=message):
+        import_json(path, SymbolTable())
@@ -0,0 +1,28 @@
+import pytest
+
+from parser_ import parse_with_positions
+
+from .errors import describe_error
+from .interpreter import Interpreter
+
+
+@pytest.mark.parametrize(
+    ["text", "message"],
+    [
+        ("var a = 1\nb + a", "'b' is not defined at line 2, column 1"),
+        ("var a = 0\n\n2 * (1 / a)", "Runtime math error at line 3, column 5"),
+        ("var a = 1\nvar a = 2", "'a' is already defined at line 2, column 1"),
+        ("fun f(x) = x / 0\n1 + f(1)", "Runtime math error at line 2, column 5"),
+        ("sum(a1:a2)", "'a1' is not defined at line 1, column 1"),
+    ],
+)
+def test_errors_have_positions(text, message):
+    program, source_map = parse_with_positions(text)
+    with pytest.raises(Exception) as info:
+        Interpreter().visit(program)
+    assert describe_error(info.value, source_map) == message
+
+
+def test_errors_outside_the_interpreter():
+    _, source_map = parse_with_positions("1")
+    assert describe_error(Exception("Oops"), source_map) == "Oops"
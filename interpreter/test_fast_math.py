@@ -0,0 +1,44 @@
+import random
+from decimal import ROUND_DOWN, Decimal, localcontext
+
+import pytest
+
+from .fast_math import power
+
+
+def random_decimals(count):
+    rng = random.Random(0)
+    for _ in range(count):
+        if rng.random() < 0.5:
+            coefficient = rng.randint(1, 10**6) ** 2
+        else:
+            coefficient = rng.randrange(1, 10 ** rng.randint(1, 40))
+        yield Decimal(coefficient).scaleb(rng.randint(-30, 30))
+
+
+@pytest.mark.parametrize("precision", [28, 9, 50])
+@pytest.mark.parametrize("exponent", ["0.5", "0.50", "2", "3", "1.5"])
+def test_identical_to_power_operator(precision, exponent):
+    exponent = Decimal(exponent)
+    with localcontext() as context:
+        context.prec = precision
+        for base in random_decimals(300):
+            assert str(power(base, exponent)) == str(base**exponent)
+
+
+@pytest.mark.parametrize("base", ["4", "0.04", "1.00", "1E+4", "2", "0", "0.0"])
+def test_square_root(base):
+    base = Decimal(base)
+    assert str(power(base, Decimal("0.5"))) == str(base ** Decimal("0.5"))
+
+
+def test_other_rounding():
+    with localcontext() as context:
+        context.rounding = ROUND_DOWN
+        base = Decimal("2")
+        assert power(base, Decimal("0.5")) == base ** Decimal("0.5")
+
+
+def test_negative_base():
+    with pytest.raises(ArithmeticError):
+        power(Decimal("-4"), Decimal("0.5"))
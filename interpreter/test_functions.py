@@ -0,0 +1,180 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from nodes import ParameterNode, free_variables
+from parser_ import Parser
+
+from . import functions
+from .functions import MAX_CALL_DEPTH, Function, function_stats
+from .interpreter import Interpreter
+from .symbol_table import SymbolTable
+from .values import Number
+
+
+def run(interpreter, *sources):
+    value = None
+    for source in sources:
+        value = interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+    return value
+
+
+def test_call():
+    value = run(Interpreter(), "fun f(x, y) = x * y + x / y", "f(2, 4) + f(1, 1)")
+    assert value == Number(Decimal("10.5"))
+
+
+def test_call_without_arguments():
+    assert run(Interpreter(), "fun one() = 1", "one() + 1") == Number(Decimal("2"))
+
+
+def test_definition_is_a_function():
+    table = SymbolTable()
+    run(Interpreter(table), "fun f(x, y) = x + y")
+    function = table.get("f")
+    assert isinstance(function, Function)
+    assert repr(function) == "<fun f(x, y)>"
+
+
+def test_parameters_become_slots():
+    table = SymbolTable()
+    run(Interpreter(table), "var y = 1", "fun f(x) = x + y")
+    body = table.get("f").body  # type: ignore
+    assert body.node_a == ParameterNode(0, "x")
+    assert repr(body.node_b) == "y"
+
+
+def test_parameters_shadow_variables():
+    value = run(Interpreter(), "var x = 1", "fun f(x) = x * 2", "f(5) + x")
+    assert value == Number(Decimal("11"))
+
+
+def test_scope_is_resolved_at_definition():
+    interpreter = Interpreter()
+    run(interpreter, "var a = 1", "fun f(x) = x + a + c", "var c = 2")
+    with pytest.raises(Exception, match="'c' is not defined"):
+        run(interpreter, "f(1)")
+
+
+def test_recursion():
+    interpreter = Interpreter()
+    run(interpreter, "fun down(n) = n <= 0 || down(n - 1)")
+    assert run(interpreter, "down(10)").value == 1
+
+
+def test_recursion_is_bounded():
+    interpreter = Interpreter()
+    run(interpreter, "fun forever(n) = forever(n + 1)")
+    with pytest.raises(Exception, match="Maximum call depth exceeded"):
+        run(interpreter, "forever(0)")
+    # The interpreter is usable after the error.
+    assert run(interpreter, "fun id(x) = x", "id(3)") == Number(Decimal("3"))
+    run(interpreter, "fun deep(n) = n <= 1 || deep(n - 1)")
+    assert run(interpreter, f"deep({MAX_CALL_DEPTH})").value == 1
+
+
+@pytest.mark.parametrize(
+    ["source", "message"],
+    [
+        ("g(1)", "'g' is not defined"),
+        ("v(1)", "'v' is not a function"),
+        ("f(1)", "'f' takes 2 arguments, got 1"),
+        ("fun f(a) = a", "'f' is already defined"),
+        ("fun h(a, a) = a", "Duplicate parameter 'a'"),
+        ("fun h(a) = var b = a", "Definitions aren't allowed in function bodies"),
+        ("f(1, 0)", "Runtime math error"),
+    ],
+)
+def test_errors(source, message):
+    interpreter = Interpreter()
+    run(interpreter, "var v = 1", "fun f(x, y) = x / y")
+    with pytest.raises(Exception, match=message):
+        run(interpreter, source)
+
+
+@pytest.mark.parametrize("source", ["f + 1", "1 - f", "-f", "!f", "f < 1", "f && 1"])
+def test_functions_are_not_numbers(source):
+    interpreter = Interpreter()
+    run(interpreter, "fun f(x) = x")
+    message = "Expected a number or an array, got <fun f\\(x\\)>"
+    with pytest.raises(Exception, match=message):
+        run(interpreter, source)
+    with pytest.raises(Exception, match=message):
+        interpreter.evaluate(Lexer(source).generate_tokens())
+
+
+def test_evaluate_falls_back_to_parser():
+    table = SymbolTable()
+    interpreter = Interpreter(table)
+    assert interpreter.evaluate(Lexer("fun f(x) = x + 1").generate_tokens()) is None
+    value = interpreter.evaluate(Lexer("2 * f(3)").generate_tokens())
+    assert value == Number(Decimal("8"))
+    interpreter.evaluate(Lexer("@nomemo fun g() = 1").generate_tokens())
+    assert not table.get("g").memoized  # type: ignore
+    with pytest.raises(Exception, match="Invalid syntax"):
+        interpreter.evaluate(Lexer("var y = 2 (3)").generate_tokens())
+    assert table.get("y") is None
+
+
+def test_free_variables():
+    tree = Parser(Lexer("fun f(x) = x + y * f(z)").generate_tokens()).parse()
+    assert free_variables(tree) == {"y", "z"}
+    tree = Parser(Lexer("f(x) + g").generate_tokens()).parse()
+    assert free_variables(tree) == {"f", "x", "g"}
+
+
+def test_pure_functions_are_memoized():
+    table = SymbolTable()
+    interpreter = Interpreter(table)
+    run(interpreter, "var r = 2", "fun f(x) = x * r", "f(1) + f(1) + f(2)")
+    function = table.get("f")
+    assert function.pure and function.memoized  # type: ignore
+    stats = function_stats(table)["f"]
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_cache_keeps_exact_arguments():
+    interpreter = Interpreter()
+    run(interpreter, "fun f(x) = x * 2")
+    assert repr(run(interpreter, "f(2)")) == "4"
+    assert repr(run(interpreter, "f(2.0)")) == "4.0"
+    assert repr(run(interpreter, "f(1 < 2)")) == "2"
+
+
+def test_nomemo():
+    table = SymbolTable()
+    run(Interpreter(table), "@nomemo fun f(x) = x", "f(1) + f(1)")
+    function = table.get("f")
+    assert function.pure and not function.memoized  # type: ignore
+    assert function_stats(table) == {}
+
+
+def test_reads_of_parent_scopes_are_impure():
+    parent = SymbolTable()
+    parent.set("r", Number(Decimal("2")))
+    table = SymbolTable()
+    table.set_parent(parent)
+    run(Interpreter(table), "fun f(x) = x * r", "fun g(x) = f(x) + 1", "fun h() = 1")
+    assert not table.get("f").pure  # type: ignore
+    assert not table.get("g").pure  # type: ignore
+    assert table.get("h").memoized  # type: ignore
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(functions, "FUNCTION_CACHE_SIZE", 2)
+    table = SymbolTable()
+    run(Interpreter(table), "fun f(x) = x", "f(1) + f(2) + f(3) + f(1)")
+    stats = function_stats(table)["f"]
+    assert (stats.hits, stats.misses, stats.evictions) == (0, 4, 2)
+
+
+def test_errors_are_not_cached():
+    table = SymbolTable()
+    interpreter = Interpreter(table)
+    run(interpreter, "fun f(x) = 1 / x")
+    for _ in range(2):
+        with pytest.raises(Exception, match="Runtime math error"):
+            run(interpreter, "f(0)")
+    assert function_stats(table)["f"].misses == 2
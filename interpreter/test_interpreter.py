@@ -3,6 +3,7 @@ from typing import Type
 
 import pytest
 
+from lexer import Lexer
 from nodes import (
     AddNode,
     AndNode,
@@ -27,6 +28,7 @@ from nodes import (
     UnaryCompNode,
     ValueAccessNode,
 )
+from parser_ import Parser
 
 from .interpreter import Interpreter
 from .values import BooleanValue, False_, Number, True_
@@ -154,3 +156,27 @@ def test_nested_logical_operators():
     interpreter = Interpreter()
     result = interpreter.visit(tree)
     assert result == True_()
+
+
+def test_programs():
+    interpreter = Interpreter()
+    tokens = Lexer("var a = 2; var b = a * 3\n\na + b; b").generate_tokens()
+    assert interpreter.evaluate(tokens) == Number(Decimal("6"))
+    program = Parser(Lexer("a * 2; var c = 1\nc").generate_tokens()).parse_program()
+    emitted = []
+    interpreter.execute(program, emitted.append)
+    assert emitted == [Number(Decimal("4")), Number(Decimal("1"))]
+    assert interpreter.evaluate(Lexer(";\n").generate_tokens()) is None
+
+
+def test_fork():
+    interpreter = Interpreter()
+    interpreter.visit(AssignmentNode("a", NumberNode(Decimal("1"))))
+    fork = interpreter.fork()
+    fork.visit(AssignmentNode("b", NumberNode(Decimal("2"))))
+    interpreter.visit(AssignmentNode("b", NumberNode(Decimal("3"))))
+
+    assert fork.visit(AddNode(ValueAccessNode("a"), ValueAccessNode("b"))) == Number(
+        Decimal("3")
+    )
+    assert interpreter.visit(ValueAccessNode("b")) == Number(Decimal("3"))
@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from parser_ import Parser
+
+from .interpreter import Interpreter
+from .lazy import LazyEvaluationError, LazyInterpreter, Thunk
+from .snapshot import load_snapshot
+from .symbol_table import SymbolTable
+from .values import Number
+
+
+def run(interpreter, source):
+    return interpreter.visit(Parser(Lexer(source).generate_tokens()).parse())
+
+
+def test_definition_is_evaluated_on_first_read():
+    table = SymbolTable()
+    interpreter = LazyInterpreter(table)
+    run(interpreter, "var x = 2 ^ 0.5")
+    thunk = table.get("x")
+    assert type(thunk) is Thunk
+    assert not thunk.is_forced
+
+    value = run(interpreter, "x * x")
+    assert thunk.is_forced
+    assert value == run(Interpreter(), "2 ^ 0.5 * 2 ^ 0.5")
+    assert run(interpreter, "x") is run(interpreter, "x")
+
+
+def test_unread_definitions_are_never_evaluated():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x = 1 / 0")
+    run(interpreter, "var y = 2")
+    assert run(interpreter, "y + 1") == Number(Decimal("3"))
+
+
+def test_error_is_raised_on_every_read():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x = 1 / 0")
+    for _ in range(2):
+        with pytest.raises(LazyEvaluationError) as info:
+            run(interpreter, "x + 1")
+        assert str(info.value) == "Runtime math error (in the definition x=(1/0))"
+        assert info.value.definition.name == "x"
+
+
+def test_definition_sees_variables_at_definition_time():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var y = z + 1")
+    run(interpreter, "var z = 1")
+    with pytest.raises(LazyEvaluationError, match="'z' is not defined"):
+        run(interpreter, "y")
+
+
+def test_redefinition():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x = 1")
+    with pytest.raises(Exception, match="'x' is already defined"):
+        run(interpreter, "var x = 2")
+
+
+def test_nested_definition_is_immediate():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x = (var y = 2)")
+    assert run(interpreter, "y") == Number(Decimal("2"))
+
+
+def test_snapshot_forces_definitions(tmp_path):
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x = 3 * 4")
+    interpreter.snapshot(tmp_path / "snapshot")
+    assert load_snapshot(tmp_path / "snapshot").get("x") == Number(Decimal("12"))
+
+
+def test_long_chain_of_definitions():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x0 = 1")
+    for i in range(1, 2000):
+        run(interpreter, f"var x{i} = x{i - 1} + 1")
+    assert run(interpreter, "x1999") == Number(Decimal("2000"))
+
+
+def test_error_of_a_dependency_is_not_wrapped_again():
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x0 = 1 / 0")
+    for i in range(1, 300):
+        run(interpreter, f"var x{i} = x{i - 1} + 1")
+    with pytest.raises(LazyEvaluationError) as info:
+        run(interpreter, "x299")
+    assert str(info.value) == "Runtime math error (in the definition x0=(1/0))"
+
+
+def test_recursion_error_is_not_kept(monkeypatch):
+    interpreter = LazyInterpreter()
+    run(interpreter, "var x = 1 + 2")
+    visit = LazyInterpreter.visit
+
+    def overflow(self, node):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(LazyInterpreter, "visit", overflow)
+    with pytest.raises(RecursionError):
+        interpreter._lookup("x")
+    monkeypatch.setattr(LazyInterpreter, "visit", visit)
+    assert run(interpreter, "x") == Number(Decimal("3"))
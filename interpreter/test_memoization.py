@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from parser_ import Parser
+
+from .memoization import MemoizingInterpreter
+from .symbol_table import SymbolTable
+from .values import Number
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse()
+
+
+def run(interpreter, text):
+    return interpreter.visit(parse(text))
+
+
+@pytest.fixture
+def interpreter():
+    interpreter = MemoizingInterpreter()
+    run(interpreter, "var scale = 4")
+    run(interpreter, "var offset = 2")
+    return interpreter
+
+
+def test_shared_subtree_is_computed_once(interpreter):
+    assert run(interpreter, "(scale * 3 + offset) * 2") == Number(Decimal("28"))
+    misses = interpreter.stats.misses
+    assert run(interpreter, "1 + (scale * 3 + offset)") == Number(Decimal("15"))
+    assert interpreter.stats.hits == 1
+    assert interpreter.stats.misses == misses + 1
+    assert interpreter.stats.saved_time > 0
+    assert 0 < interpreter.stats.hit_rate < 1
+
+
+def test_changed_input_misses(interpreter):
+    run(interpreter, "(scale * 3 + offset) * 2")
+    interpreter._symbol_table.set("scale", Number(Decimal("5")))
+    assert run(interpreter, "(scale * 3 + offset) * 2") == Number(Decimal("34"))
+    assert interpreter.stats.hits == 0
+
+
+def test_cheap_subtrees_are_not_cached(interpreter):
+    run(interpreter, "scale * 3")
+    run(interpreter, "scale * 3")
+    assert interpreter.stats.hits == interpreter.stats.misses == 0
+
+
+def test_assignments_are_not_cached(interpreter):
+    run(interpreter, "var a = scale * 3 + offset")
+    with pytest.raises(Exception, match="'a' is already defined"):
+        run(interpreter, "var a = scale * 3 + offset")
+    assert interpreter.stats.hits == 1
+
+
+def test_errors_are_not_cached(interpreter):
+    for _ in range(2):
+        with pytest.raises(Exception, match="Runtime math error"):
+            run(interpreter, "(scale - 3) / 0 + offset")
+    assert interpreter.stats.hits == 0
+
+
+def test_least_recently_used_results_are_evicted():
+    interpreter = MemoizingInterpreter(max_size=2)
+    for text in ["1 + 2 * 3", "2 + 2 * 3", "1 + 2 * 3", "3 + 2 * 3", "2 + 2 * 3"]:
+        run(interpreter, text)
+    assert interpreter.stats.hits == 1
+    assert interpreter.stats.evictions == 2
+    run(interpreter, "3 + 2 * 3")
+    assert interpreter.stats.hits == 2
+    run(interpreter, "1 + 2 * 3")
+    assert interpreter.stats.hits == 2
+
+
+def test_descriptions_are_bounded():
+    interpreter = MemoizingInterpreter(max_size=2)
+    for i in range(100):
+        assert run(interpreter, f"{i} + 2 * 3") == Number(Decimal(i + 6))
+    assert len(interpreter._infos) <= 16
+    assert len(interpreter._structures) <= 16
+    # Results cached before dropping descriptions are never mistaken for others.
+    assert run(interpreter, "1 + 2 * 3") == Number(Decimal("7"))
+
+
+def test_ranges_are_not_cached(interpreter):
+    run(interpreter, "var a1 = 1")
+    run(interpreter, "var a2 = 2")
+    assert run(interpreter, "sum(a1:a2, a*) * 3 + offset") == Number(Decimal("20"))
+    run(interpreter, "var a3 = 3")
+    assert run(interpreter, "sum(a1:a2, a*) * 3 + offset") == Number(Decimal("29"))
+    assert interpreter.stats.hits == 0
+
+
+def test_calls_of_impure_functions_are_not_cached():
+    parent = SymbolTable()
+    parent.set("p", Number(Decimal("1")))
+    table = SymbolTable()
+    table.set_parent(parent)
+    interpreter = MemoizingInterpreter(table)
+    run(interpreter, "fun g(x) = x + p")
+    assert not table.get("g").pure
+    assert run(interpreter, "g(1) * g(2) + 1") == Number(Decimal("7"))
+    parent.set("p", Number(Decimal("2")))
+    assert run(interpreter, "g(1) * g(2) + 1") == Number(Decimal("13"))
@@ -0,0 +1,86 @@
+import random
+
+from .persistent_map import PersistentMap
+
+
+class CollidingKey:
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 42
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.name == self.name
+
+
+def test_empty():
+    mapping = PersistentMap()
+    assert len(mapping) == 0
+    assert mapping.get("a") is None
+    assert "a" not in mapping
+    assert list(mapping.items()) == []
+
+
+def test_set_and_get():
+    mapping = PersistentMap().set("a", 1).set("b", 2).set("a", 3)
+    assert len(mapping) == 2
+    assert mapping.get("a") == 3
+    assert mapping.get("b") == 2
+    assert mapping.get("c", 0) == 0
+    assert dict(mapping.items()) == {"a": 3, "b": 2}
+
+
+def test_updates_are_persistent():
+    original = PersistentMap().set("a", 1)
+    changed = original.set("a", 2).set("b", 3).delete("a")
+    assert dict(original.items()) == {"a": 1}
+    assert dict(changed.items()) == {"b": 3}
+
+
+def test_unchanged_map_is_reused():
+    mapping = PersistentMap().set("a", 1)
+    assert mapping.delete("b") is mapping
+    assert mapping.set("a", 1) is mapping
+
+
+def test_update():
+    original = PersistentMap().set("a", 1)
+    changed = original.update([("a", 2), ("b", 3)])
+    assert dict(original.items()) == {"a": 1}
+    assert dict(changed.items()) == {"a": 2, "b": 3}
+    assert len(changed) == 2
+    assert changed.update([("b", 3)]) is changed
+
+
+def test_many_keys():
+    random.seed(0)
+    mapping = PersistentMap()
+    expected = {}
+    for index in range(5000):
+        key = f"var_{random.getrandbits(32)}"
+        mapping = mapping.set(key, index)
+        expected[key] = index
+    assert len(mapping) == len(expected)
+    assert dict(mapping.items()) == expected
+
+    for key in list(expected)[::2]:
+        mapping = mapping.delete(key)
+        del expected[key]
+    assert len(mapping) == len(expected)
+    assert dict(mapping.items()) == expected
+    assert all(mapping.get(key) == value for key, value in expected.items())
+
+
+def test_hash_collisions():
+    keys = [CollidingKey(name) for name in "abcde"]
+    mapping = PersistentMap().set(42, "int")
+    for index, key in enumerate(keys):
+        mapping = mapping.set(key, index)
+    assert len(mapping) == 6
+    assert [mapping.get(key) for key in keys] == [0, 1, 2, 3, 4]
+    assert mapping.get(42) == "int"
+
+    for key in keys:
+        mapping = mapping.delete(key)
+    assert dict(mapping.items()) == {42: "int"}
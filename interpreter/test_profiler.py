@@ -0,0 +1,94 @@
+import io
+import sys
+
+from nodes import NumberNode
+from parser_ import parse_with_positions
+
+from .interpreter import Interpreter
+from .profiler import Profiler
+
+SCRIPT = """fun f(x) = x * 7
+var a = f(2) + 1
+a * 7
+"""
+
+
+class SamplingInterpreter(Interpreter):
+    """Take a sample of one second whenever the number 7 is evaluated."""
+
+    __slots__ = ("profiler",)
+
+    def visit_NumberNode(self, node: NumberNode):
+        if node.value == 7:
+            self.profiler._sample(sys._getframe(), 1.0)
+        return super().visit_NumberNode(node)
+
+
+def profile(text):
+    program, source_map = parse_with_positions(text)
+    profiler = Profiler(source_map)
+    interpreter = SamplingInterpreter()
+    interpreter.profiler = profiler
+    interpreter.visit(program)
+    return profiler
+
+
+def test_expressions():
+    profiler = profile(SCRIPT)
+    assert profiler.samples == 2
+    assert [
+        (entry.line, entry.source, entry.self_time, entry.total_time)
+        for entry in profiler.expressions()
+    ] == [
+        (1, "7", 1.0, 1.0),
+        (3, "7", 1.0, 1.0),
+        (1, "x * 7", 0.0, 1.0),
+        (2, "var a = f(2) + 1", 0.0, 1.0),
+        (2, "f(2) + 1", 0.0, 1.0),
+        (2, "f(2)", 0.0, 1.0),
+        (3, "a * 7", 0.0, 1.0),
+    ]
+
+
+def test_lines():
+    profiler = profile(SCRIPT)
+    assert [
+        (entry.line, entry.source, entry.self_time, entry.total_time, entry.samples)
+        for entry in profiler.lines()
+    ] == [
+        (1, "fun f(x) = x * 7", 1.0, 1.0, 1),
+        (3, "a * 7", 1.0, 1.0, 1),
+        (2, "var a = f(2) + 1", 0.0, 1.0, 1),
+    ]
+    output = io.StringIO()
+    profiler.write_lines(output)
+    assert output.getvalue().splitlines()[1:] == [
+        "     1    50.0%    50.0%        1  fun f(x) = x * 7",
+        "     3    50.0%    50.0%        1  a * 7",
+        "     2     0.0%    50.0%        1  var a = f(2) + 1",
+    ]
+
+
+def test_collapsed_stacks():
+    profiler = profile(SCRIPT + "var b = 1; " + "1 + " * 30 + "7")
+    output = io.StringIO()
+    profiler.write_collapsed(output)
+    lines = output.getvalue().splitlines()
+    assert lines[:2] == [
+        "var a = f(2) + 1 (line 2);f(2) + 1 (line 2);f(2) (line 2);"
+        "x * 7 (line 1);7 (line 1) 1",
+        "a * 7 (line 3);7 (line 3) 1",
+    ]
+    # Long sources are shortened and can't contain the frame separator.
+    assert lines[2] == "1 + " * 14 + "1... (line 4);7 (line 4) 1"
+
+
+def test_sampling_thread():
+    text = "fun sq(x) = x * x\n" + "".join(
+        f"var a{i} = sq({i}) + sq({i} + 1) * 3\n" for i in range(3000)
+    )
+    program, source_map = parse_with_positions(text)
+    with Profiler(source_map, interval=0.001) as profiler:
+        Interpreter().visit(program)
+    assert profiler.samples > 0
+    assert all(entry.line >= 1 for entry in profiler.lines())
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from parser_ import Parser
+
+from .reactive import ReactiveInterpreter
+from .values import Number
+
+
+def run(interpreter, text):
+    return interpreter.visit(Parser(Lexer(text).generate_tokens()).parse())
+
+
+@pytest.fixture
+def sheet():
+    interpreter = ReactiveInterpreter()
+    for line in [
+        "var rate = 2",
+        "var base = 10",
+        "var unrelated = 7",
+        "var gross = base * rate",
+        "var net = gross - 1",
+        "var other = unrelated + 1",
+    ]:
+        run(interpreter, line)
+    return interpreter
+
+
+def test_redefinition_recomputes_dependents(sheet):
+    run(sheet, "var rate = 3")
+    assert run(sheet, "net") == Number(Decimal("29"))
+    assert sheet.last_update.recomputed == ["gross", "net"]
+    assert sheet.last_update.skipped == 3
+
+
+def test_new_definition_reports(sheet):
+    run(sheet, "var total = net + other")
+    assert sheet.last_update.name == "total"
+    assert sheet.last_update.recomputed == []
+    assert sheet.last_update.skipped == 6
+
+
+def test_redefinition_changes_dependencies(sheet):
+    run(sheet, "var gross = unrelated * 2")
+    run(sheet, "var base = 100")
+    assert sheet.last_update.recomputed == []
+    run(sheet, "var unrelated = 1")
+    assert sheet.last_update.recomputed == ["gross", "net", "other"]
+    assert run(sheet, "net") == Number(Decimal("1"))
+
+
+def test_circular_definition(sheet):
+    with pytest.raises(Exception, match="Circular definition of 'rate'"):
+        run(sheet, "var rate = net")
+    with pytest.raises(Exception, match="Circular definition of 'x'"):
+        run(sheet, "var x = x + 1")
+
+
+def test_failed_update_is_rolled_back(sheet):
+    run(sheet, "var ratio = 1 / (base - 10 + 1)")
+    with pytest.raises(Exception, match="Runtime math error"):
+        run(sheet, "var base = 9")
+    assert run(sheet, "base") == Number(Decimal("10"))
+    assert run(sheet, "ratio") == Number(Decimal("1"))
+
+
+def test_fork_keeps_graph(sheet):
+    fork = sheet.fork()
+    run(fork, "var base = 1")
+    assert run(fork, "net") == Number(Decimal("1"))
+    assert run(sheet, "net") == Number(Decimal("19"))
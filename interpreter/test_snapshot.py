@@ -0,0 +1,170 @@
+import struct
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+
+from .interpreter import Interpreter
+from .snapshot import MAGIC, SnapshotError, dump_snapshot, load_snapshot
+from .symbol_table import SymbolTable
+from .values import False_, Number, True_
+
+
+def test_round_trip(tmp_path):
+    parent = SymbolTable()
+    parent.set("outer", Number(Decimal("-1.50")))
+    table = SymbolTable()
+    table.set_parent(parent)
+    table.set("a", Number(Decimal("10")))
+    table.set("yes", True_())
+    table.set("no", False_())
+    table.set("gone", Number(Decimal("1")))
+    table.remove("gone")
+
+    path = tmp_path / "state.snap"
+    dump_snapshot(table, path)
+    restored = load_snapshot(path)
+
+    assert dict(restored.items()) == {
+        "a": Number(Decimal("10")),
+        "yes": True_(),
+        "no": False_(),
+    }
+    assert restored.get("yes") is True_()
+    assert str(restored.get("outer")) == "-1.50"
+    assert restored.parent is not None
+    assert dict(restored.parent.items()) == {"outer": Number(Decimal("-1.50"))}
+
+
+def test_empty_table(tmp_path):
+    path = tmp_path / "state.snap"
+    dump_snapshot(SymbolTable(), path)
+    assert list(load_snapshot(path).items()) == []
+
+
+def test_interpreter_restore(tmp_path):
+    table = SymbolTable()
+    table.update({f"v{i}": Number(Decimal(i)) for i in range(1000)})
+    interpreter = Interpreter(table)
+    path = tmp_path / "state.snap"
+    interpreter.snapshot(path)
+
+    restored = Interpreter.restore(path)
+    assert dict(restored.fork()._symbol_table.items()) == dict(table.items())
+
+
+def test_bulk_update_keeps_existing_symbols():
+    table = SymbolTable()
+    table.update({"a": Number(Decimal("1")), "b": Number(Decimal("2"))})
+    base = table._base
+    table.update({"b": Number(Decimal("20")), "c": Number(Decimal("3"))})
+
+    assert table._base is base
+    assert dict(table.items()) == {
+        "a": Number(Decimal("1")),
+        "b": Number(Decimal("20")),
+        "c": Number(Decimal("3")),
+    }
+
+
+def test_bulk_update_keeps_forks_independent():
+    table = SymbolTable()
+    table.set("a", Number(Decimal("1")))
+    table.update({"b": Number(Decimal("2")), "c": Number(Decimal("3"))})
+    fork = table.fork()
+    fork.remove("b")
+    fork.set("c", Number(Decimal("30")))
+
+    assert fork.get("b") is None
+    assert dict(fork.items()) == {
+        "a": Number(Decimal("1")),
+        "c": Number(Decimal("30")),
+    }
+    assert dict(table.items()) == {
+        "a": Number(Decimal("1")),
+        "b": Number(Decimal("2")),
+        "c": Number(Decimal("3")),
+    }
+
+
+def test_invalid_magic(tmp_path):
+    path = tmp_path / "state.snap"
+    path.write_bytes(b"JUNK" + bytes(10))
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+
+def test_unsupported_version(tmp_path):
+    path = tmp_path / "state.snap"
+    dump_snapshot(SymbolTable(), path)
+    data = bytearray(path.read_bytes())
+    data[len(MAGIC)] += 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+
+def test_truncated_snapshot(tmp_path):
+    table = SymbolTable()
+    table.set("a", Number(Decimal("1")))
+    path = tmp_path / "state.snap"
+    dump_snapshot(table, path)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+
+def test_unsupported_value(tmp_path):
+    table = SymbolTable()
+    table.set("a", object())  # type: ignore
+    with pytest.raises(SnapshotError):
+        dump_snapshot(table, tmp_path / "state.snap")
+
+
+def test_functions_round_trip(tmp_path):
+    interpreter = Interpreter()
+    for source in [
+        "var k = 3",
+        "fun f(x) = x * k",
+        "@nomemo fun g(x, y) = f(x) + y",
+        "fun h(n) = n",
+    ]:
+        interpreter.evaluate(Lexer(source).generate_tokens())
+    path = tmp_path / "state.snap"
+    interpreter.snapshot(path)
+
+    restored = Interpreter.restore(path)
+    value = restored.evaluate(Lexer("g(2, 1) + h(4)").generate_tokens())
+    assert value == Number(Decimal("11"))
+    table = restored._symbol_table
+    assert repr(table.get("g")) == "<fun g(x, y)>"
+    assert table.get("f").memoized
+    assert not table.get("g").memoized
+
+
+def test_arrays_round_trip(tmp_path):
+    pytest.importorskip("numpy")
+    interpreter = Interpreter()
+    interpreter.evaluate(Lexer("var xs = [1, 2.5, -0.1]").generate_tokens())
+    interpreter.evaluate(Lexer("var bs = xs > 0").generate_tokens())
+    interpreter.evaluate(Lexer("var empty = [1:0]").generate_tokens())
+    path = tmp_path / "state.snap"
+    interpreter.snapshot(path)
+
+    table = load_snapshot(path)
+    for name in ["xs", "bs", "empty"]:
+        assert table.get(name) == interpreter._symbol_table.get(name)
+
+
+@pytest.mark.parametrize("value", [b"fun 1 !!", b"fun 1 Q1RCTgI=", b"[1, x]"])
+def test_corrupted_values(tmp_path, value):
+    table = SymbolTable()
+    table.set("a", Number(Decimal("1")))
+    path = tmp_path / "state.snap"
+    dump_snapshot(table, path)
+    data = path.read_bytes()
+    header = len(data) - len(b"a") - len(b"1")
+    path.write_bytes(data[: header - 4] + struct.pack("<I", len(value)) + b"a" + value)
+    with pytest.raises(SnapshotError, match="Corrupted snapshot"):
+        load_snapshot(path)
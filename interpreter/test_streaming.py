@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from parser_ import Parser
+
+from .interpreter import Interpreter
+from .streaming import evaluate_tokens
+from .symbol_table import SymbolTable
+from .values import Number
+
+
+def make_table() -> SymbolTable:
+    table = SymbolTable()
+    for name, value in [("a", "2"), ("b", "0"), ("c", "-3")]:
+        table.set(name, Number(Decimal(value)))
+    return table
+
+
+def outcome(evaluate, source):
+    table = make_table()
+    try:
+        result = ("ok", repr(evaluate(source, table)))
+    except Exception as error:
+        result = ("error", type(error), str(error))
+    return result, {name: repr(table.get(name)) for name in "abcxy"}
+
+
+def walk(source, table):
+    tree = Parser(Lexer(source).generate_tokens()).parse()
+    return None if tree is None else Interpreter(table).visit(tree)
+
+
+def stream(source, table):
+    return evaluate_tokens(Lexer(source).generate_tokens(), table)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "   ",
+        "1 + 2 * 3 - 4 / 5 % 3",
+        "2 ^ 3 ^ 2",
+        "-2 ^ 2",
+        "2 ^ -a ^ 2",
+        "- - +a * -b",
+        "a < 3 == b > 1",
+        "!a < b && !!c || a",
+        "a && !b",
+        "a >= 2 || x",
+        "b && x",
+        "(a + b) * (c - a",
+        "((a)",
+        "var x = 1 + 2 * a",
+        "var x = var y = a",
+        "var x = +(var y = 1)",
+        "(var x = 1) + (var x = 2)",
+        "(var x = 1) + x",
+        "var a = 1",
+        "x + (var y = 1)",
+        "1 / b",
+        "(1 / b) ^ 2",
+        "1 / (c ^ 0.5)",
+        "c ^ x",
+        "(var x = c) ^ 2",
+        "1 / b + x",
+        "1 +",
+        "var",
+        "var x",
+        "var x =",
+        "1 + (var x = 2)",
+        "a < !b",
+        "a = 1",
+        "(var x = 1))",
+        "(var x = 1) + ",
+        "1 / b 2",
+        "1 2",
+        "a $",
+        ")",
+        "()",
+        "a + (b))",
+    ],
+)
+def test_matches_parser_and_interpreter(source):
+    assert outcome(stream, source) == outcome(walk, source)
+
+
+def test_empty_input():
+    assert evaluate_tokens(iter([]), SymbolTable()) is None
+
+
+def test_syntax_error_discards_assignments():
+    table = SymbolTable()
+    with pytest.raises(Exception, match="Invalid syntax"):
+        stream("(var x = 1) 2", table)
+    assert table.get("x") is None
+
+
+def test_runtime_error_keeps_earlier_assignments():
+    table = SymbolTable()
+    with pytest.raises(Exception, match="Expected a number or an array, got None"):
+        stream("(var x = 1) + (var y = 2)", table)
+    assert table.get("x") == Number(Decimal("1"))
+    assert table.get("y") is None
+
+
+def test_interpreter_evaluate():
+    interpreter = Interpreter()
+    tokens = Lexer("var x = 2 ^ 0.5").generate_tokens()
+    assert interpreter.evaluate(tokens) is None
+    result = interpreter.evaluate(Lexer("x * x > 1.9").generate_tokens())
+    assert result.value == 1
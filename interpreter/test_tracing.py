@@ -0,0 +1,148 @@
+import pytest
+
+from lexer import Lexer
+from parser_ import Parser
+
+from .interpreter import Interpreter
+from .tracing import MAGIC, TraceError, TraceRecorder, load_trace
+
+SCRIPT = """var a = 2
+fun f(x) = x * a
+f(3) + 1 > 5
+"""
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse_program()
+
+
+def run(text, recorder):
+    Interpreter(recorder=recorder).visit(parse(text))
+
+
+def test_ring_keeps_last_events():
+    recorder = TraceRecorder(4)
+    run("1 + 2 * 3", recorder)
+    assert len(recorder) == 4
+    assert [
+        (type(node).__name__, str(result), level)
+        for node, result, level in recorder.events()
+    ] == [
+        ("NumberNode", "3", 3),
+        ("MultiplyNode", "6", 2),
+        ("AddNode", "7", 1),
+        ("ProgramNode", "7", 0),
+    ]
+
+
+def test_clear():
+    recorder = TraceRecorder(4)
+    run("1 + 2", recorder)
+    recorder.clear()
+    assert len(recorder) == 0
+    assert list(recorder.events()) == []
+
+
+def test_dump_round_trip(tmp_path):
+    recorder = TraceRecorder()
+    run(SCRIPT, recorder)
+    path = tmp_path / "trace.cttr"
+    recorder.dump(path)
+    assert path.read_bytes().startswith(MAGIC)
+    assert [str(event) for event in load_trace(path)] == [
+        "       1      Number() = 2",
+        "       2    Assignment(2) = none",
+        "       3    FunctionDefinition() = none",
+        "       4          Number() = 3",
+        "       5            Parameter() = 3",
+        "       6            ValueAccess() = 2",
+        "       7          Multiply(3, 2) = 6",
+        "       8        Call(3, 6) = 6",
+        "       9        Number() = 1",
+        "      10      Add(6, 1) = 7",
+        "      11      Number() = 5",
+        "      12    GreaterThan(7, 5) = true",
+        "      13  Program(none, none, true) = true",
+    ]
+
+
+def test_dump_numbers_events_after_wrapping(tmp_path):
+    recorder = TraceRecorder(3)
+    run("1 + 2 * 3", recorder)
+    path = tmp_path / "trace.cttr"
+    recorder.dump(path)
+    events = load_trace(path)
+    assert [(event.number, event.kind, event.operands) for event in events] == [
+        (1, "MultiplyNode", []),
+        (2, "AddNode", ["6"]),
+        (3, "ProgramNode", ["7"]),
+    ]
+
+
+def test_dump_on_error(tmp_path):
+    path = tmp_path / "trace.cttr"
+    with pytest.raises(Exception, match="Runtime math error"):
+        run("var a = 1\n1 / (a - 1)", TraceRecorder(dump_path=path))
+    events = load_trace(path)
+    assert [str(event) for event in events[-2:]] == [
+        "       7    Divide(1, 0) ! Runtime math error",
+        "       8  Program(none, Runtime math error) ! Runtime math error",
+    ]
+    assert [event.failed for event in events].count(True) == 2
+
+
+def test_errors_are_recorded_by_message():
+    recorder = TraceRecorder()
+    with pytest.raises(Exception, match="Runtime math error"):
+        run("1 / 0", recorder)
+    results = [result for _, result, _ in recorder.events()]
+    assert not any(isinstance(result, BaseException) for result in results)
+    assert [result.message for result in results[-2:]] == ["Runtime math error"] * 2
+
+
+def test_recording_is_optional():
+    interpreter = Interpreter()
+    assert interpreter.recorder is None
+    interpreter.visit(parse("var a = 1"))
+    interpreter.recorder = TraceRecorder(8)
+    interpreter.visit(parse("a + 1"))
+    assert len(interpreter.recorder) == 4
+
+
+def test_evaluate_records_nodes():
+    recorder = TraceRecorder()
+    Interpreter(recorder=recorder).evaluate(Lexer("1 + 2").generate_tokens())
+    assert [type(node).__name__ for node, _, _ in recorder.events()] == [
+        "NumberNode",
+        "NumberNode",
+        "AddNode",
+    ]
+
+
+def test_forks_share_recorder():
+    interpreter = Interpreter(recorder=TraceRecorder(8))
+    fork = interpreter.fork()
+    assert fork.recorder is interpreter.recorder
+    fork.visit(parse("1"))
+    assert len(interpreter.recorder) == 2
+
+
+@pytest.mark.parametrize(
+    ["data", "message"],
+    [
+        (b"", "Not a catsby trace"),
+        (b"NOPE" + bytes(18), "Not a catsby trace"),
+        (MAGIC + b"\x09\x00" + bytes(8), "Unsupported trace version 9"),
+        (MAGIC + b"\x02\x00\x01\x00\x00\x00" + bytes(4), "Corrupted catsby trace"),
+    ],
+)
+def test_load_errors(tmp_path, data, message):
+    path = tmp_path / "trace.cttr"
+    path.write_bytes(data)
+    with pytest.raises(TraceError, match=message):
+        load_trace(path)
+
+
+def test_size_must_be_positive():
+    with pytest.raises(TraceError):
+        TraceRecorder(0)
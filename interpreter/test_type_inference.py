@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from optimizer import eliminate_common_subexpressions
+from parser_ import Parser
+
+from .type_inference import ValueType, check_types, infer_types, type_of_value
+from .values import False_, Number, True_
+
+NUMBER = ValueType.NUMBER
+BOOLEAN = ValueType.BOOLEAN
+UNKNOWN = ValueType.UNKNOWN
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse()
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("1 + 2 * 3", NUMBER),
+        ("-(1 < 2)", NUMBER),
+        ("1 < 2 && 3 >= 4", BOOLEAN),
+        ("!1", BOOLEAN),
+        ("(1 < 2) == 3", BOOLEAN),
+        ("a", UNKNOWN),
+        ("flag", BOOLEAN),
+        ("var x = a ^ 2", NUMBER),
+    ],
+)
+def test_infer_types(source, expected):
+    tree = parse(source)
+    assert infer_types(tree, {"flag": BOOLEAN}).type_of(tree) == expected
+
+
+def test_mixed_ordering_is_reported():
+    tree = parse("1 + 2 > 2 && (1 < 2) <= 3")
+    diagnostics = infer_types(tree).diagnostics
+    assert len(diagnostics) == 1
+    assert diagnostics[0].node is tree.node_b
+    with pytest.raises(TypeError) as error:
+        check_types(tree)
+    assert str(error.value) == "Can't order boolean and number"
+
+
+@pytest.mark.parametrize(
+    ["left", "right"],
+    [
+        (Number(Decimal("1")), True_()),
+        (False_(), Number(Decimal("1"))),
+        (True_(), False_()),
+    ],
+)
+def test_runtime_check_rejects_reported_orderings(left, right):
+    with pytest.raises(TypeError) as error:
+        left < right
+    assert str(error.value) == (
+        f"Unsupported operation between {type(left)} and {type(right)}"
+    )
+    variables = {"a": type_of_value(left), "b": type_of_value(right)}
+    assert infer_types(parse("a < b"), variables).diagnostics
+
+
+def test_ordering_equal_booleans_is_reported():
+    assert (True_() < True_()) is False
+    diagnostics = infer_types(parse("a > b"), {"a": BOOLEAN, "b": BOOLEAN}).diagnostics
+    assert [diagnostic.message for diagnostic in diagnostics] == [
+        "Can't order boolean and boolean"
+    ]
+
+
+def test_unknown_variables_are_not_reported():
+    assert not infer_types(parse("a < (b > c)")).diagnostics
+
+
+def test_temporaries():
+    tree = eliminate_common_subexpressions(parse("(1 < 2) + (1 < 2) < 2 * (1 < 2)"))
+    info = infer_types(tree)
+    assert info.type_of(tree) == BOOLEAN
+    assert not info.diagnostics
+
+
+def test_type_of_value():
+    assert type_of_value(Number(Decimal("1"))) == NUMBER
+    assert type_of_value(True_()) == type_of_value(False_()) == BOOLEAN
+    assert type_of_value(None) == UNKNOWN
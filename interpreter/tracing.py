@@ -0,0 +1,246 @@
+"""Execution traces kept in a ring buffer.
+
+An `Interpreter` with a `TraceRecorder` records every node it evaluates, with
+its result and its nesting level. The recorder keeps the last `size` events in
+a deque filled up front, so recording appends references to objects which
+already exist and the oldest event falls out. Errors are recorded by their
+message, so the ring doesn't keep tracebacks and their frames alive. Operands
+aren't stored: a node's operands are the results of the events one level
+deeper which end right before it, and they're matched up when the trace is
+printed.
+
+Recording is meant for debugging, e.g. rerunning a session which gave a wrong
+result with a recorder, not for leaving on in production. Every node is
+recorded, which makes evaluation a fifth to a third slower (see
+`benchmarks.bench_tracing`), and a recording interpreter parses input which
+would otherwise be evaluated straight from its tokens. Without a recorder,
+`Interpreter.visit` only pays for checking that there is none.
+
+Dump layout:
+
+    header: MAGIC, format version, number of kinds, number of events
+    kinds: node class names, UTF-8, separated by newlines
+    per event: kind, level, value tag, value size
+    values: UTF-8 text of the values, one after another
+
+    python -m interpreter.tracing trace.cttr
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from nodes import Node
+
+from .values import False_, Number, True_
+
+MAGIC = b"CTTR"
+FORMAT_VERSION = 2
+DEFAULT_SIZE = 1 << 16
+
+_HEADER = struct.Struct("<4sHII")
+_EVENT = struct.Struct("<HHBI")
+_KINDS_SIZE = struct.Struct("<I")
+
+# Tags of the values of events.
+_NONE = 0
+_NUMBER = 1
+_TRUE = 2
+_FALSE = 3
+_ERROR = 4
+_OTHER = 5
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class TraceError(Exception):
+    pass
+
+
+class _Failure:
+    """Message of an error raised while evaluating a node."""
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+@dataclass
+class TraceEvent:
+    """An evaluated node, as read back from a dump."""
+
+    number: int
+    kind: str
+    level: int
+    value: str
+    failed: bool = False
+    operands: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        kind = self.kind[:-4] if self.kind.endswith("Node") else self.kind
+        arrow = "!" if self.failed else "="
+        operands = ", ".join(self.operands)
+        indent = "  " * self.level
+        return f"{self.number:>8}  {indent}{kind}({operands}) {arrow} {self.value}"
+
+
+class TraceRecorder:
+    """Ring buffer of the last `size` evaluated nodes with their results.
+
+    If `dump_path` is set, the trace is dumped there when an error leaves the
+    interpreter.
+    """
+
+    __slots__ = "size", "dump_path", "push", "_events"
+
+    def __init__(
+        self, size: int = DEFAULT_SIZE, dump_path: Optional[PathLike] = None
+    ) -> None:
+        if size <= 0:
+            raise TraceError("The size of a trace must be positive")
+        self.size = size
+        self.dump_path = dump_path
+        # Node, result and level of each event. Empty slots have no node.
+        self._events: deque[Any] = deque(repeat(None, 3 * size), 3 * size)
+        self.push = self._events.append
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.events())
+
+    def record(self, node: Node, result: Any, level: int) -> None:
+        push = self.push
+        push(node)
+        push(result)
+        push(level)
+
+    def record_error(self, node: Node, error: Exception, level: int) -> None:
+        self.record(node, _Failure(str(error)), level)
+        if level == 0 and self.dump_path is not None:
+            self.dump(self.dump_path)
+
+    def clear(self) -> None:
+        self._events.extend(repeat(None, 3 * self.size))
+
+    def events(self) -> Iterator[Tuple[Node, Any, int]]:
+        """Iterate over the recorded nodes, results and levels, oldest first."""
+
+        events = iter(self._events)
+        for node, result, level in zip(events, events, events):
+            if node is not None:
+                yield node, result, level
+
+    def dump(self, path: PathLike) -> None:
+        """Write the recorded events to a file."""
+
+        kinds: Dict[str, int] = {}
+        records: List[bytes] = []
+        values: List[bytes] = []
+        for node, result, level in self.events():
+            kind = kinds.setdefault(type(node).__name__, len(kinds))
+            tag, text = _encode_value(result)
+            data = text.encode()
+            records.append(_EVENT.pack(kind, level, tag, len(data)))
+            values.append(data)
+        kinds_data = "\n".join(kinds).encode()
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(kinds), len(records))
+        Path(path).write_bytes(
+            b"".join(
+                [header, _KINDS_SIZE.pack(len(kinds_data)), kinds_data]
+                + records
+                + values
+            )
+        )
+
+
+def load_trace(path: PathLike) -> List[TraceEvent]:
+    """Read the events of a dump, with the operands of each one matched up."""
+
+    data = Path(path).read_bytes()
+    try:
+        magic, version, kind_count, event_count = _HEADER.unpack_from(data)
+    except struct.error:
+        raise TraceError("Not a catsby trace")
+    if magic != MAGIC:
+        raise TraceError("Not a catsby trace")
+    if version != FORMAT_VERSION:
+        raise TraceError(f"Unsupported trace version {version}")
+
+    try:
+        position = _HEADER.size
+        (kinds_size,) = _KINDS_SIZE.unpack_from(data, position)
+        position += _KINDS_SIZE.size
+        kinds_end = position + kinds_size
+        kinds = data[position:kinds_end].decode().split("\n") if kind_count else []
+        position = kinds_end
+        records_end = position + _EVENT.size * event_count
+        records = list(_EVENT.iter_unpack(data[position:records_end]))
+        position = records_end
+    except (struct.error, UnicodeDecodeError):
+        raise TraceError("Corrupted catsby trace")
+    if len(kinds) != kind_count or len(records) != event_count:
+        raise TraceError("Corrupted catsby trace")
+
+    events: List[TraceEvent] = []
+    # Values of finished events not yet taken as operands, with their levels.
+    pending: List[Tuple[int, str]] = []
+    for number, (kind, level, tag, size) in enumerate(records, 1):
+        end = position + size
+        value = data[position:end].decode()
+        position = end
+        event = TraceEvent(number, kinds[kind], level, _decode_value(tag, value))
+        event.failed = tag == _ERROR
+        while pending and pending[-1][0] > level:
+            if pending[-1][0] == level + 1:
+                event.operands.append(pending[-1][1])
+            pending.pop()
+        event.operands.reverse()
+        pending.append((level, event.value))
+        events.append(event)
+    if position != len(data):
+        raise TraceError("Corrupted catsby trace")
+    return events
+
+
+def _encode_value(value: Any) -> Tuple[int, str]:
+    kind = type(value)
+    if kind is Number:
+        return _NUMBER, str(value.value)
+    if kind is True_:
+        return _TRUE, ""
+    if kind is False_:
+        return _FALSE, ""
+    if value is None:
+        return _NONE, ""
+    if kind is _Failure:
+        return _ERROR, value.message
+    return _OTHER, repr(value)
+
+
+def _decode_value(tag: int, text: str) -> str:
+    if tag == _NONE:
+        return "none"
+    if tag == _TRUE:
+        return "true"
+    if tag == _FALSE:
+        return "false"
+    return text
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        print("Usage: python -m interpreter.tracing TRACE")
+        sys.exit(2)
+    for event in load_trace(sys.argv[1]):
+        print(event)
+
+
+if __name__ == "__main__":
+    main()
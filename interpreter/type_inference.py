@@ -0,0 +1,186 @@
+"""Static inference of number and boolean types.
+
+Arithmetic always results in a number, comparisons and logical operators in a
+boolean. Ordering a boolean is a type error, as `type_check` rejects ordering
+values of different classes and `true` and `false` are of different classes.
+Ordering two equal booleans is accepted at runtime but always false, so it's
+reported as well. Which boolean a subtree results in isn't known statically,
+so diagnostics name the types rather than the classes of the values. Variables
+whose types aren't given are unknown and never cause an error.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from nodes import (
+    AddNode,
+    AndNode,
+    ArrayNode,
+    ArrayRangeNode,
+    AssignmentNode,
+    CallNode,
+    DivideNode,
+    DoubleEqualsNode,
+    FunctionDefinitionNode,
+    GreaterThanNode,
+    GreaterThanOrEqualsNode,
+    IndexNode,
+    LessThanNode,
+    LessThanOrEqualsNode,
+    LetNode,
+    MinusNode,
+    ModuloNode,
+    MultiplyNode,
+    Node,
+    NotEqualsNode,
+    NotNode,
+    NumberNode,
+    OrNode,
+    ParameterNode,
+    PatternNode,
+    PlusNode,
+    PowerNode,
+    ProgramNode,
+    RangeNode,
+    SubtractNode,
+    TempNode,
+    ValueAccessNode,
+    iter_children,
+)
+
+from .values import False_, Number, True_
+
+
+class ValueType(Enum):
+    NUMBER = "number"
+    BOOLEAN = "boolean"
+    UNKNOWN = "unknown"
+
+
+@dataclass
+class TypeDiagnostic:
+    node: Node
+    message: str
+
+
+def type_of_value(value: Any) -> ValueType:
+    value_type = type(value)
+    if value_type is Number:
+        return ValueType.NUMBER
+    if value_type is True_ or value_type is False_:
+        return ValueType.BOOLEAN
+    return ValueType.UNKNOWN
+
+
+_ARITHMETIC = (
+    AddNode,
+    SubtractNode,
+    MultiplyNode,
+    DivideNode,
+    ModuloNode,
+    PowerNode,
+    PlusNode,
+    MinusNode,
+)
+_ORDERING = (
+    LessThanNode,
+    GreaterThanNode,
+    LessThanOrEqualsNode,
+    GreaterThanOrEqualsNode,
+)
+_LOGICAL = (DoubleEqualsNode, NotEqualsNode, AndNode, OrNode, NotNode)
+_ARRAY = (ArrayNode, ArrayRangeNode, IndexNode)
+
+
+class TypeInfo:
+    """Types of all subtrees of a tree and the type errors found in it."""
+
+    __slots__ = "_types", "diagnostics"
+
+    def __init__(self) -> None:
+        self._types: Dict[int, Tuple[Node, ValueType]] = {}
+        self.diagnostics: List[TypeDiagnostic] = []
+
+    def type_of(self, node: Node) -> ValueType:
+        entry = self._types.get(id(node))
+        if entry is None or entry[0] is not node:
+            raise KeyError(node)
+        return entry[1]
+
+    def _set(self, node: Node, value_type: ValueType) -> ValueType:
+        self._types[id(node)] = (node, value_type)
+        return value_type
+
+
+def infer_types(
+    node: Node, variables: Optional[Mapping[str, ValueType]] = None
+) -> TypeInfo:
+    """Infer the type of every subtree, given the types of variables."""
+
+    info = TypeInfo()
+    _infer(node, variables or {}, {}, info)
+    return info
+
+
+def check_types(
+    node: Node, variables: Optional[Mapping[str, ValueType]] = None
+) -> None:
+    """Raise the first type error of a tree, if there is any."""
+
+    diagnostics = infer_types(node, variables).diagnostics
+    if diagnostics:
+        raise TypeError(diagnostics[0].message)
+
+
+def _infer(
+    node: Node,
+    variables: Mapping[str, ValueType],
+    temporaries: Dict[int, ValueType],
+    info: TypeInfo,
+) -> ValueType:
+    if isinstance(node, NumberNode):
+        return info._set(node, ValueType.NUMBER)
+    if isinstance(node, ValueAccessNode):
+        return info._set(node, variables.get(node.name, ValueType.UNKNOWN))
+    if isinstance(node, TempNode):
+        return info._set(node, temporaries.get(node.index, ValueType.UNKNOWN))
+    if isinstance(node, (FunctionDefinitionNode, ParameterNode)):
+        # Types of parameters are only known per call.
+        return info._set(node, ValueType.UNKNOWN)
+    if isinstance(node, (RangeNode, PatternNode)):
+        # Arguments of built-ins, which take values of any type.
+        return info._set(node, ValueType.UNKNOWN)
+    if isinstance(node, ProgramNode):
+        types = [
+            _infer(statement, variables, temporaries, info)
+            for statement in node.statements
+        ]
+        return info._set(node, types[-1] if types else ValueType.UNKNOWN)
+    if isinstance(node, LetNode):
+        temporaries[node.index] = _infer(node.value, variables, temporaries, info)
+        return info._set(node, _infer(node.body, variables, temporaries, info))
+
+    types = [
+        _infer(child, variables, temporaries, info) for child in iter_children(node)
+    ]
+    if isinstance(node, _ARRAY):
+        # Arrays, and elements of which the type is only known at runtime.
+        return info._set(node, ValueType.UNKNOWN)
+    if isinstance(node, _ARITHMETIC):
+        return info._set(node, ValueType.NUMBER)
+    if isinstance(node, _ORDERING):
+        left, right = types
+        if ValueType.UNKNOWN not in types and ValueType.BOOLEAN in types:
+            message = f"Can't order {left.value} and {right.value}"
+            info.diagnostics.append(TypeDiagnostic(node, message))
+        return info._set(node, ValueType.BOOLEAN)
+    if isinstance(node, _LOGICAL):
+        return info._set(node, ValueType.BOOLEAN)
+    if isinstance(node, AssignmentNode):
+        return info._set(node, types[0])
+    if isinstance(node, CallNode):
+        return info._set(node, ValueType.UNKNOWN)
+    raise TypeError(f"Can't infer the type of {type(node).__name__}")
@@ -1 +1,2 @@
 from .lexer import Lexer
+from .positions import PositionLexer
@@ -1,6 +1,6 @@
 import string
 
-WHITESPACE = frozenset({" ", "\n", "\t"})
+WHITESPACE = frozenset({" ", "\t", "\r"})
 DIGITS = frozenset({"0", "1", "2", "3", "4", "5", "6", "7", "8", "9", ""})
 LETTERS = frozenset(string.ascii_letters)
 LETTERS_AND_DIGITS = LETTERS.union(DIGITS)
@@ -11,6 +11,13 @@ MULTIPLY = "*"
 DIVIDE = "/"
 LEFT_PAREN = "("
 RIGHT_PAREN = ")"
+LEFT_BRACKET = "["
+RIGHT_BRACKET = "]"
+COMMA = ","
+COLON = ":"
+SEMICOLON = ";"
+NEWLINE = "\n"
+AT = "@"
 POWER = "^"
 MODULO = "%"
 EQ = "="
@@ -2,22 +2,29 @@ from typing import Optional
 
 from .char_constants import (
     AND,
+    AT,
+    COLON,
+    COMMA,
     DECIMAL_POINT,
     DIGITS,
     DIVIDE,
     EQ,
     GT,
+    LEFT_BRACKET,
     LEFT_PAREN,
     LETTERS,
     LT,
     MINUS,
     MODULO,
     MULTIPLY,
+    NEWLINE,
     NOT,
     OR,
     PLUS,
     POWER,
+    RIGHT_BRACKET,
     RIGHT_PAREN,
+    SEMICOLON,
     UNDERSCORE,
     WHITESPACE,
 )
@@ -95,6 +102,48 @@ def is_right_paren(char: Optional[str]) -> bool:
     return char == RIGHT_PAREN
 
 
+def is_at(char: Optional[str]) -> bool:
+    """Check if character starts an annotation."""
+
+    return char == AT
+
+
+def is_left_bracket(char: Optional[str]) -> bool:
+    """Check if character is a left bracket."""
+
+    return char == LEFT_BRACKET
+
+
+def is_right_bracket(char: Optional[str]) -> bool:
+    """Check if character is a right bracket."""
+
+    return char == RIGHT_BRACKET
+
+
+def is_colon(char: Optional[str]) -> bool:
+    """Check if character is a colon."""
+
+    return char == COLON
+
+
+def is_semicolon(char: Optional[str]) -> bool:
+    """Check if character is a semicolon."""
+
+    return char == SEMICOLON
+
+
+def is_newline(char: Optional[str]) -> bool:
+    """Check if character is a line break."""
+
+    return char == NEWLINE
+
+
+def is_comma(char: Optional[str]) -> bool:
+    """Check if character is a comma."""
+
+    return char == COMMA
+
+
 def is_power(char: Optional[str]) -> bool:
     """Check if character is a right parenthesis."""
 
@@ -6,33 +6,48 @@ from tokens import Token, TokenType
 from .char_constants import DECIMAL_POINT
 from .char_helpers import (
     is_and,
+    is_at,
+    is_colon,
+    is_comma,
     is_digit_or_point,
     is_divide,
     is_equals,
     is_greater_than,
+    is_left_bracket,
     is_left_paren,
     is_less_than,
     is_letter,
     is_minus,
     is_modulo,
     is_multiply,
+    is_newline,
     is_not,
     is_or,
     is_plus,
     is_point,
     is_power,
+    is_right_bracket,
     is_right_paren,
+    is_semicolon,
     is_whitespace,
 )
 from .lexer_helpers import is_identifier_char, is_keyword
 
 
 class Lexer:
-    __slots__ = "_text", "_curr_char"
+    """Split text into tokens.
+
+    Newlines separate statements, except inside parentheses or brackets, where
+    they're whitespace so that an expression can span lines.
+    """
+
+    __slots__ = "_text", "_curr_char", "_depth"
 
     def __init__(self, text: str) -> None:
         self._text = iter(text)
         self._curr_char: Optional[str] = None
+        # Number of parentheses and brackets left open.
+        self._depth = 0
         self.advance()
 
     def advance(self) -> None:
@@ -74,6 +89,23 @@ class Lexer:
                 yield self.generate_left_paren()
             elif is_right_paren(self._curr_char):
                 yield self.generate_right_paren()
+            elif is_left_bracket(self._curr_char):
+                yield self.generate_left_bracket()
+            elif is_right_bracket(self._curr_char):
+                yield self.generate_right_bracket()
+            elif is_comma(self._curr_char):
+                yield self.generate_comma()
+            elif is_colon(self._curr_char):
+                yield self.generate_colon()
+            elif is_semicolon(self._curr_char):
+                yield self.generate_semicolon()
+            elif is_newline(self._curr_char):
+                if self._depth:
+                    self.advance()
+                else:
+                    yield self.generate_newline()
+            elif is_at(self._curr_char):
+                yield self.generate_at()
             elif is_power(self._curr_char):
                 yield self.generate_power_operator()
             elif is_modulo(self._curr_char):
@@ -147,15 +179,63 @@ class Lexer:
     def generate_left_paren(self) -> Token:
         """Generate left parenthesis token."""
 
+        self._depth += 1
         self.advance()
         return Token(TokenType.LEFT_PAREN)
 
     def generate_right_paren(self) -> Token:
         """Generate right parenthesis token."""
 
+        if self._depth:
+            self._depth -= 1
         self.advance()
         return Token(TokenType.RIGHT_PAREN)
 
+    def generate_left_bracket(self) -> Token:
+        """Generate left bracket token."""
+
+        self._depth += 1
+        self.advance()
+        return Token(TokenType.LEFT_BRACKET)
+
+    def generate_right_bracket(self) -> Token:
+        """Generate right bracket token."""
+
+        if self._depth:
+            self._depth -= 1
+        self.advance()
+        return Token(TokenType.RIGHT_BRACKET)
+
+    def generate_comma(self) -> Token:
+        """Generate comma token."""
+
+        self.advance()
+        return Token(TokenType.COMMA)
+
+    def generate_colon(self) -> Token:
+        """Generate colon token."""
+
+        self.advance()
+        return Token(TokenType.COLON)
+
+    def generate_semicolon(self) -> Token:
+        """Generate semicolon token."""
+
+        self.advance()
+        return Token(TokenType.SEMICOLON)
+
+    def generate_newline(self) -> Token:
+        """Generate newline token."""
+
+        self.advance()
+        return Token(TokenType.NEWLINE)
+
+    def generate_at(self) -> Token:
+        """Generate annotation token."""
+
+        self.advance()
+        return Token(TokenType.AT)
+
     def generate_power_operator(self) -> Token:
         """Generate power operator token."""
 
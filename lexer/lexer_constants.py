@@ -1 +1 @@
-KEYWORDS = frozenset({"var"})
+KEYWORDS = frozenset({"var", "fun"})
@@ -0,0 +1,56 @@
+from operator import length_hint
+from typing import Generator, NoReturn
+
+from nodes import SourceMap
+from tokens import Token, TokenType
+
+from .char_constants import NEWLINE, WHITESPACE
+from .lexer import Lexer
+
+# Newlines are skipped inside parentheses and brackets.
+_SKIPPED = WHITESPACE.union(NEWLINE)
+
+
+class PositionLexer(Lexer):
+    """Lexer recording the span of every token in a source map, in order.
+
+    The plain `Lexer` doesn't track offsets at all, so positions only cost when
+    they're asked for.
+    """
+
+    __slots__ = ("_source_map",)
+
+    def __init__(self, source_map: SourceMap) -> None:
+        self._source_map = source_map
+        super().__init__(source_map.text)
+
+    @property
+    def _offset(self) -> int:
+        """Get the offset of the current character.
+
+        It's found from the characters left in the text, so no counting is
+        needed while lexing.
+        """
+
+        if self._curr_char is None:
+            return len(self._source_map.text)
+        return len(self._source_map.text) - length_hint(self._text) - 1
+
+    def raise_illegal_char(self) -> NoReturn:
+        location = self._source_map.describe(self._offset)
+        raise Exception(f"Illegal character, '{self._curr_char}' at {location}")
+
+    def generate_tokens(self) -> Generator[Token, None, None]:
+        text = self._source_map.text
+        add_token = self._source_map.add_token
+        end = 0
+        for token in super().generate_tokens():
+            # Only whitespace is skipped between tokens, and newlines unless the
+            # token is one.
+            skipped = WHITESPACE if token.type is TokenType.NEWLINE else _SKIPPED
+            start = end
+            while text[start] in skipped:
+                start += 1
+            end = self._offset
+            add_token(start, end)
+            yield token
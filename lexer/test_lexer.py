@@ -13,10 +13,21 @@ def test_empty():
 
 
 def test_whitespace():
-    tokens = list(Lexer("  \t\t\n\n\t").generate_tokens())
+    tokens = list(Lexer("  \t\t\r\t").generate_tokens())
     assert tokens == []
 
 
+def test_separators():
+    tokens = list(Lexer("a;\r\n\nb").generate_tokens())
+    assert tokens == [
+        Token(TokenType.IDENTIFIER, "a"),
+        Token(TokenType.SEMICOLON),
+        Token(TokenType.NEWLINE),
+        Token(TokenType.NEWLINE),
+        Token(TokenType.IDENTIFIER, "b"),
+    ]
+
+
 def test_numbers():
     tokens = list(Lexer("123 123.56 .70 12. .").generate_tokens())
     assert tokens == [
@@ -93,3 +104,41 @@ def test_logical_operators(char, token_type):
     ]
     tokens = list(Lexer(expression).generate_tokens())
     assert tokens == expected
+
+
+def test_function_definition():
+    tokens = list(Lexer("@nomemo fun f(a, b)").generate_tokens())
+    assert tokens == [
+        Token(TokenType.AT),
+        Token(TokenType.IDENTIFIER, "nomemo"),
+        Token(TokenType.KEYWORD, "fun"),
+        Token(TokenType.IDENTIFIER, "f"),
+        Token(TokenType.LEFT_PAREN),
+        Token(TokenType.IDENTIFIER, "a"),
+        Token(TokenType.COMMA),
+        Token(TokenType.IDENTIFIER, "b"),
+        Token(TokenType.RIGHT_PAREN),
+    ]
+
+
+def test_range():
+    tokens = list(Lexer("a1:a9").generate_tokens())
+    assert tokens == [
+        Token(TokenType.IDENTIFIER, "a1"),
+        Token(TokenType.COLON),
+        Token(TokenType.IDENTIFIER, "a9"),
+    ]
+
+
+def test_array():
+    tokens = list(Lexer("[1:a][0]").generate_tokens())
+    assert tokens == [
+        Token(TokenType.LEFT_BRACKET),
+        Token(TokenType.NUMBER, Decimal("1")),
+        Token(TokenType.COLON),
+        Token(TokenType.IDENTIFIER, "a"),
+        Token(TokenType.RIGHT_BRACKET),
+        Token(TokenType.LEFT_BRACKET),
+        Token(TokenType.NUMBER, Decimal("0")),
+        Token(TokenType.RIGHT_BRACKET),
+    ]
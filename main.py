@@ -1,6 +1,15 @@
+import sys
+from itertools import chain
+from typing import Any
+
+from cache import load_script
 from interpreter import Interpreter
+from interpreter.errors import describe_error
+from interpreter.profiler import Profiler
 from lexer import Lexer
-from parser_ import Parser
+from nodes import Node, ProgramNode
+from parser_ import parse_with_positions
+from watch import WatchedScript, poll
 
 
 def run() -> None:
@@ -16,17 +25,82 @@ def run() -> None:
                 print("bye")
                 return
             else:
-                lexer = Lexer(text)
-                tokens = lexer.generate_tokens()
-                parser = Parser(tokens)
-                tree = parser.parse()
-                if not tree:
+                tokens = Lexer(text).generate_tokens()
+                first = next(tokens, None)
+                if first is None:
                     continue
-                value = interpreter.visit(tree)
+                value = interpreter.evaluate(chain((first,), tokens))
                 print(value)
         except Exception as e:
             print(e)
 
 
+def run_script(path: str) -> None:
+    """Run a script file as a single program.
+
+    Compiled statements are cached on disk and reused on later runs.
+    """
+
+    program = ProgramNode(load_script(path))
+    Interpreter().execute(program, print)
+
+
+def watch(path: str) -> None:
+    """Run a script file and re-run the statements changed whenever it's saved.
+
+    Only the changed statements and the ones depending on them are evaluated
+    again, each cycle ends with its timings.
+    """
+
+    def emit(statement: Node, value: Any) -> None:
+        print(f"{statement} → {value}")
+
+    script = WatchedScript()
+    try:
+        for text in poll(path):
+            try:
+                report = script.update(text, emit)
+            except Exception as e:
+                print(e)
+                continue
+            for statement, error in report.errors:
+                print(f"{statement}: {error}")
+            print(
+                f"-- {report.evaluated} of {report.statements} statements evaluated, "
+                f"parsed in {report.parse_time * 1e3:.2f}ms, "
+                f"evaluated in {report.evaluation_time * 1e3:.2f}ms"
+            )
+    except KeyboardInterrupt:
+        print("bye")
+
+
+def profile(path: str) -> None:
+    """Run a script file under the sampling profiler.
+
+    The most expensive lines are printed after the output of the script, the
+    sampled stacks are written to `<path>.folded` for flame graph tools.
+    """
+
+    with open(path, encoding="utf-8") as file:
+        program, source_map = parse_with_positions(file.read())
+    with Profiler(source_map) as profiler:
+        try:
+            Interpreter().execute(program, print)
+        except Exception as e:
+            print(describe_error(e, source_map))
+    folded = f"{path}.folded"
+    with open(folded, "w", encoding="utf-8") as file:
+        profiler.write_collapsed(file)
+    profiler.write_lines(sys.stdout)
+    print(f"{profiler.samples} samples, stacks written to {folded}")
+
+
 if __name__ == "__main__":
-    run()
+    if len(sys.argv) > 2 and sys.argv[1] == "--watch":
+        watch(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == "--profile":
+        profile(sys.argv[2])
+    elif len(sys.argv) > 1:
+        run_script(sys.argv[1])
+    else:
+        run()
@@ -1 +1,9 @@
 from .nodes import *
+from .source_map import SourceMap
+from .traversal import (
+    child_fields,
+    free_variables,
+    iter_children,
+    list_fields,
+    walk,
+)
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Union
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+_NUMBERED_NAME = re.compile(r"(.*?)([0-9]+)")
+
+# Most names a range may hold, it's expanded into a tuple when evaluated.
+MAX_RANGE_SIZE = 100_000
 
 
 @dataclass
@@ -106,7 +113,7 @@ class LessThanNode:
     node_b: Node
 
     def __repr__(self) -> str:
-        return f"({self.node_a}>{self.node_b})"
+        return f"({self.node_a}<{self.node_b})"
 
 
 @dataclass
@@ -115,7 +122,7 @@ class GreaterThanNode:
     node_b: Node
 
     def __repr__(self) -> str:
-        return f"({self.node_a}<{self.node_b})"
+        return f"({self.node_a}>{self.node_b})"
 
 
 @dataclass
@@ -124,7 +131,7 @@ class LessThanOrEqualsNode:
     node_b: Node
 
     def __repr__(self) -> str:
-        return f"({self.node_a}>={self.node_b})"
+        return f"({self.node_a}<={self.node_b})"
 
 
 @dataclass
@@ -133,7 +140,7 @@ class GreaterThanOrEqualsNode:
     node_b: Node
 
     def __repr__(self) -> str:
-        return f"({self.node_a}<={self.node_b})"
+        return f"({self.node_a}>={self.node_b})"
 
 
 @dataclass
@@ -180,6 +187,181 @@ class OrNode:
         return f"({self.node_a}||{self.node_b})"
 
 
+@dataclass
+class LetNode:
+    """Declares temporary `index` as `value` while evaluating `body`.
+
+    The value is computed on the first `TempNode` read of the temporary, not
+    when it is declared, so evaluation order and short-circuiting are kept.
+    """
+
+    index: int
+    value: Node
+    body: Node
+
+    def __repr__(self) -> str:
+        return f"{{let ${self.index}={self.value} in {self.body}}}"
+
+
+@dataclass
+class TempNode:
+    index: int
+
+    def __repr__(self) -> str:
+        return f"${self.index}"
+
+
+@dataclass
+class FunctionDefinitionNode:
+    name: str
+    parameters: List[str]
+    body: Node
+    memoize: bool = True
+
+    def __repr__(self) -> str:
+        definition = f"{self.name}({','.join(self.parameters)})={self.body}"
+        return definition if self.memoize else f"@nomemo {definition}"
+
+
+@dataclass
+class CallNode:
+    name: str
+    arguments: List[Node]
+
+    def __repr__(self) -> str:
+        return f"{self.name}({','.join(map(str, self.arguments))})"
+
+
+@dataclass
+class ParameterNode:
+    """Reads parameter `index` of the function being called.
+
+    Function bodies get these instead of `ValueAccessNode` for their parameters
+    when the function is defined.
+    """
+
+    index: int
+    name: str
+
+    def __repr__(self) -> str:
+        return f"{self.name}"
+
+
+@dataclass
+class RangeNode:
+    """Variables from `start` to `end`, like `a1:a100`, passed to a built-in.
+
+    Both names have the same prefix followed by a number, and the range holds
+    the names with every number in between. Numbers are padded with zeros to
+    the length of the first one, so `a01:a10` holds `a01`, `a02`, ... `a10`.
+
+    Ranges are checked from their bounds alone, names are only generated by
+    `names()`. A range holds at most `MAX_RANGE_SIZE` names.
+    """
+
+    start: str
+    end: str
+
+    def __repr__(self) -> str:
+        return f"{self.start}:{self.end}"
+
+    def names(self) -> Tuple[str, ...]:
+        self.check()
+        prefix, first, last, width = _range_bounds(self.start, self.end)  # type: ignore
+        return tuple(f"{prefix}{i:0{width}}" for i in range(first, last + 1))
+
+    @property
+    def size(self) -> Optional[int]:
+        """Get the number of names in the range, None if it's malformed."""
+
+        bounds = _range_bounds(self.start, self.end)
+        return None if bounds is None else bounds[2] - bounds[1] + 1
+
+    @property
+    def is_valid(self) -> bool:
+        size = self.size
+        return size is not None and size <= MAX_RANGE_SIZE
+
+    def check(self) -> None:
+        size = self.size
+        if size is None:
+            raise Exception(f"Invalid range {self}")
+        if size > MAX_RANGE_SIZE:
+            raise Exception(f"The range {self} holds more than {MAX_RANGE_SIZE} names")
+
+
+@dataclass
+class ArrayNode:
+    elements: List[Node]
+
+    def __repr__(self) -> str:
+        return f"[{','.join(map(str, self.elements))}]"
+
+
+@dataclass
+class ArrayRangeNode:
+    """Array of the numbers from `start` to `stop` inclusive, `step` apart."""
+
+    start: Node
+    stop: Node
+    step: Node
+
+    def __repr__(self) -> str:
+        return f"[{self.start}:{self.stop}:{self.step}]"
+
+
+@dataclass
+class IndexNode:
+    node: Node
+    index: Node
+
+    def __repr__(self) -> str:
+        return f"{self.node}[{self.index}]"
+
+
+@dataclass
+class ProgramNode:
+    """Statements separated by semicolons or newlines, executed in order."""
+
+    statements: List[Node]
+
+    def __repr__(self) -> str:
+        return "; ".join(map(str, self.statements))
+
+
+@lru_cache(maxsize=256)
+def _range_bounds(start: str, end: str) -> Optional[Tuple[str, int, int, int]]:
+    """Get the prefix, first and last numbers and padding width of a range."""
+
+    start_match = _NUMBERED_NAME.fullmatch(start)
+    end_match = _NUMBERED_NAME.fullmatch(end)
+    if start_match is None or end_match is None:
+        return None
+    prefix, first_digits = start_match[1], start_match[2]
+    last_digits = end_match[2]
+    if end_match[1] != prefix:
+        return None
+    width = len(first_digits) if first_digits[0] == "0" else 0
+    try:
+        first, last = int(first_digits), int(last_digits)
+    except ValueError:
+        # More digits than `int` converts.
+        return None
+    if f"{last:0{width}}" != last_digits or first > last:
+        return None
+    return prefix, first, last, width
+
+
+@dataclass
+class PatternNode:
+    """Variables of which the name starts with `prefix`, passed to a built-in."""
+
+    prefix: str
+
+    def __repr__(self) -> str:
+        return f"{self.prefix}*"
+
+
 ExprNode = Union[AndNode, OrNode]
 MathExprNode = Union[SubtractNode, AddNode]
 BinaryCompExprNode = Union[
@@ -213,4 +395,15 @@ Node = Union[
     DoubleEqualsNode,
     AndNode,
     OrNode,
+    LetNode,
+    TempNode,
+    FunctionDefinitionNode,
+    CallNode,
+    ParameterNode,
+    RangeNode,
+    PatternNode,
+    ArrayNode,
+    ArrayRangeNode,
+    IndexNode,
+    ProgramNode,
 ]
@@ -0,0 +1,118 @@
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .nodes import Node
+
+
+class SourceMap:
+    """Source spans of tokens and nodes, kept apart from them.
+
+    Tokens and nodes have no position attributes, so they cost nothing when
+    positions aren't wanted. Spans go into side arrays of start and end offsets
+    instead. Tokens are numbered in the order they were lexed. Nodes get a slot
+    by their identity and are kept alive by the map, so that identity can't be
+    reused.
+
+    Lines and columns are counted from 1.
+    """
+
+    __slots__ = (
+        "text",
+        "_token_starts",
+        "_token_ends",
+        "_nodes",
+        "_slots",
+        "_starts",
+        "_ends",
+        "_line_starts",
+    )
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._token_starts = array("q")
+        self._token_ends = array("q")
+        self._nodes: List[Node] = []
+        self._slots: Dict[int, int] = {}
+        self._starts = array("q")
+        self._ends = array("q")
+        self._line_starts: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: Node) -> bool:
+        return id(node) in self._slots
+
+    @property
+    def token_count(self) -> int:
+        return len(self._token_starts)
+
+    def add_token(self, start: int, end: int) -> None:
+        self._token_starts.append(start)
+        self._token_ends.append(end)
+
+    def token_span(self, index: int) -> Tuple[int, int]:
+        """Get the start and end offsets of the token lexed `index`-th."""
+
+        return self._token_starts[index], self._token_ends[index]
+
+    def add(self, node: Node, start: int, end: int) -> None:
+        """Record the span of a node, replacing an earlier one."""
+
+        slot = self._slots.get(id(node))
+        if slot is None:
+            self._slots[id(node)] = len(self._nodes)
+            self._nodes.append(node)
+            self._starts.append(start)
+            self._ends.append(end)
+        else:
+            self._starts[slot] = start
+            self._ends[slot] = end
+
+    def nodes(self) -> Iterator[Node]:
+        """Iterate over the nodes with positions, in the order they were added."""
+
+        return iter(self._nodes)
+
+    def span(self, node: Node) -> Optional[Tuple[int, int]]:
+        """Get the start and end offsets of a node, None if it has no position."""
+
+        slot = self._slots.get(id(node))
+        if slot is None:
+            return None
+        return self._starts[slot], self._ends[slot]
+
+    def source(self, node: Node) -> Optional[str]:
+        """Get the text a node was parsed from."""
+
+        span = self.span(node)
+        if span is None:
+            return None
+        start, end = span
+        return self.text[start:end]
+
+    def line(self, node: Node) -> Optional[int]:
+        """Get the line a node starts on."""
+
+        span = self.span(node)
+        return None if span is None else self.position(span[0])[0]
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Get the line and column of an offset into the text."""
+
+        line_starts = self._line_starts
+        if line_starts is None:
+            line_starts = [0]
+            text = self.text
+            newline = text.find("\n")
+            while newline != -1:
+                line_starts.append(newline + 1)
+                newline = text.find("\n", newline + 1)
+            self._line_starts = line_starts
+        line = bisect_right(line_starts, offset)
+        return line, offset - line_starts[line - 1] + 1
+
+    def describe(self, offset: int) -> str:
+        line, column = self.position(offset)
+        return f"line {line}, column {column}"
@@ -0,0 +1,80 @@
+from dataclasses import fields
+from typing import Dict, FrozenSet, Iterator, List, Set, Tuple
+
+from .nodes import CallNode, FunctionDefinitionNode, Node, RangeNode, ValueAccessNode
+
+_CHILD_FIELDS: Dict[type, Tuple[str, ...]] = {}
+_LIST_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def child_fields(node_class: type) -> Tuple[str, ...]:
+    """Get names of the fields holding child nodes of a node class.
+
+    A field holds either a single node or a list of them, see `list_fields`.
+    """
+
+    names = _CHILD_FIELDS.get(node_class)
+    if names is None:
+        names = tuple(
+            field.name
+            for field in fields(node_class)
+            if field.type in ("Node", "List[Node]")
+        )
+        _CHILD_FIELDS[node_class] = names
+    return names
+
+
+def list_fields(node_class: type) -> Tuple[str, ...]:
+    """Get names of the fields holding lists of child nodes of a node class."""
+
+    names = _LIST_FIELDS.get(node_class)
+    if names is None:
+        names = tuple(
+            field.name for field in fields(node_class) if field.type == "List[Node]"
+        )
+        _LIST_FIELDS[node_class] = names
+    return names
+
+
+def iter_children(node: Node) -> Iterator[Node]:
+    """Iterate over direct children of a node, left to right."""
+
+    node_class = type(node)
+    for name in child_fields(node_class):
+        if name in list_fields(node_class):
+            yield from getattr(node, name)
+        else:
+            yield getattr(node, name)
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Iterate over a node and all of its descendants in pre-order."""
+
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(tuple(iter_children(node))))
+
+
+def free_variables(node: Node) -> Set[str]:
+    """Get names of all variables read by an expression, functions included.
+
+    Parameters of a function and its own name aren't free in its body. Names in
+    ranges are included, names matching patterns aren't known before evaluation.
+    """
+
+    names: Set[str] = set()
+    stack: List[Tuple[Node, FrozenSet[str]]] = [(node, frozenset())]
+    while stack:
+        node, bound = stack.pop()
+        if isinstance(node, (ValueAccessNode, CallNode)):
+            if node.name not in bound:
+                names.add(node.name)
+        elif isinstance(node, FunctionDefinitionNode):
+            bound = bound.union(node.parameters, (node.name,))
+        elif isinstance(node, RangeNode) and node.is_valid:
+            # Ranges are looked up in the symbol table, parameters or not.
+            names.update(node.names())
+        stack.extend((child, bound) for child in iter_children(node))
+    return names
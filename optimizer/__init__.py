@@ -0,0 +1 @@
+from .cse import eliminate_common_subexpressions
@@ -0,0 +1,166 @@
+"""Common-subexpression elimination.
+
+The tree is hash-consed into a DAG where structurally equal subtrees share one
+vertex. Every vertex referenced by at least two parents, counting a vertex once
+no matter how often its parent occurs, is computed into a temporary: the result
+is wrapped into `LetNode`s declaring the temporaries and each occurrence is
+replaced by a `TempNode`.
+
+Temporaries are evaluated on their first read, so the rewritten tree raises the
+same errors in the same order as the original and the skipped operand of `&&`
+or `||` is still never evaluated.
+"""
+
+import operator
+from typing import Dict, List, Set, Tuple
+
+from nodes import (
+    ArrayNode,
+    AssignmentNode,
+    CallNode,
+    FunctionDefinitionNode,
+    LetNode,
+    Node,
+    NumberNode,
+    ProgramNode,
+    TempNode,
+    ValueAccessNode,
+    iter_children,
+    walk,
+)
+
+# Smaller subtrees are cheaper to evaluate than to read from a temporary.
+MIN_SIZE = 3
+
+# Kinds never shared. Array literals are among them as `_build` can only rebuild
+# nodes with a fixed number of children.
+_OPAQUE = (
+    AssignmentNode,
+    LetNode,
+    TempNode,
+    FunctionDefinitionNode,
+    CallNode,
+    ArrayNode,
+)
+
+
+def eliminate_common_subexpressions(node: Node) -> Node:
+    """Rewrite an expression so that repeated subtrees are computed once.
+
+    Return the node itself if it has no repeated subtrees worth eliminating.
+    """
+
+    if isinstance(node, AssignmentNode):
+        value = eliminate_common_subexpressions(node.value)
+        if value is node.value:
+            return node
+        return AssignmentNode(node.name, value)
+    if isinstance(node, ProgramNode):
+        statements = [
+            eliminate_common_subexpressions(statement) for statement in node.statements
+        ]
+        if all(map(operator.is_, statements, node.statements)):
+            return node
+        return ProgramNode(statements)
+    return _Eliminator(node).run()
+
+
+class _Eliminator:
+    __slots__ = (
+        "_root",
+        "_ids",
+        "_nodes",
+        "_children",
+        "_sizes",
+        "_pure",
+        "_references",
+        "_temporaries",
+        "_indices",
+        "_definitions",
+        "_next_index",
+    )
+
+    def __init__(self, root: Node) -> None:
+        self._root = root
+        self._ids: Dict[Tuple[object, ...], int] = {}
+        self._nodes: List[Node] = []
+        self._children: List[Tuple[int, ...]] = []
+        self._sizes: List[int] = []
+        self._pure: List[bool] = []
+        self._references: List[int] = []
+        self._temporaries: Set[int] = set()
+        self._indices: Dict[int, int] = {}
+        self._definitions: List[Tuple[int, Node]] = []
+        self._next_index = 0
+
+    def run(self) -> Node:
+        root = self._intern(self._root)
+        self._temporaries = {
+            vertex
+            for vertex, references in enumerate(self._references)
+            if references > 1 and self._pure[vertex] and self._sizes[vertex] >= MIN_SIZE
+        }
+        if not self._temporaries:
+            return self._root
+
+        # Don't reuse indices of temporaries the tree already declares.
+        self._next_index = 1 + max(
+            (
+                child.index
+                for child in walk(self._root)
+                if isinstance(child, (LetNode, TempNode))
+            ),
+            default=-1,
+        )
+        body = self._build(root)
+        for index, value in reversed(self._definitions):
+            body = LetNode(index, value, body)
+        return body
+
+    def _intern(self, node: Node) -> int:
+        if isinstance(node, NumberNode):
+            # The text keeps the exponent, 1.0 and 1 are different results.
+            structure: Tuple[object, ...] = (NumberNode, str(node.value))
+            children: Tuple[int, ...] = ()
+            pure = True
+        elif isinstance(node, ValueAccessNode):
+            structure = (ValueAccessNode, node.name)
+            children = ()
+            pure = True
+        elif isinstance(node, _OPAQUE):
+            # Left as they are, each occurrence is a vertex of its own.
+            structure = (id(node),)
+            children = ()
+            pure = False
+        else:
+            children = tuple(self._intern(child) for child in iter_children(node))
+            structure = (type(node),) + children
+            pure = all(self._pure[child] for child in children)
+
+        vertex = self._ids.get(structure)
+        if vertex is None:
+            vertex = self._ids[structure] = len(self._nodes)
+            self._nodes.append(node)
+            self._children.append(children)
+            self._sizes.append(1 + sum(self._sizes[child] for child in children))
+            self._pure.append(pure)
+            self._references.append(0)
+            for child in children:
+                self._references[child] += 1
+        return vertex
+
+    def _build(self, vertex: int, defining: bool = False) -> Node:
+        if vertex in self._temporaries and not defining:
+            index = self._indices.get(vertex)
+            if index is None:
+                value = self._build(vertex, True)
+                index = self._indices[vertex] = self._next_index
+                self._next_index += 1
+                self._definitions.append((index, value))
+            return TempNode(index)
+
+        node = self._nodes[vertex]
+        children = self._children[vertex]
+        if not children:
+            return node
+        return type(node)(*(self._build(child) for child in children))  # type: ignore
@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+import pytest
+
+from interpreter import Interpreter, SymbolTable
+from interpreter.values import Number
+from lexer import Lexer
+from nodes import AddNode, LetNode, TempNode, walk
+from parser_ import Parser
+from serialization import dumps, loads
+
+from .cse import eliminate_common_subexpressions
+
+SOURCES = [
+    "(a*b+c)/(a*b+c+1)",
+    "a*b + (a*b) * (a*b+c)",
+    "(a+b)^2 - (a+b)^2 % 3",
+    "-(a*b) + -(a*b)",
+    "(a*b > c) && (a*b > c) || !(a*b > c)",
+    "var x = (a*b+c)/(a*b+c+1) + a*b",
+]
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse()
+
+
+def evaluate(tree, **values):
+    table = SymbolTable()
+    for name, value in values.items():
+        table.set(name, Number(Decimal(value)))
+    interpreter = Interpreter(table)
+    return interpreter.visit(tree), table.get("x")
+
+
+def temporaries(tree):
+    return [node for node in walk(tree) if isinstance(node, TempNode)]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_results_are_unchanged(source):
+    tree = parse(source)
+    optimized = eliminate_common_subexpressions(tree)
+    assert optimized != tree
+    for values in [{"a": "2", "b": "3", "c": "4"}, {"a": "0.5", "b": "1", "c": "-7"}]:
+        assert evaluate(optimized, **values) == evaluate(tree, **values)
+
+
+def test_repeated_subtree_is_computed_once():
+    optimized = eliminate_common_subexpressions(parse("(a*b+c)/(a*b+c+1)"))
+    assert repr(optimized) == "{let $0=((a*b)+c) in ($0/($0+1))}"
+
+
+def test_nested_repetitions():
+    optimized = eliminate_common_subexpressions(parse("(a*b+c)/(a*b+c) + a*b"))
+    assert repr(optimized) == "{let $0=(a*b) in {let $1=($0+c) in (($1/$1)+$0)}}"
+
+
+def test_cheap_subtrees_are_kept():
+    tree = parse("a + a * 2 - (-a)")
+    assert eliminate_common_subexpressions(tree) is tree
+
+
+def test_assignment_value_is_rewritten():
+    optimized = eliminate_common_subexpressions(parse("var x = a*b - a*b"))
+    assert optimized.name == "x"
+    assert isinstance(optimized.value, LetNode)
+
+
+def test_short_circuit_is_kept():
+    # 1/a is only ever computed when a != 0, in the original and rewritten tree.
+    tree = parse("a != 0 && 1/a + 1/a > 1")
+    optimized = eliminate_common_subexpressions(tree)
+    assert len(temporaries(optimized)) == 2
+    assert evaluate(optimized, a="0") == evaluate(tree, a="0")
+
+
+def test_errors_are_kept():
+    tree = parse("b + 1/a + 1/a")
+    optimized = eliminate_common_subexpressions(tree)
+    with pytest.raises(Exception, match="'b' is not defined"):
+        evaluate(optimized, a="0")
+    with pytest.raises(Exception, match="Runtime math error"):
+        evaluate(optimized, a="0", b="1")
+
+
+def test_temporaries_are_reset_between_evaluations():
+    optimized = eliminate_common_subexpressions(parse("a*b + a*b"))
+    table = SymbolTable()
+    table.set("a", Number(Decimal("2")))
+    table.set("b", Number(Decimal("3")))
+    interpreter = Interpreter(table)
+    assert interpreter.visit(optimized) == Number(Decimal("12"))
+    table.set("b", Number(Decimal("5")))
+    assert interpreter.visit(optimized) == Number(Decimal("20"))
+
+
+def test_declared_temporaries_are_kept():
+    once = eliminate_common_subexpressions(parse("(a*b+c) * (a*b+c)"))
+    twice = eliminate_common_subexpressions(AddNode(once, parse("c*c - c*c")))
+    assert {node.index for node in temporaries(twice)} == {0, 1}
+    assert evaluate(twice, a="2", b="3", c="4") == (Number(Decimal("100")), None)
+
+
+def test_serialization_round_trip():
+    optimized = eliminate_common_subexpressions(parse("(a*b+c)/(a*b+c+1)"))
+    assert loads(dumps([optimized])) == [optimized]
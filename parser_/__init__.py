@@ -1 +1,3 @@
+from .incremental import ParsedScript, ScriptChange, parse_script, reparse_script
 from .parser_ import Parser
+from .positions import PositionParser, parse_with_positions
@@ -0,0 +1,196 @@
+"""Incremental parsing of edited scripts.
+
+Only semicolons, and newlines outside parentheses and brackets, separate
+statements, and no token contains them, so the text between two separators is
+always exactly one statement, or none if it's blank. An edit therefore only
+damages the statements it touches, from the end of the statement before it to
+the start of the statement after it. Those are lexed and parsed again, every
+other statement keeps its tree. An edit leaving a parenthesis open damages
+everything after it.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from lexer import Lexer
+from nodes import Node, ProgramNode
+from tokens import Token, TokenType
+
+from .parser_ import Parser
+
+_SEPARATOR_OR_BRACKET = re.compile(r"[;\n()\[\]]")
+_OPENING = frozenset("([")
+_CLOSING = frozenset(")]")
+_SEPARATOR_TOKEN = Token(TokenType.SEMICOLON)
+
+
+class ParsedScript:
+    """Statements of a script with the spans of the text they were parsed from.
+
+    A span is the start and end offset of a statement, without separators.
+    """
+
+    __slots__ = "text", "statements", "spans"
+
+    def __init__(
+        self, text: str, statements: List[Node], spans: List[Tuple[int, int]]
+    ) -> None:
+        self.text = text
+        self.statements = statements
+        self.spans = spans
+
+    @property
+    def program(self) -> ProgramNode:
+        return ProgramNode(self.statements)
+
+
+class ScriptChange:
+    """Statements `removed` at `index` of the old script, replaced by `added`.
+
+    Statements which parsed to the same tree as before aren't counted.
+    """
+
+    __slots__ = "index", "removed", "added"
+
+    def __init__(self, index: int, removed: List[Node], added: List[Node]) -> None:
+        self.index = index
+        self.removed = removed
+        self.added = added
+
+    def __bool__(self) -> bool:
+        return bool(self.removed or self.added)
+
+    def __repr__(self) -> str:
+        return f"<change at {self.index}: -{len(self.removed)} +{len(self.added)}>"
+
+
+def parse_script(text: str) -> ParsedScript:
+    statements, spans, _ = _parse_region(text, 0, len(text))
+    return ParsedScript(text, statements, spans)
+
+
+def reparse_script(
+    script: ParsedScript, offset: int, removed: int, inserted: str
+) -> Tuple[ParsedScript, ScriptChange]:
+    """Apply an edit replacing `removed` characters at `offset` by `inserted`.
+
+    Return the new script, sharing the trees of the statements the edit didn't
+    touch, and the change of its statements. A syntax error in the edited
+    statements is raised and the old script stays valid.
+    """
+
+    old_text = script.text
+    edit_end = offset + removed
+    if offset < 0 or removed < 0 or edit_end > len(old_text):
+        raise ValueError(f"Edit at {offset} of {removed} characters is out of range")
+    text = old_text[:offset] + inserted + old_text[edit_end:]
+    delta = len(inserted) - removed
+
+    # The damaged region of the old text, between the statements around it.
+    spans = script.spans
+    before = bisect_left(spans, (offset,)) - 1
+    if before >= 0 and spans[before][1] >= offset:
+        before -= 1
+    start = spans[before][1] if before >= 0 else 0
+    after = bisect_left(spans, (edit_end + 1,))
+    end = spans[after][0] if after < len(spans) else len(old_text)
+
+    statements, spans, region_end = _parse_region(text, start, end + delta)
+    if region_end != end + delta:
+        # A parenthesis was left open, up to the end of the text.
+        end = len(old_text)
+
+    # Statements of the old text starting in the region.
+    first = bisect_left(script.spans, (start,))
+    last = bisect_left(script.spans, (end,))
+    old_statements = script.statements[first:last]
+
+    # Statements parsed to equal trees keep their old trees and don't count as
+    # changed.
+    prefix = 0
+    while (
+        prefix < min(len(old_statements), len(statements))
+        and statements[prefix] == old_statements[prefix]
+    ):
+        statements[prefix] = old_statements[prefix]
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < min(len(old_statements), len(statements)) - prefix
+        and statements[-1 - suffix] == old_statements[-1 - suffix]
+    ):
+        statements[-1 - suffix] = old_statements[-1 - suffix]
+        suffix += 1
+
+    shifted = [
+        (span_start + delta, span_end + delta)
+        for span_start, span_end in script.spans[last:]
+    ]
+    new_script = ParsedScript(
+        text,
+        script.statements[:first] + statements + script.statements[last:],
+        script.spans[:first] + spans + shifted,
+    )
+    removed_end = len(old_statements) - suffix
+    added_end = len(statements) - suffix
+    change = ScriptChange(
+        first + prefix,
+        old_statements[prefix:removed_end],
+        statements[prefix:added_end],
+    )
+    return new_script, change
+
+
+def _parse_region(
+    text: str, start: int, end: int
+) -> Tuple[List[Node], List[Tuple[int, int]], int]:
+    """Parse the statements from `start` to `end`, which may be extended.
+
+    Return the statements, their spans and where the region ended.
+    """
+
+    statements: List[Node] = []
+    spans: List[Tuple[int, int]] = []
+    segments = list(_segments(text, start, end))
+    for span_start, span_end in segments:
+        tokens: Iterable[Token] = Lexer(text[span_start:span_end]).generate_tokens()
+        if span_end < len(text):
+            # Parentheses may only be left open at the end of the text.
+            tokens = chain(tokens, (_SEPARATOR_TOKEN,))
+        tree: Optional[Node] = Parser(tokens).parse()
+        if tree is not None:
+            statements.append(tree)
+            spans.append((span_start, span_end))
+    return statements, spans, segments[-1][1]
+
+
+def _segments(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Split text between separators, like the lexer does.
+
+    A parenthesis or bracket open at `end` carries the last segment on to the
+    end of the text.
+    """
+
+    depth = 0
+    for match in _SEPARATOR_OR_BRACKET.finditer(text, start):
+        position = match.start()
+        if position >= end:
+            if not depth:
+                break
+            end = len(text)
+        char = match[0]
+        if char in _OPENING:
+            depth += 1
+        elif char in _CLOSING:
+            if depth:
+                depth -= 1
+        elif char == ";" or not depth:
+            yield start, position
+            start = match.end()
+    else:
+        end = len(text) if depth else end
+    yield start, end
@@ -1,14 +1,20 @@
 from decimal import Decimal
-from typing import Any, Iterable, NoReturn, Optional
+from itertools import islice
+from typing import Any, Iterable, List, NoReturn, Optional
 
 from nodes import (
     AddNode,
     AndNode,
+    ArrayNode,
+    ArrayRangeNode,
     AssignmentNode,
+    CallNode,
     DivideNode,
     DoubleEqualsNode,
+    FunctionDefinitionNode,
     GreaterThanNode,
     GreaterThanOrEqualsNode,
+    IndexNode,
     LessThanNode,
     LessThanOrEqualsNode,
     MinusNode,
@@ -19,8 +25,11 @@ from nodes import (
     NotNode,
     NumberNode,
     OrNode,
+    PatternNode,
     PlusNode,
     PowerNode,
+    ProgramNode,
+    RangeNode,
     SubtractNode,
     ValueAccessNode,
 )
@@ -28,11 +37,16 @@ from tokens import (
     Token,
     is_and,
     is_assignment,
+    is_at,
+    is_colon,
+    is_comma,
     is_divide,
     is_double_equals,
+    is_fun,
     is_greater_than,
     is_greater_than_or_equals,
     is_identifier,
+    is_left_bracket,
     is_left_paren,
     is_less_than,
     is_less_than_or_equals,
@@ -45,17 +59,21 @@ from tokens import (
     is_or,
     is_plus,
     is_power,
+    is_right_bracket,
     is_right_paren,
+    is_separator,
     is_var,
 )
 
 
 class Parser:
-    __slots__ = "_tokens", "_curr_token"
+    __slots__ = "_tokens", "_curr_token", "_lookahead"
 
     def __init__(self, tokens: Iterable[Token]) -> None:
         self._tokens = iter(tokens)
         self._curr_token: Optional[Token] = None
+        # Tokens read by `_peek`, in reverse order.
+        self._lookahead: List[Token] = []
         self._advance()
 
     @property
@@ -67,22 +85,49 @@ class Parser:
     def _advance(self) -> None:
         """Advance the current token to the next one."""
 
+        if self._lookahead:
+            self._curr_token = self._lookahead.pop()
+            return
         try:
             self._curr_token = next(self._tokens)
         except StopIteration:
             self._curr_token = None
 
     def parse(self):
+        self._skip_separators()
         if not self._has_curr_token:
             return None
 
         result = self._generate_expr()
 
+        self._skip_separators()
         if self._has_curr_token:
             self._raise_syntax_error()
 
         return result
 
+    def parse_program(self) -> ProgramNode:
+        """Generate a program of any number of statements.
+
+        Rules:
+        program         : separator* (expression (separator+ expression)*)?
+                          separator*
+        """
+
+        statements: List[Node] = []
+        self._skip_separators()
+        while self._curr_token:
+            statements.append(self._generate_expr())
+            if self._curr_token and not is_separator(self._curr_token.type):
+                self._raise_syntax_error()
+            self._skip_separators()
+
+        return ProgramNode(statements)
+
+    def _skip_separators(self) -> None:
+        while self._curr_token and is_separator(self._curr_token.type):
+            self._advance()
+
     def _raise_syntax_error(self) -> NoReturn:
         raise Exception("Invalid syntax")
 
@@ -94,10 +139,16 @@ class Parser:
 
         Rules:
         expression      : KEYWORD:var IDENTIFIER ASSIGNMENT expression
+                        : annotation? KEYWORD:fun IDENTIFIER LEFT_PAREN parameters?
+                          RIGHT_PAREN ASSIGNMENT expression
                         : comp-expression ((AND|OR) comp-expression)*
         """
         if self._curr_token and is_var(self._curr_token):
             return self._generate_assignment_node()
+        if self._curr_token and is_fun(self._curr_token):
+            return self._generate_function_definition_node()
+        if self._curr_token and is_at(self._curr_token.type):
+            return self._generate_annotated_node()
 
         result = self._generate_comp_expr()
 
@@ -205,10 +256,12 @@ class Parser:
         """Generate power.
 
         Rules:
-        power           : atom ((POWER) factor)*
+        power           : atom index* ((POWER) factor)*
         """
 
         result = self._generate_atom()
+        while self._curr_token and is_left_bracket(self._curr_token.type):
+            result = self._generate_index_node(result)
 
         while self._curr_token and is_power(self._curr_token.type):
             result = self._generate_power_node(result)
@@ -219,7 +272,9 @@ class Parser:
 
         Rules:
         atom            : DECIMAL|IDENTIFIER
+                        : IDENTIFIER LEFT_PAREN arguments? RIGHT_PAREN
                         : LEFT_PAREN expression RIGHT_PAREN
+                        : array
         """
 
         if not self._curr_token:
@@ -228,6 +283,8 @@ class Parser:
         token = self._curr_token
         if is_left_paren(token.type):
             return self._generate_left_paren_node()
+        elif is_left_bracket(token.type):
+            return self._generate_array_node()
         elif is_number(token.type):
             return self._generate_number_node(token)
         elif is_identifier(token.type):
@@ -278,6 +335,55 @@ class Parser:
         self._advance()
         return result
 
+    def _generate_array_node(self) -> Node:
+        """Generate an array.
+
+        Rules:
+        array           : LEFT_BRACKET (expression (COMMA expression)*)? RIGHT_BRACKET
+                        : LEFT_BRACKET expression COLON expression
+                          (COLON expression)? RIGHT_BRACKET
+        """
+
+        self._advance()
+        node: Node = ArrayNode([])
+        if self._curr_token and not is_right_bracket(self._curr_token.type):
+            first = self._generate_expr()
+            if self._curr_token and is_colon(self._curr_token.type):
+                self._advance()
+                stop = self._generate_expr()
+                step: Node = NumberNode(Decimal("1"))
+                if self._curr_token and is_colon(self._curr_token.type):
+                    self._advance()
+                    step = self._generate_expr()
+                node = ArrayRangeNode(first, stop, step)
+            else:
+                elements = [first]
+                while self._curr_token and is_comma(self._curr_token.type):
+                    self._advance()
+                    elements.append(self._generate_expr())
+                node = ArrayNode(elements)
+        self._close_bracket()
+        return node
+
+    def _generate_index_node(self, node: Node) -> IndexNode:
+        """Generate indexing.
+
+        Rules:
+        index           : LEFT_BRACKET expression RIGHT_BRACKET
+        """
+
+        self._advance()
+        index = self._generate_expr()
+        self._close_bracket()
+        return IndexNode(node, index)
+
+    def _close_bracket(self) -> None:
+        if not self._curr_token:
+            self._raise_unexpected_eof()
+        if not is_right_bracket(self._curr_token.type):
+            self._raise_syntax_error()
+        self._advance()
+
     def _generate_modulo_node(self, node: Node) -> ModuloNode:
         self._advance()
         return ModuloNode(node, self._generate_factor())
@@ -294,10 +400,135 @@ class Parser:
         value = self._generate_expr()
         return AssignmentNode(name, value)
 
-    def _generate_value_access_node(self, token: Token) -> ValueAccessNode:
+    def _generate_function_definition_node(self) -> FunctionDefinitionNode:
+        """Generate a function definition.
+
+        Rules:
+        parameters      : IDENTIFIER (COMMA IDENTIFIER)*
+        """
+
+        self._advance()
+        if not self._curr_token or not is_identifier(self._curr_token.type):
+            self._raise_syntax_error()
+        name = str(self._curr_token.value)
+        self._advance()
+        if not self._curr_token or not is_left_paren(self._curr_token.type):
+            self._raise_syntax_error()
+        self._advance()
+
+        parameters: List[str] = []
+        if self._curr_token and not is_right_paren(self._curr_token.type):
+            while True:
+                if not self._curr_token or not is_identifier(self._curr_token.type):
+                    self._raise_syntax_error()
+                parameters.append(str(self._curr_token.value))
+                self._advance()
+                if not self._curr_token or not is_comma(self._curr_token.type):
+                    break
+                self._advance()
+        if not self._curr_token or not is_right_paren(self._curr_token.type):
+            self._raise_syntax_error()
+        self._advance()
+
+        if not self._curr_token or not is_assignment(self._curr_token.type):
+            self._raise_syntax_error()
+        self._advance()
+        return FunctionDefinitionNode(name, parameters, self._generate_expr())
+
+    def _generate_annotated_node(self) -> FunctionDefinitionNode:
+        """Generate an annotated function definition.
+
+        Rules:
+        annotation      : AT IDENTIFIER:nomemo
+        """
+
+        self._advance()
+        if not self._curr_token or not is_identifier(self._curr_token.type):
+            self._raise_syntax_error()
+        annotation = str(self._curr_token.value)
+        if annotation != "nomemo":
+            raise Exception(f"Unknown annotation '@{annotation}'")
+        self._advance()
+        if not self._curr_token or not is_fun(self._curr_token):
+            self._raise_syntax_error()
+        node = self._generate_function_definition_node()
+        node.memoize = False
+        return node
+
+    def _generate_value_access_node(self, token: Token) -> Node:
         self._advance()
+        if self._curr_token and is_left_paren(self._curr_token.type):
+            return self._generate_call_node(token)
         return ValueAccessNode(str(token.value))
 
+    def _generate_call_node(self, token: Token) -> CallNode:
+        """Generate a function call.
+
+        Rules:
+        arguments       : argument (COMMA argument)*
+        """
+
+        self._advance()
+        arguments: List[Node] = []
+        if self._curr_token and not is_right_paren(self._curr_token.type):
+            arguments.append(self._generate_argument())
+            while self._curr_token and is_comma(self._curr_token.type):
+                self._advance()
+                arguments.append(self._generate_argument())
+        if not self._curr_token:
+            self._raise_unexpected_eof()
+        if not is_right_paren(self._curr_token.type):
+            self._raise_syntax_error()
+        self._advance()
+        return CallNode(str(token.value), arguments)
+
+    def _generate_argument(self) -> Node:
+        """Generate an argument of a call.
+
+        Rules:
+        argument        : IDENTIFIER COLON IDENTIFIER
+                        : IDENTIFIER MULTIPLY
+                        : expression
+
+        The pattern `IDENTIFIER MULTIPLY` is only an argument by itself, when the
+        next token ends it.
+        """
+
+        token = self._curr_token
+        if not token or not is_identifier(token.type):
+            return self._generate_expr()
+        following = self._peek(2)
+        if following and is_colon(following[0].type):
+            self._advance()
+            self._advance()
+            if not self._curr_token or not is_identifier(self._curr_token.type):
+                self._raise_syntax_error()
+            node = RangeNode(str(token.value), str(self._curr_token.value))
+            node.check()
+            self._advance()
+            return node
+        if (
+            following
+            and is_multiply(following[0].type)
+            and (
+                len(following) == 1
+                or is_comma(following[1].type)
+                or is_right_paren(following[1].type)
+            )
+        ):
+            self._advance()
+            self._advance()
+            return PatternNode(str(token.value))
+        return self._generate_expr()
+
+    def _peek(self, count: int) -> List[Token]:
+        """Get up to `count` tokens after the current one, without advancing."""
+
+        lookahead = self._lookahead
+        if len(lookahead) < count:
+            lookahead[:0] = reversed(list(islice(self._tokens, count - len(lookahead))))
+        return lookahead[-count:][::-1]
+
     def _generate_not_node(self) -> NotNode:
         self._advance()
         return NotNode(self._generate_comp_expr())
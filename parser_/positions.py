@@ -0,0 +1,112 @@
+"""Parsing with source positions.
+
+`PositionParser` gives every node the span from its first to its last token,
+looking tokens up in the source map `PositionLexer` filled. A node spans its
+parentheses, if any. The plain `Parser` is left alone, so parsing without
+positions costs the same as before.
+"""
+
+from functools import wraps
+from typing import Any, Callable, Iterable, NoReturn, Tuple
+
+from lexer import PositionLexer
+from nodes import ProgramNode, SourceMap
+from tokens import Token
+
+from .parser_ import Parser
+
+
+def parse_with_positions(text: str) -> Tuple[ProgramNode, SourceMap]:
+    """Parse the statements of a text, recording spans of tokens and nodes."""
+
+    source_map = SourceMap(text)
+    tokens = PositionLexer(source_map).generate_tokens()
+    return PositionParser(tokens, source_map).parse_program(), source_map
+
+
+def _recording(generate: Callable[..., Any]) -> Callable[..., Any]:
+    """Record the span of the node a `_generate_*` method returns.
+
+    A method given the left operand or the first token of its node starts
+    there, any other one at the current token.
+    """
+
+    @wraps(generate)
+    def wrapper(self: "PositionParser", *args: Any) -> Any:
+        if not args:
+            start = self._token_start(self._index)
+        elif type(args[0]) is Token:
+            token_index = self._index
+            if args[0] is not self._curr_token:
+                token_index -= 1
+            start = self._token_start(token_index)
+        else:
+            span = self._source_map.span(args[0])
+            start = self._token_start(self._index) if span is None else span[0]
+        node = generate(self, *args)
+        self._source_map.add(node, start, self._token_end(self._index - 1))
+        return node
+
+    return wrapper
+
+
+class PositionParser(Parser):
+    """Parser recording the span of every node in a source map.
+
+    The tokens must come from a `PositionLexer` of the same map, which numbers
+    them in the order the parser reads them.
+    """
+
+    __slots__ = "_source_map", "_index"
+
+    def __init__(self, tokens: Iterable[Token], source_map: SourceMap) -> None:
+        self._source_map = source_map
+        # Number of the current token, the first one is read by `__init__`.
+        self._index = -1
+        super().__init__(tokens)
+
+    def _advance(self) -> None:
+        self._index += 1
+        super()._advance()
+
+    def _token_start(self, index: int) -> int:
+        if index < self._source_map.token_count:
+            return self._source_map.token_span(index)[0]
+        return len(self._source_map.text)
+
+    def _token_end(self, index: int) -> int:
+        if index < 0:
+            return 0
+        if index < self._source_map.token_count:
+            return self._source_map.token_span(index)[1]
+        return len(self._source_map.text)
+
+    def _location(self) -> str:
+        return self._source_map.describe(self._token_start(self._index))
+
+    def parse_program(self) -> ProgramNode:
+        program = super().parse_program()
+        self._source_map.add(program, 0, len(self._source_map.text))
+        return program
+
+    def _raise_syntax_error(self) -> NoReturn:
+        raise Exception(f"Invalid syntax at {self._location()}")
+
+    def _raise_unexpected_eof(self) -> NoReturn:
+        raise Exception(f"Unexpected EOF at {self._location()}")
+
+
+# Every node is generated by one of the `_generate_*` methods. These only pass
+# on nodes generated by the others.
+_DISPATCHERS = {
+    "_generate_expr",
+    "_generate_comp_expr",
+    "_generate_math_expr",
+    "_generate_term",
+    "_generate_factor",
+    "_generate_power",
+    "_generate_atom",
+}
+for _name, _method in list(vars(Parser).items()):
+    if _name.startswith("_generate_") and _name not in _DISPATCHERS:
+        setattr(PositionParser, _name, _recording(_method))
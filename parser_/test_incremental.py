@@ -0,0 +1,155 @@
+import random
+
+import pytest
+
+from lexer import Lexer
+
+from .incremental import parse_script, reparse_script
+from .parser_ import Parser
+
+SCRIPT = "var a = 1\nvar b = a * 2; b + 1\n\nfun f(x) = x * b\nf(a) + f(b)\n"
+
+
+def parse_program(text):
+    return Parser(Lexer(text).generate_tokens()).parse_program()
+
+
+def edit(script, old, new, occurrence=0):
+    offset = -1
+    for _ in range(occurrence + 1):
+        offset = script.text.index(old, offset + 1)
+    return reparse_script(script, offset, len(old), new)
+
+
+def test_parse_script():
+    script = parse_script(SCRIPT)
+    assert script.program == parse_program(SCRIPT)
+    assert [SCRIPT[start:end] for start, end in script.spans] == [
+        "var a = 1",
+        "var b = a * 2",
+        " b + 1",
+        "fun f(x) = x * b",
+        "f(a) + f(b)",
+    ]
+
+
+def test_untouched_statements_are_reused():
+    script = parse_script(SCRIPT)
+    new_script, change = edit(script, "b + 1", "b + 2")
+    assert new_script.program == parse_program(new_script.text)
+    assert (change.index, change.removed, change.added) == (
+        2,
+        [script.statements[2]],
+        [new_script.statements[2]],
+    )
+    for index in (0, 1, 3, 4):
+        assert new_script.statements[index] is script.statements[index]
+
+
+@pytest.mark.parametrize(
+    ["old", "new", "index", "removed", "added"],
+    [
+        ("; b + 1", "\nb + 1; b", 3, 0, 1),
+        ("; b", " + b", 1, 2, 1),
+        ("var a = 1\n", "", 0, 1, 0),
+        ("", "1;", 0, 0, 1),
+        ("f(a) + f(b)\n", "f(a) + f(b)\n1\n", 5, 0, 1),
+    ],
+)
+def test_separators_are_edited(old, new, index, removed, added):
+    script = parse_script(SCRIPT)
+    new_script, change = edit(script, old, new)
+    assert new_script.program == parse_program(new_script.text)
+    assert (change.index, len(change.removed), len(change.added)) == (
+        index,
+        removed,
+        added,
+    )
+
+
+def test_whitespace_changes_nothing():
+    script = parse_script(SCRIPT)
+    new_script, change = edit(script, "a * 2", "a *  2")
+    assert not change
+    assert new_script.statements == script.statements
+    assert new_script.spans[2] == (script.spans[2][0] + 1, script.spans[2][1] + 1)
+
+
+def test_syntax_errors():
+    script = parse_script(SCRIPT)
+    with pytest.raises(Exception, match="Invalid syntax"):
+        edit(script, "b + 1", "b +* 1")
+    with pytest.raises(ValueError, match="out of range"):
+        reparse_script(script, len(SCRIPT), 1, "")
+    assert script.text == SCRIPT
+
+
+def test_parentheses_are_only_left_open_at_the_end():
+    script = parse_script("a\n(1 + 2")
+    assert script.statements[1] == parse_program("(1 + 2").statements[0]
+    with pytest.raises(Exception, match="Invalid syntax"):
+        reparse_script(script, len(script.text), 0, "\n3")
+
+
+MULTILINE_SCRIPT = "var a = (1 +\n  2)\nsum(\n  [a,\n   3]\n); a\n\na * 2\n"
+
+
+def test_statements_spanning_lines():
+    script = parse_script(MULTILINE_SCRIPT)
+    assert script.program == parse_program(MULTILINE_SCRIPT)
+    assert [MULTILINE_SCRIPT[start:end] for start, end in script.spans] == [
+        "var a = (1 +\n  2)",
+        "sum(\n  [a,\n   3]\n)",
+        " a",
+        "a * 2",
+    ]
+
+
+@pytest.mark.parametrize(
+    ["old", "new", "index", "removed", "added"],
+    [
+        ("; a", "\n+ a", 2, 1, 1),
+        ("a * 2\n", "(a *\n 2)\n", 4, 0, 0),
+        ("  2)\nsum", "  2\n) + sum", 0, 2, 1),
+        ("sum(\n  [a,\n   3]\n)", "sum(a)\n[a, 3]", 1, 1, 2),
+    ],
+)
+def test_parentheses_are_edited(old, new, index, removed, added):
+    script = parse_script(MULTILINE_SCRIPT)
+    new_script, change = edit(script, old, new)
+    assert new_script.program == parse_program(new_script.text)
+    assert (change.index, len(change.removed), len(change.added)) == (
+        index,
+        removed,
+        added,
+    )
+
+
+@pytest.mark.parametrize(
+    ["old", "new", "message"],
+    [("2)", "2", "Invalid syntax"), ("a * 2", "(a *", "Unexpected EOF")],
+)
+def test_parentheses_left_open(old, new, message):
+    with pytest.raises(Exception, match=message):
+        edit(parse_script(MULTILINE_SCRIPT), old, new)
+
+
+@pytest.mark.parametrize("text", [SCRIPT, MULTILINE_SCRIPT])
+def test_random_edits_match_full_parse(text):
+    rng = random.Random(46)
+    pieces = ["a", "1", " ", "+", "*", "\n", ";", "(", ")", "[", "]", "var b = ", "2"]
+    script = parse_script(text)
+    for _ in range(500):
+        offset = rng.randint(0, len(script.text))
+        removed = rng.randint(0, min(3, len(script.text) - offset))
+        inserted = "".join(rng.choices(pieces, k=rng.randint(0, 3)))
+        rest = offset + removed
+        text = script.text[:offset] + inserted + script.text[rest:]
+        try:
+            expected = parse_program(text)
+        except Exception:
+            with pytest.raises(Exception):
+                reparse_script(script, offset, removed, inserted)
+            continue
+        script, _ = reparse_script(script, offset, removed, inserted)
+        assert script.program == expected
@@ -3,16 +3,22 @@ from typing import Type
 
 import pytest
 
+from lexer import Lexer
 from nodes import (
     AddNode,
     AndNode,
+    ArrayNode,
+    ArrayRangeNode,
     AssignmentNode,
     BinaryCompExprNode,
+    CallNode,
     DivideNode,
     DoubleEqualsNode,
     ExprNode,
+    FunctionDefinitionNode,
     GreaterThanNode,
     GreaterThanOrEqualsNode,
+    IndexNode,
     LessThanNode,
     LessThanOrEqualsNode,
     MinusNode,
@@ -22,8 +28,11 @@ from nodes import (
     NotNode,
     NumberNode,
     OrNode,
+    PatternNode,
     PlusNode,
     PowerNode,
+    ProgramNode,
+    RangeNode,
     SubtractNode,
     ValueAccessNode,
 )
@@ -223,3 +232,204 @@ def test_nested_logical_operators():
     )
     tree = Parser(tokens).parse()
     assert tree == expected
+
+
+def test_function_definition():
+    tokens = [
+        Token(TokenType.KEYWORD, "fun"),
+        Token(TokenType.IDENTIFIER, "f"),
+        Token(TokenType.LEFT_PAREN),
+        Token(TokenType.IDENTIFIER, "a"),
+        Token(TokenType.COMMA),
+        Token(TokenType.IDENTIFIER, "b"),
+        Token(TokenType.RIGHT_PAREN),
+        Token(TokenType.EQ),
+        Token(TokenType.IDENTIFIER, "a"),
+        Token(TokenType.MULTIPLY),
+        Token(TokenType.IDENTIFIER, "b"),
+    ]
+    tree = Parser(tokens).parse()
+    assert tree == FunctionDefinitionNode(
+        "f", ["a", "b"], MultiplyNode(ValueAccessNode("a"), ValueAccessNode("b"))
+    )
+
+
+def test_function_call():
+    tokens = [
+        Token(TokenType.IDENTIFIER, "f"),
+        Token(TokenType.LEFT_PAREN),
+        Token(TokenType.NUMBER, Decimal("1")),
+        Token(TokenType.COMMA),
+        Token(TokenType.IDENTIFIER, "g"),
+        Token(TokenType.LEFT_PAREN),
+        Token(TokenType.RIGHT_PAREN),
+        Token(TokenType.RIGHT_PAREN),
+        Token(TokenType.PLUS),
+        Token(TokenType.IDENTIFIER, "f"),
+    ]
+    tree = Parser(tokens).parse()
+    assert tree == AddNode(
+        CallNode("f", [NumberNode(Decimal("1")), CallNode("g", [])]),
+        ValueAccessNode("f"),
+    )
+
+
+def test_annotated_function_definition():
+    tokens = [
+        Token(TokenType.AT),
+        Token(TokenType.IDENTIFIER, "nomemo"),
+        Token(TokenType.KEYWORD, "fun"),
+        Token(TokenType.IDENTIFIER, "f"),
+        Token(TokenType.LEFT_PAREN),
+        Token(TokenType.RIGHT_PAREN),
+        Token(TokenType.EQ),
+        Token(TokenType.NUMBER, Decimal("1")),
+    ]
+    tree = Parser(tokens).parse()
+    assert tree == FunctionDefinitionNode("f", [], NumberNode(Decimal("1")), False)
+
+
+def test_ranges_and_patterns():
+    tree = Parser(Lexer("sum(a1:a9, b*, c * 2, d*)").generate_tokens()).parse()
+    assert tree == CallNode(
+        "sum",
+        [
+            RangeNode("a1", "a9"),
+            PatternNode("b"),
+            MultiplyNode(ValueAccessNode("c"), NumberNode(Decimal("2"))),
+            PatternNode("d"),
+        ],
+    )
+
+
+def test_arrays():
+    tree = Parser(Lexer("[1, a][-1] ^ 2").generate_tokens()).parse()
+    assert tree == PowerNode(
+        IndexNode(
+            ArrayNode([NumberNode(Decimal("1")), ValueAccessNode("a")]),
+            MinusNode(NumberNode(Decimal("1"))),
+        ),
+        NumberNode(Decimal("2")),
+    )
+    assert Parser(Lexer("[]").generate_tokens()).parse() == ArrayNode([])
+
+
+def test_array_ranges():
+    tree = Parser(Lexer("[0:n][i][j]").generate_tokens()).parse()
+    array = ArrayRangeNode(
+        NumberNode(Decimal("0")), ValueAccessNode("n"), NumberNode(Decimal("1"))
+    )
+    assert tree == IndexNode(
+        IndexNode(array, ValueAccessNode("i")), ValueAccessNode("j")
+    )
+    tree = Parser(Lexer("[1:2:0.5]").generate_tokens()).parse()
+    assert repr(tree) == "[1:2:0.5]"
+
+
+def test_programs():
+    tokens = Lexer("\n var a = 1;; a\n\na + 1;\n").generate_tokens()
+    assert Parser(tokens).parse_program() == ProgramNode(
+        [
+            AssignmentNode("a", NumberNode(Decimal("1"))),
+            ValueAccessNode("a"),
+            AddNode(ValueAccessNode("a"), NumberNode(Decimal("1"))),
+        ]
+    )
+    assert Parser(Lexer(";\n").generate_tokens()).parse_program() == ProgramNode([])
+    assert Parser(Lexer("\na;\n").generate_tokens()).parse() == ValueAccessNode("a")
+
+
+@pytest.mark.parametrize(
+    ["source", "message"],
+    [
+        ("a; b", "Invalid syntax"),
+        ("1 +\n2", "Invalid syntax"),
+        ("(1\n) 2", "Invalid syntax"),
+        ("(1\n)\n)", "Invalid syntax"),
+    ],
+)
+def test_statements_are_separate(source, message):
+    with pytest.raises(Exception, match=message):
+        Parser(Lexer(source).generate_tokens()).parse()
+
+
+def test_newlines_inside_parentheses_and_brackets():
+    tree = Parser(Lexer("(1 +\n 2)").generate_tokens()).parse()
+    assert tree == AddNode(NumberNode(Decimal("1")), NumberNode(Decimal("2")))
+    tokens = Lexer("var a = sum(\n  [1,\n   2],\n  3\n)\na").generate_tokens()
+    program = Parser(tokens).parse_program()
+    assert len(program.statements) == 2
+    assert repr(program.statements[0]) == "a=sum([1,2],3)"
+
+
+@pytest.mark.parametrize(
+    ["source", "message"],
+    [
+        ("[1, 2", "Unexpected EOF"),
+        ("[1, 2)", "Invalid syntax"),
+        ("[1,]", "Invalid syntax"),
+        ("[1:2:3:4]", "Invalid syntax"),
+        ("[1:]", "Invalid syntax"),
+        ("a[]", "Invalid syntax"),
+        ("a[1", "Unexpected EOF"),
+    ],
+)
+def test_invalid_arrays(source, message):
+    with pytest.raises(Exception, match=message):
+        Parser(Lexer(source).generate_tokens()).parse()
+
+
+@pytest.mark.parametrize(
+    ["tokens", "message"],
+    [
+        (
+            [Token(TokenType.KEYWORD, "fun"), Token(TokenType.IDENTIFIER, "f")],
+            "Invalid syntax",
+        ),
+        (
+            [
+                Token(TokenType.IDENTIFIER, "f"),
+                Token(TokenType.LEFT_PAREN),
+                Token(TokenType.NUMBER, Decimal("1")),
+            ],
+            "Unexpected EOF",
+        ),
+        (
+            [
+                Token(TokenType.IDENTIFIER, "f"),
+                Token(TokenType.LEFT_PAREN),
+                Token(TokenType.NUMBER, Decimal("1")),
+                Token(TokenType.COMMA),
+                Token(TokenType.RIGHT_PAREN),
+            ],
+            "Invalid syntax",
+        ),
+        (
+            list(Lexer("f(a9:a1)").generate_tokens()),
+            "Invalid range a9:a1",
+        ),
+        (
+            list(Lexer("f(a1:)").generate_tokens()),
+            "Invalid syntax",
+        ),
+        (
+            list(Lexer("a*").generate_tokens()),
+            "Unexpected EOF",
+        ),
+        (
+            [Token(TokenType.AT), Token(TokenType.IDENTIFIER, "memo")],
+            "Unknown annotation '@memo'",
+        ),
+        (
+            [
+                Token(TokenType.AT),
+                Token(TokenType.IDENTIFIER, "nomemo"),
+                Token(TokenType.NUMBER, Decimal("1")),
+            ],
+            "Invalid syntax",
+        ),
+    ],
+)
+def test_invalid_functions(tokens, message):
+    with pytest.raises(Exception, match=message):
+        Parser(tokens).parse()
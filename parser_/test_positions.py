@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer, PositionLexer
+from nodes import NumberNode, SourceMap, walk
+
+from .parser_ import Parser
+from .positions import parse_with_positions
+
+SCRIPT = """var a = (1 + 2) * 3
+@nomemo fun f(x) = x ^ 2
+f(a)[0] + sum(x1:x3, y*) - -a; [1:3]
+"""
+
+
+def sources(text):
+    program, source_map = parse_with_positions(text)
+    return [
+        source_map.source(node)
+        for statement in program.statements
+        for node in walk(statement)
+        if node in source_map
+    ]
+
+
+def test_same_trees_as_parser():
+    program, _ = parse_with_positions(SCRIPT)
+    assert program == Parser(Lexer(SCRIPT).generate_tokens()).parse_program()
+
+
+def test_node_spans():
+    assert sources(SCRIPT) == [
+        "var a = (1 + 2) * 3",
+        "(1 + 2) * 3",
+        "(1 + 2)",
+        "1",
+        "2",
+        "3",
+        "@nomemo fun f(x) = x ^ 2",
+        "x ^ 2",
+        "x",
+        "2",
+        "f(a)[0] + sum(x1:x3, y*) - -a",
+        "f(a)[0] + sum(x1:x3, y*)",
+        "f(a)[0]",
+        "f(a)",
+        "a",
+        "0",
+        "sum(x1:x3, y*)",
+        "x1:x3",
+        "y*",
+        "-a",
+        "a",
+        "[1:3]",
+        "1",
+        "3",
+    ]
+
+
+def test_lines():
+    program, source_map = parse_with_positions(SCRIPT)
+    assert [source_map.line(node) for node in program.statements] == [1, 2, 3, 3]
+    assert source_map.span(program) == (0, len(SCRIPT))
+    assert source_map.position(len(SCRIPT)) == (4, 1)
+
+
+def test_unclosed_parenthesis_at_the_end():
+    text = "var a = 1\n(a + 2"
+    program, source_map = parse_with_positions(text)
+    statement = program.statements[-1]
+    assert source_map.span(statement) == (10, len(text))
+    assert source_map.source(statement) == "(a + 2"
+
+
+def test_token_spans():
+    source_map = SourceMap(" \tvar  x = .5\n\r x")
+    tokens = list(PositionLexer(source_map).generate_tokens())
+    assert source_map.token_count == len(tokens)
+    assert [source_map.token_span(index) for index in range(len(tokens))] == [
+        (2, 5),
+        (7, 8),
+        (9, 10),
+        (11, 13),
+        (13, 14),
+        (16, 17),
+    ]
+    assert len(source_map) == 0
+
+
+def test_unknown_objects():
+    source_map = SourceMap("")
+    node = NumberNode(Decimal("1"))
+    assert node not in source_map
+    assert source_map.span(node) is None
+    assert source_map.source(node) is None
+    assert source_map.line(node) is None
+
+
+@pytest.mark.parametrize(
+    ["text", "message"],
+    [
+        ("1 +", "Unexpected EOF at line 1, column 4"),
+        ("a\n  b )", "Invalid syntax at line 2, column 5"),
+        ("var = 3", "Invalid syntax at line 1, column 5"),
+        ("1;\n 2 $", "Illegal character, '\\$' at line 2, column 4"),
+    ],
+)
+def test_errors_have_positions(text, message):
+    with pytest.raises(Exception, match=message):
+        parse_with_positions(text)
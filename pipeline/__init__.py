@@ -0,0 +1 @@
+from .pipeline import PipelineError, PipelineStats, evaluate_csv
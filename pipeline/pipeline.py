@@ -0,0 +1,228 @@
+"""Evaluate an expression for every row of a CSV file.
+
+The input is read and the output written a chunk of rows at a time, so memory
+use depends on the chunk size but not on the size of the files. Variables of
+the expression are bound to columns of the same name, or as given by
+`bindings`, and the rest are taken from a symbol table once for the whole run.
+
+The expression is parsed once and compiled when possible. A row which fails,
+because of an invalid number, a division by zero or an undefined variable, gets
+an empty result and its error goes to the errors file, the run goes on.
+
+    python -m pipeline "price * amount" orders.csv totals.csv --errors errors.csv
+"""
+
+import argparse
+import csv
+import os
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from compiler import CompileError, compile_expression
+from interpreter import Interpreter, SymbolTable
+from interpreter.bulk_import import is_valid_identifier
+from interpreter.values import Number
+from lexer import Lexer
+from nodes import AssignmentNode, FunctionDefinitionNode, Node, free_variables, walk
+from parser_ import Parser
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_OUTPUT_COLUMN = "result"
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Evaluates the expression given its variables.
+_Evaluate = Callable[[Dict[str, Any]], Any]
+
+
+class PipelineError(Exception):
+    pass
+
+
+@dataclass
+class PipelineStats:
+    rows: int = 0
+    errors: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def evaluate_csv(
+    source: str,
+    input_path: PathLike,
+    output_path: PathLike,
+    errors_path: Optional[PathLike] = None,
+    bindings: Optional[Mapping[str, str]] = None,
+    symbol_table: Optional[SymbolTable] = None,
+    output_column: str = DEFAULT_OUTPUT_COLUMN,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> PipelineStats:
+    """Evaluate an expression for every row of a CSV file with a header.
+
+    The output has the columns of the input followed by `output_column`. The
+    errors file, if any, has the number of the failed row and the error.
+    """
+
+    tree = _parse(source)
+    evaluate = _evaluator(tree)
+    names = sorted(free_variables(tree))
+    bindings = dict(bindings or {})
+    for name in bindings:
+        if not is_valid_identifier(name):
+            raise PipelineError(f"Invalid identifier {name!r}")
+
+    stats = PipelineStats()
+    start = perf_counter()
+    with open(input_path, newline="") as input_file, open(
+        output_path, "w", newline=""
+    ) as output_file:
+        reader = csv.reader(input_file)
+        header = next(reader, None)
+        if header is None:
+            raise PipelineError("The input has no header")
+        columns, constants = _bind(names, header, bindings, symbol_table)
+        writer = csv.writer(output_file)
+        writer.writerow(header + [output_column])
+
+        errors_file = None
+        errors_writer = None
+        if errors_path is not None:
+            errors_file = open(errors_path, "w", newline="")
+            errors_writer = csv.writer(errors_file)
+            errors_writer.writerow(["row", "error"])
+        try:
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                errors: List[Tuple[int, str]] = []
+                for row in rows:
+                    stats.rows += 1
+                    try:
+                        variables = dict(constants)
+                        for name, index in columns:
+                            variables[name] = _number(row, index, header)
+                        value = evaluate(variables)
+                        row.append("" if value is None else str(value))
+                    except Exception as error:
+                        errors.append((stats.rows, str(error)))
+                        row.append("")
+                writer.writerows(rows)
+                if errors_writer is not None:
+                    errors_writer.writerows(errors)
+                stats.errors += len(errors)
+                stats.chunks += 1
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+    stats.elapsed = perf_counter() - start
+    return stats
+
+
+def _parse(source: str) -> Node:
+    tree = Parser(Lexer(source).generate_tokens()).parse()
+    if tree is None:
+        raise PipelineError("The expression is empty")
+    definitions = (AssignmentNode, FunctionDefinitionNode)
+    if any(type(node) in definitions for node in walk(tree)):
+        raise PipelineError("Definitions aren't supported in a pipeline")
+    return tree
+
+
+def _evaluator(tree: Node) -> _Evaluate:
+    try:
+        # Compiled code only calls `get` of its table, so a dict does.
+        return compile_expression(tree)  # type: ignore
+    except CompileError:
+        pass
+
+    def interpret(variables: Dict[str, Any]) -> Any:
+        table = SymbolTable()
+        table.update(variables)
+        return Interpreter(table).visit(tree)
+
+    return interpret
+
+
+def _bind(
+    names: List[str],
+    header: List[str],
+    bindings: Mapping[str, str],
+    symbol_table: Optional[SymbolTable],
+) -> Tuple[List[Tuple[str, int]], Dict[str, Any]]:
+    """Split variables into ones bound to column indices and constant ones."""
+
+    indices = {column: index for index, column in reversed(list(enumerate(header)))}
+    for name, column in bindings.items():
+        if column not in indices:
+            raise PipelineError(f"No column '{column}' for '{name}'")
+
+    columns: List[Tuple[str, int]] = []
+    constants: Dict[str, Any] = {}
+    for name in names:
+        column = bindings.get(name, name)
+        if column in indices:
+            columns.append((name, indices[column]))
+        elif symbol_table is not None:
+            value = symbol_table.get(name)
+            if value is not None:
+                constants[name] = value
+    return columns, constants
+
+
+def _number(row: List[str], index: int, header: List[str]) -> Number:
+    if index >= len(row):
+        raise PipelineError(f"Missing value in column '{header[index]}'")
+    try:
+        value = Decimal(row[index])
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise PipelineError(f"Invalid number in column '{header[index]}'")
+    return Number(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Evaluate an expression for every row of a CSV file."
+    )
+    parser.add_argument("expression")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--errors", help="write failed rows to this file")
+    parser.add_argument("--column", default=DEFAULT_OUTPUT_COLUMN)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--bind",
+        action="append",
+        default=[],
+        metavar="NAME=COLUMN",
+        help="bind a variable to a column with a different name",
+    )
+    args = parser.parse_args()
+    bindings = {}
+    for binding in args.bind:
+        name, equals, column = binding.partition("=")
+        if not equals:
+            parser.error(f"expected NAME=COLUMN, got {binding!r}")
+        bindings[name] = column
+    stats = evaluate_csv(
+        args.expression,
+        args.input,
+        args.output,
+        args.errors,
+        bindings,
+        output_column=args.column,
+        chunk_size=args.chunk_size,
+    )
+    print(
+        f"{stats.rows} rows, {stats.errors} errors in {stats.elapsed:.2f}s"
+        f" ({stats.rows_per_second:.0f} rows/s)"
+    )
@@ -0,0 +1,94 @@
+import csv
+from decimal import Decimal
+
+import pytest
+
+from interpreter import SymbolTable
+from interpreter.values import Number
+
+from .pipeline import PipelineError, evaluate_csv
+
+
+def read(path):
+    with open(path, newline="") as file:
+        return list(csv.reader(file))
+
+
+def test_evaluate_csv(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a,b,label\n1,2,x\n3,0,y\n2.5,x,z\n4,4,w\n")
+    output_path = tmp_path / "output.csv"
+    errors_path = tmp_path / "errors.csv"
+
+    stats = evaluate_csv("a / b", input_path, output_path, errors_path, chunk_size=2)
+
+    assert read(output_path) == [
+        ["a", "b", "label", "result"],
+        ["1", "2", "x", "0.5"],
+        ["3", "0", "y", ""],
+        ["2.5", "x", "z", ""],
+        ["4", "4", "w", "1"],
+    ]
+    assert read(errors_path) == [
+        ["row", "error"],
+        ["2", "Runtime math error"],
+        ["3", "Invalid number in column 'b'"],
+    ]
+    assert (stats.rows, stats.errors, stats.chunks) == (4, 2, 2)
+
+
+def test_bindings_and_constants(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("price,n\n2,3\n1.5,2\n")
+    output_path = tmp_path / "output.csv"
+    table = SymbolTable()
+    table.set("tax", Number(Decimal("0.5")))
+
+    evaluate_csv(
+        "p * amount + tax > 4",
+        input_path,
+        output_path,
+        bindings={"p": "price", "amount": "n"},
+        symbol_table=table,
+        output_column="expensive",
+    )
+
+    assert read(output_path) == [
+        ["price", "n", "expensive"],
+        ["2", "3", "true"],
+        ["1.5", "2", "false"],
+    ]
+
+
+def test_undefined_variable_is_a_row_error(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a\n1\n")
+    errors_path = tmp_path / "errors.csv"
+    stats = evaluate_csv("a + c", input_path, tmp_path / "out.csv", errors_path)
+    assert stats.errors == 1
+    assert read(errors_path)[1] == ["1", "'c' is not defined"]
+
+
+def test_long_formula_is_interpreted(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a\n1\n2\n")
+    output_path = tmp_path / "output.csv"
+    stats = evaluate_csv(" + ".join(["a"] * 300), input_path, output_path)
+    assert stats.errors == 0
+    assert read(output_path) == [["a", "result"], ["1", "300"], ["2", "600"]]
+
+
+@pytest.mark.parametrize(
+    ["source", "bindings", "message"],
+    [
+        ("", None, "The expression is empty"),
+        ("var x = a", None, "Definitions aren't supported"),
+        ("a", {"a": "missing"}, "No column 'missing' for 'a'"),
+        ("a", {"1a": "a"}, "Invalid identifier '1a'"),
+    ],
+)
+def test_invalid_pipeline(tmp_path, source, bindings, message):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a\n1\n")
+    with pytest.raises(PipelineError, match=message):
+        evaluate_csv(source, input_path, tmp_path / "out.csv", bindings=bindings)
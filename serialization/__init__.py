@@ -0,0 +1 @@
+from .serialization import Decoder, Encoder, SerializationError, dumps, loads
@@ -0,0 +1,488 @@
+"""Compact binary encoding of `nodes` trees.
+
+Stream layout:
+
+    MAGIC, varint format version, then one encoded tree after another.
+
+A tree is written in pre-order. Every node starts with its kind from
+`NODE_KINDS`, a single byte, followed by its operands. Decimals and identifiers
+are not written inline but through a constant pool and a string table shared by
+the whole stream: a varint reference equal to the current table size introduces
+a new entry, which is stored right after it (varint length and UTF-8 text). This
+keeps the format streamable, as no table has to be known up front.
+
+Kind codes are part of the format and must never be reordered or reused, new
+node kinds get new codes at the end.
+"""
+
+import io
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from nodes import (
+    AddNode,
+    AndNode,
+    ArrayNode,
+    ArrayRangeNode,
+    AssignmentNode,
+    CallNode,
+    DivideNode,
+    DoubleEqualsNode,
+    FunctionDefinitionNode,
+    GreaterThanNode,
+    GreaterThanOrEqualsNode,
+    IndexNode,
+    LessThanNode,
+    LessThanOrEqualsNode,
+    LetNode,
+    MinusNode,
+    ModuloNode,
+    MultiplyNode,
+    Node,
+    NotEqualsNode,
+    NotNode,
+    NumberNode,
+    OrNode,
+    PatternNode,
+    PlusNode,
+    PowerNode,
+    ProgramNode,
+    RangeNode,
+    SubtractNode,
+    TempNode,
+    ValueAccessNode,
+)
+
+MAGIC = b"CTBN"
+FORMAT_VERSION = 2
+
+NUMBER = 0
+VALUE_ACCESS = 1
+ASSIGNMENT = 2
+UNARY_KINDS = (PlusNode, MinusNode, NotNode)
+BINARY_KINDS = (
+    AddNode,
+    SubtractNode,
+    MultiplyNode,
+    DivideNode,
+    ModuloNode,
+    PowerNode,
+    LessThanNode,
+    GreaterThanNode,
+    LessThanOrEqualsNode,
+    GreaterThanOrEqualsNode,
+    DoubleEqualsNode,
+    NotEqualsNode,
+    AndNode,
+    OrNode,
+)
+TEMPORARY_KINDS = (LetNode, TempNode)
+FUNCTION_KINDS = (FunctionDefinitionNode, CallNode)
+ARGUMENT_KINDS = (RangeNode, PatternNode)
+ARRAY_KINDS = (ArrayNode, ArrayRangeNode, IndexNode)
+PROGRAM_KINDS = (ProgramNode,)
+NODE_KINDS = (
+    (NumberNode, ValueAccessNode, AssignmentNode)
+    + UNARY_KINDS
+    + BINARY_KINDS
+    + TEMPORARY_KINDS
+    + FUNCTION_KINDS
+    + ARGUMENT_KINDS
+    + ARRAY_KINDS
+    + PROGRAM_KINDS
+)
+
+# Kinds are written as single bytes, which stay valid varints below 0x80.
+assert len(NODE_KINDS) < 0x80
+
+_READ_SIZE = 1 << 16
+
+
+class SerializationError(Exception):
+    pass
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    """Append an unsigned LEB128 integer."""
+
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class Encoder:
+    """Write trees to a binary stream, one `write` call per tree."""
+
+    __slots__ = "_stream", "_constants", "_strings", "_out", "_dispatch"
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self._constants: Dict[str, int] = {}
+        self._strings: Dict[str, int] = {}
+        self._out = bytearray(MAGIC)
+        encode_varint(FORMAT_VERSION, self._out)
+        self._flush()
+        self._dispatch: Dict[type, Callable[[Node], None]] = {
+            NumberNode: self._encode_number,
+            PowerNode: self._encode_power,
+            ValueAccessNode: self._encode_value_access,
+            AssignmentNode: self._encode_assignment,
+            LetNode: self._encode_let,
+            TempNode: self._encode_temp,
+            FunctionDefinitionNode: self._encode_function_definition,
+            CallNode: self._encode_call,
+            RangeNode: self._encode_range,
+            PatternNode: self._encode_pattern,
+            ArrayNode: self._encode_array,
+            ArrayRangeNode: self._encode_array_range,
+            IndexNode: self._encode_index,
+            ProgramNode: self._encode_program,
+        }
+        for kind in UNARY_KINDS:
+            self._dispatch[kind] = self._encode_unary
+        for kind in BINARY_KINDS:
+            self._dispatch.setdefault(kind, self._encode_binary)
+
+    def write(self, node: Node) -> None:
+        self._encode(node)
+        self._flush()
+
+    def _flush(self) -> None:
+        self._stream.write(self._out)
+        self._out.clear()
+
+    def _encode(self, node: Node) -> None:
+        try:
+            method = self._dispatch[type(node)]
+        except KeyError:
+            raise SerializationError(f"Can't encode {type(node).__name__}")
+        method(node)
+
+    def _encode_number(self, node: NumberNode) -> None:
+        self._out.append(NUMBER)
+        # The text form keeps the exact coefficient and exponent, e.g. '1.50'.
+        self._encode_entry(self._constants, str(node.value))
+
+    def _encode_value_access(self, node: ValueAccessNode) -> None:
+        self._out.append(VALUE_ACCESS)
+        self._encode_entry(self._strings, node.name)
+
+    def _encode_assignment(self, node: AssignmentNode) -> None:
+        self._out.append(ASSIGNMENT)
+        self._encode_entry(self._strings, node.name)
+        self._encode(node.value)
+
+    def _encode_unary(self, node: Node) -> None:
+        self._out.append(_KIND_CODES[type(node)])
+        self._encode(node.node)  # type: ignore
+
+    def _encode_binary(self, node: Node) -> None:
+        self._out.append(_KIND_CODES[type(node)])
+        self._encode(node.node_a)  # type: ignore
+        self._encode(node.node_b)  # type: ignore
+
+    def _encode_power(self, node: PowerNode) -> None:
+        self._out.append(_KIND_CODES[PowerNode])
+        self._encode(node.node)
+        self._encode(node.power)
+
+    def _encode_let(self, node: LetNode) -> None:
+        self._out.append(_KIND_CODES[LetNode])
+        encode_varint(node.index, self._out)
+        self._encode(node.value)
+        self._encode(node.body)
+
+    def _encode_temp(self, node: TempNode) -> None:
+        self._out.append(_KIND_CODES[TempNode])
+        encode_varint(node.index, self._out)
+
+    def _encode_function_definition(self, node: FunctionDefinitionNode) -> None:
+        self._out.append(_KIND_CODES[FunctionDefinitionNode])
+        self._encode_entry(self._strings, node.name)
+        encode_varint(len(node.parameters), self._out)
+        encode_varint(0 if node.memoize else _NOMEMO, self._out)
+        for parameter in node.parameters:
+            self._encode_entry(self._strings, parameter)
+        self._encode(node.body)
+
+    def _encode_call(self, node: CallNode) -> None:
+        self._out.append(_KIND_CODES[CallNode])
+        self._encode_entry(self._strings, node.name)
+        encode_varint(len(node.arguments), self._out)
+        for argument in node.arguments:
+            self._encode(argument)
+
+    def _encode_range(self, node: RangeNode) -> None:
+        self._out.append(_KIND_CODES[RangeNode])
+        self._encode_entry(self._strings, node.start)
+        self._encode_entry(self._strings, node.end)
+
+    def _encode_pattern(self, node: PatternNode) -> None:
+        self._out.append(_KIND_CODES[PatternNode])
+        self._encode_entry(self._strings, node.prefix)
+
+    def _encode_array(self, node: ArrayNode) -> None:
+        self._out.append(_KIND_CODES[ArrayNode])
+        encode_varint(len(node.elements), self._out)
+        for element in node.elements:
+            self._encode(element)
+
+    def _encode_array_range(self, node: ArrayRangeNode) -> None:
+        self._out.append(_KIND_CODES[ArrayRangeNode])
+        self._encode(node.start)
+        self._encode(node.stop)
+        self._encode(node.step)
+
+    def _encode_index(self, node: IndexNode) -> None:
+        self._out.append(_KIND_CODES[IndexNode])
+        self._encode(node.node)
+        self._encode(node.index)
+
+    def _encode_program(self, node: ProgramNode) -> None:
+        self._out.append(_KIND_CODES[ProgramNode])
+        encode_varint(len(node.statements), self._out)
+        for statement in node.statements:
+            self._encode(statement)
+
+    def _encode_entry(self, table: Dict[str, int], text: str) -> None:
+        out = self._out
+        ref = table.get(text)
+        if ref is not None:
+            encode_varint(ref, out)
+            return
+        ref = len(table)
+        table[text] = ref
+        encode_varint(ref, out)
+        data = text.encode()
+        encode_varint(len(data), out)
+        out += data
+
+
+class Decoder:
+    """Read trees from a binary stream.
+
+    Input is consumed in chunks, so trees can be decoded while the rest of the
+    stream is still being received. Trees are decoded from a memoryview of the
+    buffered input with an index. A tree which runs past the buffer is decoded
+    again from its start once at least as much input again is buffered, so a
+    tree spanning many chunks is decoded a logarithmic number of times.
+    """
+
+    __slots__ = "_stream", "_data", "_view", "_position", "_constants", "_strings"
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self._data = b""
+        self._view = memoryview(self._data)
+        self._position = 0
+        self._constants: List[Decimal] = []
+        self._strings: List[str] = []
+        self._read_header()
+
+    def __iter__(self) -> Iterator[Node]:
+        while True:
+            node = self.read()
+            if node is None:
+                return
+            yield node
+
+    def read(self) -> Optional[Node]:
+        """Decode the next tree, return None at the end of the stream."""
+
+        if self._position == len(self._data) and not self._fill(1):
+            return None
+        while True:
+            start = self._position
+            constants_size = len(self._constants)
+            strings_size = len(self._strings)
+            try:
+                return self._decode()
+            except IndexError:
+                # The tree continues past the buffer, roll back and retry.
+                del self._constants[constants_size:]
+                del self._strings[strings_size:]
+                self._position = start
+                if not self._fill(len(self._data) - start):
+                    raise SerializationError("Unexpected end of stream")
+            except (UnicodeDecodeError, InvalidOperation):
+                raise SerializationError("Corrupted tree stream")
+
+    def _fill(self, size: int) -> bool:
+        """Buffer at least `size` more bytes, or the rest of the stream.
+
+        Return whether anything was read.
+        """
+
+        position = self._position
+        chunks = [self._data[position:]]
+        read = 0
+        while read < size:
+            chunk = self._stream.read(max(_READ_SIZE, size - read))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+        self._data = b"".join(chunks)
+        self._view = memoryview(self._data)
+        self._position = 0
+        return read > 0
+
+    def _read_header(self) -> None:
+        try:
+            while len(self._data) <= len(MAGIC) and self._fill(1):
+                pass
+            if bytes(self._view[: len(MAGIC)]) != MAGIC:
+                raise SerializationError("Not a catsby tree stream")
+            self._position = len(MAGIC)
+            version = self._decode_varint()
+        except IndexError:
+            raise SerializationError("Unexpected end of stream")
+        if version != FORMAT_VERSION:
+            raise SerializationError(f"Unsupported format version {version}")
+
+    def _decode(self) -> Node:
+        view = self._view
+        position = self._position
+        kind = view[position]
+        if kind < _UNARY_START:
+            # Leaves are the most common nodes, their reference is read inline
+            # unless it takes more than a byte.
+            ref = view[position + 1]
+            if ref < 0x80:
+                self._position = position + 2
+            else:
+                self._position = position + 1
+                ref = self._decode_varint()
+            if kind == NUMBER:
+                constants = self._constants
+                if ref == len(constants):
+                    constants.append(Decimal(self._decode_text()))
+                elif ref > len(constants):
+                    raise SerializationError(f"Invalid constant reference {ref}")
+                return NumberNode(constants[ref])
+            name = self._decode_string(ref)
+            if kind == VALUE_ACCESS:
+                return ValueAccessNode(name)
+            return AssignmentNode(name, self._decode())
+        self._position = position + 1
+        if kind < _BINARY_START:
+            return NODE_KINDS[kind](self._decode())  # type: ignore
+        if kind < _TEMPORARY_START:
+            # Arguments are evaluated left to right, matching pre-order.
+            return NODE_KINDS[kind](self._decode(), self._decode())  # type: ignore
+        if kind >= _PROGRAM_START:
+            if kind != _PROGRAM_START:
+                raise SerializationError(f"Unknown node kind {kind}")
+            return ProgramNode([self._decode() for _ in range(self._decode_varint())])
+        if kind >= _ARRAY_START:
+            return self._decode_array(kind)
+        if kind >= _ARGUMENT_START:
+            return self._decode_argument(kind)
+        if kind >= _FUNCTION_START:
+            return self._decode_function(kind)
+        return self._decode_temporary(kind)
+
+    def _decode_string(self, ref: int) -> str:
+        strings = self._strings
+        if ref == len(strings):
+            strings.append(self._decode_text())
+        elif ref > len(strings):
+            raise SerializationError(f"Invalid string reference {ref}")
+        return strings[ref]
+
+    def _decode_temporary(self, kind: int) -> Node:
+        if kind == _KIND_CODES[LetNode]:
+            return LetNode(self._decode_varint(), self._decode(), self._decode())
+        if kind == _KIND_CODES[TempNode]:
+            return TempNode(self._decode_varint())
+        raise SerializationError(f"Unknown node kind {kind}")
+
+    def _decode_function(self, kind: int) -> Node:
+        name = self._decode_string(self._decode_varint())
+        count = self._decode_varint()
+        if kind == _KIND_CODES[FunctionDefinitionNode]:
+            flags = self._decode_varint()
+            parameters = [
+                self._decode_string(self._decode_varint()) for _ in range(count)
+            ]
+            return FunctionDefinitionNode(
+                name, parameters, self._decode(), not flags & _NOMEMO
+            )
+        if kind == _KIND_CODES[CallNode]:
+            return CallNode(name, [self._decode() for _ in range(count)])
+        raise SerializationError(f"Unknown node kind {kind}")
+
+    def _decode_argument(self, kind: int) -> Node:
+        name = self._decode_string(self._decode_varint())
+        if kind == _KIND_CODES[RangeNode]:
+            return RangeNode(name, self._decode_string(self._decode_varint()))
+        if kind == _KIND_CODES[PatternNode]:
+            return PatternNode(name)
+        raise SerializationError(f"Unknown node kind {kind}")
+
+    def _decode_array(self, kind: int) -> Node:
+        if kind == _KIND_CODES[ArrayNode]:
+            return ArrayNode([self._decode() for _ in range(self._decode_varint())])
+        if kind == _KIND_CODES[ArrayRangeNode]:
+            return ArrayRangeNode(self._decode(), self._decode(), self._decode())
+        if kind == _KIND_CODES[IndexNode]:
+            return IndexNode(self._decode(), self._decode())
+        raise SerializationError(f"Unknown node kind {kind}")
+
+    def _decode_varint(self) -> int:
+        view = self._view
+        position = self._position
+        byte = view[position]
+        position += 1
+        if byte < 0x80:
+            self._position = position
+            return byte
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = view[position]
+            position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self._position = position
+                return result
+            shift += 7
+
+    def _decode_text(self) -> str:
+        size = self._decode_varint()
+        start = self._position
+        end = start + size
+        if end > len(self._view):
+            raise IndexError
+        self._position = end
+        return str(self._view[start:end], "utf-8")
+
+
+_KIND_CODES = {kind: code for code, kind in enumerate(NODE_KINDS)}
+_UNARY_START = _KIND_CODES[UNARY_KINDS[0]]
+_BINARY_START = _KIND_CODES[BINARY_KINDS[0]]
+_TEMPORARY_START = _KIND_CODES[TEMPORARY_KINDS[0]]
+_FUNCTION_START = _KIND_CODES[FUNCTION_KINDS[0]]
+_ARGUMENT_START = _KIND_CODES[ARGUMENT_KINDS[0]]
+_ARRAY_START = _KIND_CODES[ARRAY_KINDS[0]]
+_PROGRAM_START = _KIND_CODES[PROGRAM_KINDS[0]]
+
+# Flags of a function definition.
+_NOMEMO = 1
+
+
+def dumps(trees: Iterable[Node]) -> bytes:
+    """Encode a sequence of trees into a single stream."""
+
+    stream = io.BytesIO()
+    encoder = Encoder(stream)
+    for tree in trees:
+        encoder.write(tree)
+    return stream.getvalue()
+
+
+def loads(data: bytes) -> List[Node]:
+    """Decode every tree of a stream."""
+
+    return list(Decoder(io.BytesIO(data)))
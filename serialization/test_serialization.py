@@ -0,0 +1,143 @@
+import io
+from decimal import Decimal
+
+import pytest
+
+from lexer import Lexer
+from nodes import AddNode, NumberNode
+from parser_ import Parser
+
+from .serialization import (
+    FORMAT_VERSION,
+    MAGIC,
+    NODE_KINDS,
+    NUMBER,
+    Decoder,
+    Encoder,
+    SerializationError,
+    dumps,
+    loads,
+)
+
+SOURCES = [
+    "10.50",
+    "var my_var = (-3 + +.2) * 18.",
+    "2 ^ -1 ^ 3 % 4 / 5",
+    "!a < b && c >= d || e <= f",
+    "a > b == (c != d)",
+    "0.000 - 7.",
+    "fun f(a, b) = a * f(b, 1) + c",
+    "fun g() = 1",
+    "@nomemo fun h(x) = x",
+    "f(1, g(), -h(x))",
+    "sum(a01:a10, b*, c * 2) / mean(x1:x3)",
+    "[1, a, [b][0]][-1] * [] + [0:10:2][c]",
+]
+PROGRAMS = ["var a = 1; a * 2\n\nfun f(x) = x; f(a)", ""]
+
+
+class ChunkedStream(io.BytesIO):
+    """Return at most a few bytes per read, like a slow socket."""
+
+    def read(self, size=-1):
+        return super().read(3)
+
+
+def parse(text):
+    return Parser(Lexer(text).generate_tokens()).parse()
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_round_trip(source):
+    tree = parse(source)
+    assert loads(dumps([tree])) == [tree]
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_program_round_trip(source):
+    program = Parser(Lexer(source).generate_tokens()).parse_program()
+    assert loads(dumps([program])) == [program]
+
+
+def test_decimal_representation_is_preserved():
+    tree = AddNode(NumberNode(Decimal("1.50")), NumberNode(Decimal("1E+3")))
+    (tree,) = loads(dumps([tree]))
+    assert str(tree.node_a.value) == "1.50"
+    assert str(tree.node_b.value) == "1E+3"
+
+
+def test_shared_tables_are_smaller():
+    tree = parse("long_name * 1.125 + long_name * 1.125")
+    single = len(dumps([tree]))
+    double = len(dumps([tree, tree]))
+    assert double - single < single - len(MAGIC) - 1
+
+
+def test_streaming_decoder():
+    trees = [parse(source) for source in SOURCES]
+    stream = io.BytesIO()
+    encoder = Encoder(stream)
+    for tree in trees:
+        encoder.write(tree)
+
+    decoder = Decoder(ChunkedStream(stream.getvalue()))
+    assert list(decoder) == trees
+
+
+def test_empty_stream():
+    assert loads(dumps([])) == []
+
+
+def test_invalid_magic():
+    with pytest.raises(SerializationError):
+        loads(b"JUNK\x01")
+
+
+def test_unsupported_version():
+    with pytest.raises(SerializationError):
+        loads(MAGIC + bytes([FORMAT_VERSION + 1]))
+
+
+def test_truncated_stream():
+    data = dumps([parse("var a = 1 + 2")])
+    with pytest.raises(SerializationError):
+        loads(data[:-1])
+
+
+def test_unknown_node():
+    with pytest.raises(SerializationError):
+        dumps([Decimal("1")])
+
+
+@pytest.mark.parametrize("kind", [len(NODE_KINDS), 0x7F])
+def test_unknown_kind(kind):
+    data = dumps([parse("1 + 2")])
+    start = len(MAGIC) + 1
+    rest = start + 1
+    with pytest.raises(SerializationError, match=f"Unknown node kind {kind}"):
+        loads(data[:start] + bytes([kind]) + data[rest:])
+
+
+@pytest.mark.parametrize("text", [b"1.2.3", b"\xff"])
+def test_corrupted_constant(text):
+    data = MAGIC + bytes([FORMAT_VERSION, NUMBER, 0, len(text)]) + text
+    with pytest.raises(SerializationError, match="Corrupted tree stream"):
+        loads(data)
+
+
+def test_tree_spanning_chunks_is_decoded_in_linear_time(monkeypatch):
+    tree = parse(f"f({', '.join(f'x{i} * {i}' for i in range(500))})")
+    decoded = []
+    decode_text = Decoder._decode_text
+
+    def counting_decode_text(self):
+        text = decode_text(self)
+        decoded.append(text)
+        return text
+
+    monkeypatch.setattr(Decoder, "_decode_text", counting_decode_text)
+    assert list(Decoder(ChunkedStream(dumps([tree])))) == [tree]
+    # The function name, then a name and a constant per argument. Every retry
+    # has at least twice the input of the one before, so the tree is decoded
+    # less than three times over in total.
+    assert len(decoded) < 3 * 1001
@@ -0,0 +1,135 @@
+"""Load test client for the evaluation server.
+
+Opens several connections, pipelines requests on each of them and reports the
+throughput and the latency distribution.
+
+    python -m server.load_test --port 8765 --connections 16 --requests 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from .server import DEFAULT_PORT
+
+Connect = Callable[[], Awaitable[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]]
+
+DEFAULT_SOURCE = "(12.5 * 3 + 4) ^ 2 / 7 > 10 && !(1 == 2)"
+
+
+@dataclass
+class LoadTestReport:
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: List[float]
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def __repr__(self) -> str:
+        return (
+            f"requests: {self.requests}, errors: {self.errors}, "
+            f"elapsed: {self.elapsed:.3f}s, throughput: {self.throughput:.0f} req/s\n"
+            f"latency p50: {self.percentile(50) * 1000:.2f}ms, "
+            f"p90: {self.percentile(90) * 1000:.2f}ms, "
+            f"p99: {self.percentile(99) * 1000:.2f}ms, "
+            f"max: {self.percentile(100) * 1000:.2f}ms"
+        )
+
+
+async def _run_connection(
+    connect: Connect, requests: int, source: str, window: int, report: LoadTestReport
+) -> None:
+    reader, writer = await connect()
+    sent_at: List[float] = []
+    in_flight = asyncio.Semaphore(window)
+
+    async def send() -> None:
+        for request_id in range(requests):
+            await in_flight.acquire()
+            sent_at.append(time.perf_counter())
+            request = {"id": request_id, "source": source}
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for _ in range(requests):
+        response = json.loads(await reader.readline())
+        request_id = response.get("id")
+        if request_id is None:
+            # The server couldn't read the request, so it doesn't know its id.
+            report.errors += 1
+        else:
+            report.latencies.append(time.perf_counter() - sent_at[request_id])
+            if "error" in response:
+                report.errors += 1
+        in_flight.release()
+    await sender
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load_test(
+    connect: Connect,
+    connections: int = 8,
+    requests: int = 1000,
+    source: str = DEFAULT_SOURCE,
+    window: int = 16,
+) -> LoadTestReport:
+    """Send `requests` requests on each of `connections` connections.
+
+    Every connection keeps at most `window` requests in flight.
+    """
+
+    report = LoadTestReport(connections * requests, 0, 0.0, [])
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _run_connection(connect, requests, source, window, report)
+            for _ in range(connections)
+        )
+    )
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test a catsby server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="connect to a Unix socket instead")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=16)
+    parser.add_argument("--source", default=DEFAULT_SOURCE)
+    args = parser.parse_args()
+
+    unix_path: Optional[str] = args.unix
+
+    def connect() -> Awaitable[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+        if unix_path is not None:
+            return asyncio.open_unix_connection(unix_path)
+        return asyncio.open_connection(args.host, args.port)
+
+    report = asyncio.run(
+        run_load_test(
+            connect, args.connections, args.requests, args.source, args.window
+        )
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Asyncio evaluation server.
+
+Protocol: one JSON object per line in both directions.
+
+    -> {"id": 1, "source": "var x = 2 * 3"}
+    <- {"id": 1, "result": null}
+    -> {"id": 2, "source": "x / 0"}
+    <- {"id": 2, "error": "Runtime math error"}
+
+Every connection is a separate session with its own `Interpreter`, optionally
+forked from a preloaded base interpreter. Requests of a session are evaluated
+in order on a worker pool, so the event loop only does the I/O. At most
+`max_pending` requests of a connection are buffered, after that the connection
+is not read anymore until the session catches up.
+
+An evaluation running longer than `timeout` is cancelled, which frees its
+worker. Cancelling sets a flag the interpreter checks at every function call,
+so an evaluation stops where it's safe to, and one stuck in a single long call
+into C, like a huge power, carries on until the call returns. If it's still
+running when the next request of its session comes in and another `timeout`
+has passed, the session is closed.
+
+    python -m server --port 8765
+    python -m server --unix /tmp/catsby.sock
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from interpreter import Interpreter
+from lexer import Lexer
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_PENDING = 64
+DEFAULT_TIMEOUT = 5.0
+
+
+class Session:
+    __slots__ = "_interpreter", "pending", "closed"
+
+    def __init__(self, base: Optional[Interpreter] = None) -> None:
+        self._interpreter = base.fork() if base is not None else Interpreter()
+        self.pending: Optional["asyncio.Future[Any]"] = None
+        self.closed = False
+
+    def evaluate(self, source: str) -> Optional[str]:
+        """Evaluate a request, raising `Cancelled` once `cancel` was called."""
+
+        value = self._interpreter.evaluate(Lexer(source).generate_tokens())
+        return None if value is None else str(value)
+
+    def cancel(self) -> None:
+        """Stop the running evaluation at its next function call."""
+
+        self._interpreter.cancelled = True
+
+    def resume(self) -> None:
+        """Let evaluations run again, once the cancelled one has stopped."""
+
+        self._interpreter.cancelled = False
+
+
+class Server:
+    __slots__ = "_base", "_executor", "_max_pending", "_timeout"
+
+    def __init__(
+        self,
+        base: Optional[Interpreter] = None,
+        executor: Optional[Executor] = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self._base = base
+        self._executor = executor or ThreadPoolExecutor()
+        self._max_pending = max_pending
+        self._timeout = timeout
+
+    async def start_tcp(
+        self, host: str = "127.0.0.1", port: int = DEFAULT_PORT
+    ) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle, path)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a single connection until the client closes it."""
+
+        session = Session(self._base)
+        queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(self._max_pending)
+        worker = asyncio.create_task(self._process(session, queue, writer))
+        try:
+            while not worker.done():
+                line = await reader.readline()
+                if not line:
+                    break
+                await queue.put(line)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if not worker.done():
+                await queue.put(None)
+            try:
+                await worker
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def _process(
+        self,
+        session: Session,
+        queue: "asyncio.Queue[Optional[bytes]]",
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        while True:
+            line = await queue.get()
+            if line is None:
+                return
+            response = await self._respond(session, line)
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+            if session.closed:
+                writer.close()
+                return
+
+    async def _respond(self, session: Session, line: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            source = request["source"]
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return {"id": None, "error": "Invalid request"}
+
+        # A cancelled evaluation may not have stopped yet, the next one of the
+        # session has to wait for it to not share the interpreter.
+        pending = session.pending
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending], timeout=self._timeout)
+            if not pending.done():
+                session.closed = True
+                return {
+                    "id": request_id,
+                    "error": "Session closed, an evaluation timed out",
+                }
+        # Cleared before submitting, so a cancellation which comes before the
+        # evaluation starts still stops it.
+        session.resume()
+        loop = asyncio.get_running_loop()
+        running = loop.run_in_executor(self._executor, session.evaluate, source)
+        running.add_done_callback(_retrieve)
+        session.pending = running
+        try:
+            result = await asyncio.wait_for(asyncio.shield(running), self._timeout)
+        except asyncio.TimeoutError:
+            session.cancel()
+            return {"id": request_id, "error": "Evaluation timed out"}
+        except Exception as e:
+            return {"id": request_id, "error": str(e)}
+        return {"id": request_id, "result": result}
+
+
+def _retrieve(future: "asyncio.Future[Any]") -> None:
+    """Mark the error of an evaluation nobody waits for anymore as seen."""
+
+    if not future.cancelled():
+        future.exception()
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    unix_path: Optional[str] = None,
+    **options: Any,
+) -> None:
+    server = Server(**options)
+    if unix_path is not None:
+        listener = await server.start_unix(unix_path)
+    else:
+        listener = await server.start_tcp(host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve catsby sessions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on a Unix socket instead")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+    asyncio.run(
+        serve(
+            args.host,
+            args.port,
+            args.unix,
+            executor=ThreadPoolExecutor(args.workers),
+            max_pending=args.max_pending,
+            timeout=args.timeout,
+        )
+    )
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from interpreter import Interpreter
+from interpreter.interpreter import Cancelled
+from nodes import AssignmentNode, NumberNode, ValueAccessNode
+
+from .load_test import run_load_test
+from .server import Server, Session
+
+
+async def request(reader, writer, request_id, source):
+    writer.write(json.dumps({"id": request_id, "source": source}).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def run_with_server(tmp_path, client, **options):
+    path = str(tmp_path / "catsby.sock")
+
+    async def main():
+        listener = await Server(**options).start_unix(path)
+        async with listener:
+            return await client(path)
+
+    return asyncio.run(main())
+
+
+def test_session():
+    session = Session()
+    assert session.evaluate("var a = 2") is None
+    assert session.evaluate("a * 3") == "6"
+    assert session.evaluate("") is None
+
+
+def test_cancelled_session():
+    session = Session()
+    session.evaluate("fun f(x) = x + 1")
+    session.cancel()
+    assert session.evaluate("1 + 2") == "3"
+    with pytest.raises(Cancelled):
+        session.evaluate("f(1)")
+    session.resume()
+    assert session.evaluate("f(1)") == "2"
+
+
+def test_session_forks_base():
+    base = Interpreter()
+    base.visit(AssignmentNode("a", NumberNode(Decimal("2"))))
+    session = Session(base)
+    assert session.evaluate("var b = a * 3") is None
+    assert session.evaluate("b") == "6"
+    with pytest.raises(Exception):
+        base.visit(ValueAccessNode("b"))
+
+
+def test_requests(tmp_path):
+    async def client(path):
+        reader, writer = await asyncio.open_unix_connection(path)
+        responses = [
+            await request(reader, writer, 1, "var a = 10"),
+            await request(reader, writer, 2, "a / 4"),
+            await request(reader, writer, 3, "a / 0"),
+            await request(reader, writer, 4, "a < 3"),
+        ]
+        writer.write(b"not json\n")
+        responses.append(json.loads(await reader.readline()))
+        writer.close()
+        return responses
+
+    assert run_with_server(tmp_path, client) == [
+        {"id": 1, "result": None},
+        {"id": 2, "result": "2.5"},
+        {"id": 3, "error": "Runtime math error"},
+        {"id": 4, "result": "false"},
+        {"id": None, "error": "Invalid request"},
+    ]
+
+
+def test_sessions_are_isolated(tmp_path):
+    async def client(path):
+        reader_a, writer_a = await asyncio.open_unix_connection(path)
+        reader_b, writer_b = await asyncio.open_unix_connection(path)
+        await request(reader_a, writer_a, 1, "var a = 1")
+        response = await request(reader_b, writer_b, 1, "a")
+        writer_a.close()
+        writer_b.close()
+        return response
+
+    assert run_with_server(tmp_path, client) == {
+        "id": 1,
+        "error": "'a' is not defined",
+    }
+
+
+def test_timeout_cancels_evaluation(tmp_path):
+    definitions = ["@nomemo fun f0(x) = x"] + [
+        f"@nomemo fun f{i}(x) = f{i - 1}(x) + f{i - 1}(x + 1)" for i in range(1, 40)
+    ]
+
+    async def client(path):
+        reader, writer = await asyncio.open_unix_connection(path)
+        await request(reader, writer, 0, "; ".join(definitions))
+        responses = [
+            await request(reader, writer, 1, "f39(1)"),
+            await request(reader, writer, 2, "f2(1)"),
+        ]
+        writer.close()
+        return responses
+
+    # With a single worker, the second request only runs if the first one was
+    # stopped.
+    options = {"executor": ThreadPoolExecutor(1), "timeout": 0.1}
+    assert run_with_server(tmp_path, client, **options) == [
+        {"id": 1, "error": "Evaluation timed out"},
+        {"id": 2, "result": "8"},
+    ]
+
+
+def test_stuck_session_is_closed(tmp_path, monkeypatch):
+    evaluate = Session.evaluate
+
+    def stuck_evaluate(self, source):
+        if source == "stuck":
+            # Sleeping is a single call into C, cancelling waits for it.
+            time.sleep(0.3)
+        return evaluate(self, source)
+
+    monkeypatch.setattr(Session, "evaluate", stuck_evaluate)
+
+    async def client(path):
+        reader, writer = await asyncio.open_unix_connection(path)
+        responses = [
+            await request(reader, writer, 1, "stuck"),
+            await request(reader, writer, 2, "1 + 1"),
+        ]
+        closed = await reader.readline() == b""
+        writer.close()
+        return responses, closed
+
+    assert run_with_server(tmp_path, client, timeout=0.05) == (
+        [
+            {"id": 1, "error": "Evaluation timed out"},
+            {"id": 2, "error": "Session closed, an evaluation timed out"},
+        ],
+        True,
+    )
+
+
+def test_load_test(tmp_path):
+    async def client(path):
+        return await run_load_test(
+            lambda: asyncio.open_unix_connection(path),
+            connections=4,
+            requests=50,
+            window=8,
+        )
+
+    report = run_with_server(
+        tmp_path, client, executor=ThreadPoolExecutor(2), max_pending=4
+    )
+    assert report.requests == 200
+    assert report.errors == 0
+    assert len(report.latencies) == 200
+    assert report.percentile(50) <= report.percentile(99)
+
+
+def test_load_test_counts_invalid_requests(tmp_path):
+    path = str(tmp_path / "invalid.sock")
+
+    async def handle(reader, writer):
+        while await reader.readline():
+            writer.write(b'{"id": null, "error": "Invalid request"}\n')
+            await writer.drain()
+        writer.close()
+
+    async def main():
+        listener = await asyncio.start_unix_server(handle, path)
+        async with listener:
+            return await run_load_test(
+                lambda: asyncio.open_unix_connection(path), connections=2, requests=5
+            )
+
+    report = asyncio.run(main())
+    assert report.errors == 10
+    assert report.latencies == []
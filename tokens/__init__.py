@@ -1,2 +1,2 @@
 from .token_helpers import *
-from .tokens import VAR_TOKEN, Token, TokenType
+from .tokens import FUN_TOKEN, VAR_TOKEN, Token, TokenType
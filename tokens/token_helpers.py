@@ -1,4 +1,4 @@
-from .tokens import VAR_TOKEN, Token, TokenType
+from .tokens import FUN_TOKEN, VAR_TOKEN, Token, TokenType
 
 
 def is_plus(token_type: TokenType) -> bool:
@@ -55,6 +55,36 @@ def is_right_paren(token_type: TokenType) -> bool:
     return token_type == TokenType.RIGHT_PAREN
 
 
+def is_left_bracket(token_type: TokenType) -> bool:
+    """Check if token is a left bracket."""
+
+    return token_type == TokenType.LEFT_BRACKET
+
+
+def is_right_bracket(token_type: TokenType) -> bool:
+    """Check if token is a right bracket."""
+
+    return token_type == TokenType.RIGHT_BRACKET
+
+
+def is_colon(token_type: TokenType) -> bool:
+    """Check if token is a colon."""
+
+    return token_type == TokenType.COLON
+
+
+def is_separator(token_type: TokenType) -> bool:
+    """Check if token is a semicolon or a newline, which separate statements."""
+
+    return token_type == TokenType.SEMICOLON or token_type == TokenType.NEWLINE
+
+
+def is_comma(token_type: TokenType) -> bool:
+    """Check if token is a comma."""
+
+    return token_type == TokenType.COMMA
+
+
 def is_power(token_type: TokenType) -> bool:
     """Check if token is a power operator symbol."""
 
@@ -73,6 +103,18 @@ def is_var(token: Token) -> bool:
     return token == VAR_TOKEN
 
 
+def is_at(token_type: TokenType) -> bool:
+    """Check if token starts an annotation."""
+
+    return token_type == TokenType.AT
+
+
+def is_fun(token: Token) -> bool:
+    """Check if token is a fun token."""
+
+    return token == FUN_TOKEN
+
+
 def is_identifier(token_type: TokenType) -> bool:
     """Check if token is an identifier token."""
 
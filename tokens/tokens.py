@@ -19,11 +19,16 @@ class TokenType(Enum):
     MODULO = "MODULO"
     LEFT_PAREN = "LEFT_PAREN"
     RIGHT_PAREN = "RIGHT_PAREN"
+    LEFT_BRACKET = "LEFT_BRACKET"
+    RIGHT_BRACKET = "RIGHT_BRACKET"
+    COMMA = "COMMA"
+    COLON = "COLON"
 
     # Variable related
     KEYWORD = "KEYWORD"
     IDENTIFIER = "IDENTIFIER"
     EQ = "EQ"
+    AT = "AT"
 
     # Logical operators
     EQEQ = "EQEQ"
@@ -36,6 +41,10 @@ class TokenType(Enum):
     AND = "AND"
     OR = "OR"
 
+    # Statement separators
+    SEMICOLON = "SEMICOLON"
+    NEWLINE = "NEWLINE"
+
 
 @dataclass
 class Token:
@@ -48,3 +57,4 @@ class Token:
 
 
 VAR_TOKEN = Token(TokenType.KEYWORD, "var")
+FUN_TOKEN = Token(TokenType.KEYWORD, "fun")
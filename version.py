@@ -0,0 +1,2 @@
+# Cached scripts are keyed by it, bump it with every change to the grammar.
+VERSION = "0.2.0"
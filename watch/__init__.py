@@ -0,0 +1 @@
+from .watch import CycleReport, WatchedScript, poll
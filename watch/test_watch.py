@@ -0,0 +1,196 @@
+import threading
+from decimal import Decimal
+
+import pytest
+
+from interpreter import Interpreter
+from interpreter.values import Number
+from lexer import Lexer
+from parser_ import Parser
+
+from .watch import WatchedScript, _edit, poll
+
+SCRIPT = """var rate = 2
+var base = 10; var unrelated = 7
+var gross = base * rate
+fun net(x) = gross - x
+net(1)
+unrelated + 1
+"""
+
+
+def update(script, text):
+    emitted = []
+    report = script.update(text, lambda statement, value: emitted.append(value))
+    return report, emitted
+
+
+def value(script, name):
+    return script.symbol_table.get(name)
+
+
+def full_run(text):
+    interpreter = Interpreter()
+    emitted = []
+    program = Parser(Lexer(text).generate_tokens()).parse_program()
+    interpreter.execute(program, emitted.append)
+    return emitted
+
+
+@pytest.fixture
+def script():
+    script = WatchedScript()
+    update(script, SCRIPT)
+    return script
+
+
+def test_first_update_runs_everything():
+    report, emitted = update(WatchedScript(), SCRIPT)
+    assert (report.statements, report.evaluated, report.errors) == (7, 7, [])
+    assert emitted == full_run(SCRIPT)
+
+
+def test_only_dependents_are_evaluated(script):
+    report, emitted = update(script, SCRIPT.replace("rate = 2", "rate = 3"))
+    assert report.evaluated == 4
+    assert emitted == [Number(Decimal("29"))]
+    assert value(script, "gross") == Number(Decimal("30"))
+
+
+def test_unchanged_statements_are_not_evaluated(script):
+    unrelated = value(script, "unrelated")
+    report, emitted = update(script, SCRIPT.replace("\n", "\n\n  "))
+    assert (report.evaluated, emitted) == (0, [])
+    report, emitted = update(script, SCRIPT + "unrelated * 2\n")
+    assert (report.evaluated, emitted) == (1, [Number(Decimal("14"))])
+    assert value(script, "unrelated") is unrelated
+    # Statements between two edits are parsed again but not evaluated.
+    text = SCRIPT.replace("rate = 2", "rate = 3").replace("+ 1", "+ 2")
+    report, emitted = update(script, text)
+    assert report.evaluated == 5
+    assert sorted(number.value for number in emitted) == [9, 29]
+
+
+def test_removed_definitions(script):
+    report, emitted = update(script, SCRIPT.replace("var rate = 2\n", ""))
+    assert [str(error) for _, error in report.errors] == [
+        "'rate' is not defined",
+        "'gross' is not defined",
+    ]
+    assert value(script, "rate") is None
+    assert value(script, "gross") is None
+    report, emitted = update(script, "var rate = 1\n" + script.script.text)
+    assert report.errors == []
+    assert emitted == [Number(Decimal("9"))]
+
+
+def test_failed_statements_are_retried(script):
+    broken = SCRIPT.replace("var base = 10", "var base = 1 / 0")
+    report, _ = update(script, broken)
+    assert len(report.errors) == 3
+    report, emitted = update(script, broken + "var other = 1\n")
+    assert (report.evaluated, len(report.errors)) == (5, 3)
+    report, emitted = update(script, SCRIPT)
+    assert report.errors == []
+    assert emitted == [Number(Decimal("19"))]
+
+
+def test_syntax_error_keeps_script(script):
+    with pytest.raises(Exception):
+        update(script, SCRIPT.replace("rate = 2", "rate = 2 *"))
+    assert script.script.text == SCRIPT
+    report, emitted = update(script, SCRIPT.replace("rate = 2", "rate = 2 * 2"))
+    assert emitted == [Number(Decimal("39"))]
+
+
+def test_duplicate_definition(script):
+    report, _ = update(script, SCRIPT + "var rate = 5\n")
+    assert [str(error) for _, error in report.errors] == ["'rate' is already defined"]
+    assert value(script, "rate") == Number(Decimal("2"))
+
+
+def test_forward_reference():
+    text = "var b = d + 7\nvar d = 9\nb"
+    report, emitted = update(WatchedScript(), text)
+    assert [str(error) for _, error in report.errors] == [
+        "'d' is not defined",
+        "'b' is not defined",
+    ]
+    script = WatchedScript()
+    update(script, "var d = 9\nvar b = d + 7\nb")
+    report, emitted = update(script, text)
+    assert [str(error) for _, error in report.errors] == [
+        "'d' is not defined",
+        "'b' is not defined",
+    ]
+    assert value(script, "b") is None
+
+
+@pytest.mark.parametrize(
+    "history",
+    [
+        ["var x = 2\nx"],
+        ["var x = 1\nx", "var x = 2\nx"],
+        ["var x = 1\nvar x = 2\nx", "var x = 2\nx"],
+    ],
+)
+def test_first_definition_wins_whatever_the_history(history):
+    text = "var x = 1\nvar x = 2\nx"
+    script = WatchedScript()
+    for old in history:
+        update(script, old)
+    report, emitted = update(script, text)
+    assert [str(error) for _, error in report.errors] == ["'x' is already defined"]
+    assert emitted == [Number(Decimal("1"))]
+    assert value(script, "x") == Number(Decimal("1"))
+
+
+def test_edits_match_full_run():
+    script = WatchedScript()
+    for text in [
+        "var a = 1\nvar b = a + 1\nvar c = b * a\nc + b",
+        "var a = 2\nvar b = a + 1\nvar c = b * a\nc + b",
+        "var a = 2\nvar b = 5\nvar c = b * a\nc + b",
+        "var a = 2\nvar c = 3\nc * 2",
+        "var a = 2; var b = a\nvar c = b\nc + b",
+        "var b = 4; var a = b\nvar c = b\nc + a",
+    ]:
+        update(script, text)
+        interpreter = Interpreter()
+        interpreter.evaluate(Lexer(text).generate_tokens())
+        assert dict(script.symbol_table.items()) == dict(
+            interpreter.fork()._symbol_table.items()
+        )
+
+
+@pytest.mark.parametrize(
+    ["old", "new", "expected"],
+    [
+        ("abc", "abc", (3, 0, "")),
+        ("", "abc", (0, 0, "abc")),
+        ("abc", "", (0, 3, "")),
+        ("abcdef", "abXYef", (2, 2, "XY")),
+        ("aaaa", "aaaaa", (4, 0, "a")),
+        (
+            "x" * 5000 + "1" + "y" * 3000,
+            "x" * 5000 + "22" + "y" * 3000,
+            (5000, 1, "22"),
+        ),
+    ],
+)
+def test_edit(old, new, expected):
+    assert _edit(old, new) == expected
+    offset, removed, inserted = _edit(old, new)
+    rest = offset + removed
+    assert old[:offset] + inserted + old[rest:] == new
+
+
+def test_poll(tmp_path):
+    path = tmp_path / "script.cat"
+    path.write_text("1")
+    texts = poll(path, interval=0.01)
+    assert next(texts) == "1"
+    timer = threading.Timer(0.05, path.write_text, ["1 + 1"])
+    timer.start()
+    assert next(texts) == "1 + 1"
+    timer.join()
@@ -0,0 +1,307 @@
+"""Re-evaluate a script as it's edited.
+
+Each new version of the text is turned into a single edit, the span between
+the common prefix and suffix of the old and new text, and only the statements
+the edit touched are parsed again. Changed statements are evaluated along with
+the statements reading what they define, directly or transitively, in the
+order of the script. Every other variable stays in the symbol table as it was.
+
+Like in a fresh run of the text, a statement only sees the definitions above
+it, and of two definitions of a name the first one in the script wins, no
+matter which of them was evaluated first while editing.
+
+A statement which fails is reported and retried with every later change, so
+that fixing what it depends on brings it back.
+"""
+
+import os
+from dataclasses import dataclass, field
+from operator import attrgetter
+from time import perf_counter, sleep
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from interpreter import Interpreter, SymbolTable
+from nodes import AssignmentNode, FunctionDefinitionNode, Node, free_variables
+from parser_ import parse_script, reparse_script
+
+DEFAULT_INTERVAL = 0.2
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Texts are compared a block at a time before looking for the first difference.
+_BLOCK = 1024
+
+
+@dataclass
+class CycleReport:
+    """Outcome of applying a new version of a watched script."""
+
+    statements: int
+    evaluated: int = 0
+    errors: List[Tuple[Node, Exception]] = field(default_factory=list)
+    parse_time: float = 0.0
+    evaluation_time: float = 0.0
+
+
+class _Statement:
+    """A statement of the script with the name it defines and the names it reads."""
+
+    __slots__ = "node", "name", "reads", "position"
+
+    def __init__(self, node: Node) -> None:
+        self.node = node
+        # Index in the script, set once the statement is in it.
+        self.position = -1
+        self.name: Optional[str] = None
+        if isinstance(node, AssignmentNode):
+            self.name = node.name
+            self.reads = free_variables(node.value)
+        else:
+            if isinstance(node, FunctionDefinitionNode):
+                self.name = node.name
+            self.reads = free_variables(node)
+
+
+class WatchedScript:
+    """A script kept evaluated while its text changes.
+
+    `update` takes the whole new text. Values of the expressions it evaluates
+    are passed to `emit` together with their statements.
+    """
+
+    __slots__ = (
+        "script",
+        "symbol_table",
+        "_interpreter",
+        "_statements",
+        "_definitions",
+        "_readers",
+        "_failed",
+    )
+
+    def __init__(self, symbol_table: Optional[SymbolTable] = None) -> None:
+        self.script = parse_script("")
+        self.symbol_table = symbol_table or SymbolTable()
+        self._interpreter = Interpreter(self.symbol_table)
+        self._statements: List[_Statement] = []
+        # Statements whose definitions are in the symbol table, by name.
+        self._definitions: Dict[str, _Statement] = {}
+        # Dicts are used as ordered sets, so statements are evaluated in a
+        # repeatable order.
+        self._readers: Dict[str, Dict[_Statement, None]] = {}
+        self._failed: Dict[_Statement, None] = {}
+
+    def update(self, text: str, emit: Callable[[Node, Any], None]) -> CycleReport:
+        """Apply a new version of the text.
+
+        A syntax error is raised and the script stays as it was, so the next
+        version is compared against the last one that parsed.
+        """
+
+        start = perf_counter()
+        script, change = reparse_script(self.script, *_edit(self.script.text, text))
+        self.script = script
+        index = change.index
+        end = index + len(change.removed)
+        replaced = self._statements[index:end]
+        statements, added = self._match(replaced, change.added)
+        self._statements[index:end] = statements
+        # Later statements only move if the number of statements changed.
+        if len(statements) == end - index:
+            stop = index + len(statements)
+        else:
+            stop = len(self._statements)
+        for position in range(index, stop):
+            self._statements[position].position = position
+        kept = set(statements)
+        removed = [statement for statement in replaced if statement not in kept]
+        for statement in removed:
+            self._forget(statement)
+        for statement in added:
+            for name in statement.reads:
+                self._readers.setdefault(name, {})[statement] = None
+        report = CycleReport(len(script.statements))
+        report.parse_time = perf_counter() - start
+
+        start = perf_counter()
+        changed = {statement.name for statement in removed if statement.name}
+        affected = self._affected(added, changed)
+        self._add_later_definitions(affected)
+        order = sorted(affected, key=attrgetter("position"))
+        for statement in order:
+            if statement.name is not None:
+                self._undefine(statement)
+        for statement in order:
+            try:
+                self._check_reads(statement)
+                value = self._interpreter.visit(statement.node)
+            except Exception as e:
+                self._failed[statement] = None
+                report.errors.append((statement.node, e))
+                continue
+            self._failed.pop(statement, None)
+            if statement.name is not None:
+                self._definitions[statement.name] = statement
+            elif value is not None:
+                emit(statement.node, value)
+        report.evaluated = len(order)
+        report.evaluation_time = perf_counter() - start
+        return report
+
+    def _match(
+        self, replaced: List[_Statement], nodes: List[Node]
+    ) -> Tuple[List[_Statement], List[_Statement]]:
+        """Pair new trees with equal statements among the replaced ones.
+
+        Edits in two places make a single change spanning everything between
+        them, the statements in there which parse to the same tree as before,
+        in the same order, are kept with their values. Return the statements
+        and the new ones.
+        """
+
+        unchanged: Dict[str, List[Tuple[int, _Statement]]] = {}
+        for position, statement in enumerate(replaced):
+            if statement not in self._failed:
+                key = repr(statement.node)
+                unchanged.setdefault(key, []).append((position, statement))
+        statements: List[_Statement] = []
+        added: List[_Statement] = []
+        # Kept statements stay in their order, moving one past another makes it
+        # new, so definitions it reads or makes are checked again.
+        last = -1
+        for node in nodes:
+            candidates = unchanged.get(repr(node))
+            while candidates and candidates[0][0] <= last:
+                candidates.pop(0)
+            if candidates and candidates[0][1].node == node:
+                last, statement = candidates.pop(0)
+                statements.append(statement)
+            else:
+                statement = _Statement(node)
+                statements.append(statement)
+                added.append(statement)
+        return statements, added
+
+    def _forget(self, statement: _Statement) -> None:
+        self._undefine(statement)
+        self._failed.pop(statement, None)
+        for name in statement.reads:
+            readers = self._readers[name]
+            del readers[statement]
+            if not readers:
+                del self._readers[name]
+
+    def _undefine(self, statement: _Statement) -> None:
+        name = statement.name
+        if name is not None and self._definitions.get(name) is statement:
+            del self._definitions[name]
+            self.symbol_table.remove(name)
+
+    def _affected(
+        self, added: List[_Statement], names: Set[str]
+    ) -> Dict[_Statement, None]:
+        """Get the statements to evaluate and everything reading what they define."""
+
+        affected = dict.fromkeys(added)
+        affected.update(self._failed)
+        stack = list(names)
+        stack.extend(statement.name for statement in affected if statement.name)
+        while stack:
+            for reader in self._readers.get(stack.pop(), ()):
+                if reader not in affected:
+                    affected[reader] = None
+                    if reader.name is not None:
+                        stack.append(reader.name)
+        return affected
+
+    def _add_later_definitions(self, affected: Dict[_Statement, None]) -> None:
+        """Add the definitions of names an earlier affected statement defines.
+
+        Those have to be undefined and fail as they would in a fresh run.
+        """
+
+        later = []
+        for statement in affected:
+            if statement.name is None:
+                continue
+            definition = self._definitions.get(statement.name)
+            if (
+                definition is not None
+                and definition not in affected
+                and definition.position > statement.position
+            ):
+                later.append(definition)
+        affected.update(dict.fromkeys(later))
+
+    def _check_reads(self, statement: _Statement) -> None:
+        """Raise the error of a fresh run for names only defined further down."""
+
+        for name in statement.reads:
+            definition = self._definitions.get(name)
+            if definition is not None and definition.position > statement.position:
+                raise Exception(f"'{name}' is not defined")
+
+
+def poll(path: PathLike, interval: float = DEFAULT_INTERVAL) -> Iterator[str]:
+    """Yield the text of a file now and whenever it changes.
+
+    The modification time and size are checked every `interval` seconds. A
+    missing file, as while an editor replaces it, is waited for.
+    """
+
+    last: Optional[Tuple[int, int]] = None
+    text: Optional[str] = None
+    while True:
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature != last:
+                last = signature
+                with open(path, encoding="utf-8") as file:
+                    new_text = file.read()
+                if new_text != text:
+                    text = new_text
+                    yield text
+        except OSError:
+            last = None
+        sleep(interval)
+
+
+def _edit(old: str, new: str) -> Tuple[int, int, str]:
+    """Get the offset, removed length and inserted text turning `old` into `new`."""
+
+    limit = min(len(old), len(new))
+    prefix = _common_length(old, new, limit, False)
+    suffix = _common_length(old, new, limit - prefix, True)
+    new_end = len(new) - suffix
+    return prefix, len(old) - suffix - prefix, new[prefix:new_end]
+
+
+def _common_length(old: str, new: str, limit: int, from_end: bool) -> int:
+    """Get the length of the common prefix, or suffix, up to `limit` characters.
+
+    Equal blocks are skipped whole and the block with the first difference is
+    bisected, so the comparisons run in C.
+    """
+
+    def same(start: int, end: int) -> bool:
+        if from_end:
+            old_start, old_end = len(old) - end, len(old) - start
+            new_start, new_end = len(new) - end, len(new) - start
+            return old[old_start:old_end] == new[new_start:new_end]
+        return old[start:end] == new[start:end]
+
+    length = 0
+    while length < limit:
+        end = min(length + _BLOCK, limit)
+        if not same(length, end):
+            # The first difference is in [length, end).
+            while end - length > 1:
+                middle = (length + end) // 2
+                if same(length, middle):
+                    length = middle
+                else:
+                    end = middle
+            return length
+        length = end
+    return length